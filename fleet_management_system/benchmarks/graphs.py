@@ -0,0 +1,107 @@
+import json
+import math
+
+def grid_graph(num_vertices, spacing=2.0):
+    """
+    Build a square grid with two-way lanes between neighbouring vertices.
+    
+    Args:
+        num_vertices (int): Approximate number of vertices; rounded down to
+            a square
+        spacing (float): Distance between neighbouring vertices
+    
+    Returns:
+        dict: Navigation graph in the nav_graph JSON format
+    """
+    side = max(2, int(math.isqrt(num_vertices)))
+    vertices = []
+    lanes = []
+    
+    for row in range(side):
+        for col in range(side):
+            attrs = {}
+            # A charger in every corner
+            if row in (0, side - 1) and col in (0, side - 1):
+                attrs = {'name': f'C{row}_{col}', 'is_charger': True}
+            vertices.append([col * spacing, row * spacing, attrs])
+    
+    for row in range(side):
+        for col in range(side):
+            vertex = row * side + col
+            if col + 1 < side:
+                lanes.append([vertex, vertex + 1, {'speed_limit': 0}])
+                lanes.append([vertex + 1, vertex, {'speed_limit': 0}])
+            if row + 1 < side:
+                lanes.append([vertex, vertex + side, {'speed_limit': 0}])
+                lanes.append([vertex + side, vertex, {'speed_limit': 0}])
+    
+    return {'levels': {'grid': {'lanes': lanes, 'vertices': vertices}}}
+
+def warehouse_graph(num_vertices, aisle_length=40, cross_aisle_every=10, spacing=1.5):
+    """
+    Build a warehouse layout of one-way aisles joined by two-way cross aisles.
+    
+    Aisles run north-south and alternate direction. Cross aisles at both
+    ends and every few positions along the aisles connect them in both
+    directions at a higher speed limit; chargers line the southern end.
+    
+    Args:
+        num_vertices (int): Approximate number of vertices
+        aisle_length (int): Vertices per aisle
+        cross_aisle_every (int): Positions between cross aisles
+        spacing (float): Distance between neighbouring vertices
+    
+    Returns:
+        dict: Navigation graph in the nav_graph JSON format
+    """
+    aisle_length = max(2, min(aisle_length, num_vertices // 2))
+    num_aisles = max(2, num_vertices // aisle_length)
+    vertices = []
+    lanes = []
+    
+    def vertex_id(aisle, position):
+        return aisle * aisle_length + position
+    
+    def is_cross_aisle(position):
+        return (position == 0 or position == aisle_length - 1 or
+                position % cross_aisle_every == 0)
+    
+    for aisle in range(num_aisles):
+        for position in range(aisle_length):
+            attrs = {}
+            if position == 0 and aisle % 4 == 0:
+                attrs = {'name': f'C{aisle}', 'is_charger': True}
+            elif position == aisle_length - 1:
+                attrs = {'name': f'A{aisle}'}
+            vertices.append([aisle * spacing * 2, position * spacing, attrs])
+    
+    for aisle in range(num_aisles):
+        northbound = aisle % 2 == 0
+        for position in range(aisle_length - 1):
+            here = vertex_id(aisle, position)
+            ahead = vertex_id(aisle, position + 1)
+            if northbound:
+                lanes.append([here, ahead, {'speed_limit': 1.0}])
+            else:
+                lanes.append([ahead, here, {'speed_limit': 1.0}])
+        
+        if aisle + 1 < num_aisles:
+            for position in range(aisle_length):
+                if is_cross_aisle(position):
+                    here = vertex_id(aisle, position)
+                    beside = vertex_id(aisle + 1, position)
+                    lanes.append([here, beside, {'speed_limit': 2.0}])
+                    lanes.append([beside, here, {'speed_limit': 2.0}])
+    
+    return {'levels': {'warehouse': {'lanes': lanes, 'vertices': vertices}}}
+
+def write_graph(graph, path):
+    """
+    Write a navigation graph to a JSON file.
+    
+    Args:
+        graph (dict): Navigation graph in the nav_graph JSON format
+        path (str): Output file path
+    """
+    with open(path, 'w') as f:
+        json.dump(graph, f)
@@ -0,0 +1,319 @@
+import os
+import sys
+import io
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+import numpy as np
+
+# Add the project directory to the path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.nav_graph import NavGraph
+from src.simulation.simulator import Simulator
+from benchmarks.graphs import grid_graph, warehouse_graph, write_graph
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+BUNDLED_GRAPHS = ('nav_graph_1.json', 'nav_graph_2.json', 'nav_graph_3.json')
+
+# Relative slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.2
+
+# Modules a headless run imports, and slow-to-import modules they must
+# leave to the GUI and the NetworkX-backed helpers
+CORE_MODULES = ('src.models.robot', 'src.models.nav_graph', 'src.simulation.simulator',
+                'src.simulation.event_simulator')
+HEAVY_MODULES = ('networkx', 'pygame')
+
+def quiet(function, *args, **kwargs):
+    """Call a function with its console output suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+def latency_stats(samples):
+    """
+    Summarize latency samples.
+    
+    Args:
+        samples (list): Durations in seconds
+    
+    Returns:
+        dict: Mean, median and 95th percentile in microseconds
+    """
+    samples = np.asarray(samples) * 1e6
+    return {
+        'mean_us': float(samples.mean()),
+        'p50_us': float(np.percentile(samples, 50)),
+        'p95_us': float(np.percentile(samples, 95)),
+    }
+
+def bench_imports(repeat):
+    """
+    Time importing the core modules in fresh interpreters with -X importtime.
+    
+    Returns:
+        dict: Best total import time in milliseconds, and the heavy modules
+            that got imported along the way
+    """
+    code = 'import ' + ', '.join(CORE_MODULES)
+    best = None
+    heavy = set()
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+        
+        # Lines read "import time: self [us] | cumulative | package", with
+        # packages indented by how deep they were imported
+        total_us = 0
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if not line.startswith('import time:') or len(fields) != 3:
+                continue
+            cumulative, package = fields[1].strip(), fields[2][1:]
+            if not cumulative.isdigit():
+                continue
+            if not package.startswith(' '):
+                total_us += int(cumulative)
+            if package.strip().split('.')[0] in HEAVY_MODULES:
+                heavy.add(package.strip().split('.')[0])
+        best = total_us if best is None else min(best, total_us)
+    
+    return {'modules': list(CORE_MODULES), 'import_ms': best / 1e3, 'heavy_modules': sorted(heavy)}
+
+def bench_load(path, repeat):
+    """Time loading a navigation graph; returns the best time in seconds."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        quiet(NavGraph, path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_shortest_path(nav_graph, queries, rng):
+    """
+    Time shortest path queries between random vertex pairs.
+    
+    Each pair is asked for three times, following the path cache: the first
+    query runs a point-to-point search, the second builds the source's
+    shortest path tree and the third is answered from that tree.
+    
+    Returns:
+        dict: Latency of first, repeated and cached queries
+    """
+    nav_graph.path_cache.invalidate()
+    pairs = [(rng.randrange(nav_graph.num_vertices), rng.randrange(nav_graph.num_vertices))
+             for _ in range(queries)]
+    
+    result = {'queries': queries}
+    for kind in ('cold', 'repeat', 'cached'):
+        samples = []
+        for start, end in pairs:
+            started = time.perf_counter()
+            nav_graph.get_shortest_path(start, end)
+            samples.append(time.perf_counter() - started)
+        result[kind] = latency_stats(samples)
+    return result
+
+def bench_reservations(nav_graph, operations, rng):
+    """
+    Measure reserve_lane / release_lane throughput on random lanes.
+    
+    Returns:
+        dict: Reserve-release pairs per second
+    """
+    lanes = [(int(nav_graph.lane_from[i]), int(nav_graph.lane_to[i]))
+             for i in (rng.randrange(nav_graph.num_lanes) for _ in range(operations))]
+    
+    started = time.perf_counter()
+    for robot_id, (from_vertex, to_vertex) in enumerate(lanes):
+        nav_graph.reserve_lane(from_vertex, to_vertex, robot_id)
+        nav_graph.release_lane(from_vertex, to_vertex, robot_id)
+    elapsed = time.perf_counter() - started
+    
+    return {'operations': operations, 'pairs_per_second': operations / elapsed}
+
+def bench_fleet(path, robot_counts, steps, warmup, seed):
+    """
+    Time headless simulation steps for several fleet sizes.
+    
+    Every step keeps all robots busy with random tasks, then updates the
+    fleet manager and the traffic manager; task assignment is timed apart.
+    
+    Returns:
+        list: One result per robot count
+    """
+    results = []
+    for robots in robot_counts:
+        simulator = quiet(Simulator, path, seed=seed)
+        spawned = len(simulator.spawn_robots(robots))
+        
+        for _ in range(warmup):
+            simulator.assign_random_tasks()
+            simulator.step()
+        
+        step_times = []
+        assign_time = 0.0
+        for _ in range(steps):
+            started = time.perf_counter()
+            simulator.assign_random_tasks()
+            assigned = time.perf_counter()
+            simulator.step()
+            step_times.append(time.perf_counter() - assigned)
+            assign_time += assigned - started
+        simulator.close()
+        
+        step_times = np.asarray(step_times) * 1e3
+        results.append({
+            'robots': spawned,
+            'steps': steps,
+            'step_mean_ms': float(step_times.mean()),
+            'step_p95_ms': float(np.percentile(step_times, 95)),
+            'assign_mean_ms': 1e3 * assign_time / steps,
+            'steps_per_second': 1e3 / float(step_times.mean()),
+        })
+    return results
+
+def bench_graph(name, path, args, rng):
+    """Run every benchmark on one navigation graph."""
+    print(f"Benchmarking {name} ...")
+    nav_graph = quiet(NavGraph, path)
+    
+    # Never put more than one robot on every fourth vertex
+    robot_counts = sorted({min(count, nav_graph.num_vertices // 4) for count in args.robots})
+    robot_counts = [count for count in robot_counts if count > 0]
+    
+    return {
+        'name': name,
+        'vertices': nav_graph.num_vertices,
+        'lanes': nav_graph.num_lanes,
+        'load_s': bench_load(path, args.repeat),
+        'shortest_path': bench_shortest_path(nav_graph, args.queries, rng),
+        'reservations': bench_reservations(nav_graph, args.reservations, rng),
+        'fleet': bench_fleet(path, robot_counts, args.steps, args.warmup, args.seed),
+    }
+
+def flatten(report):
+    """Map 'graph/metric' names to the numbers of a report."""
+    metrics = {}
+    if 'imports' in report:
+        metrics['imports/core_import_ms'] = report['imports']['import_ms']
+    for graph in report['graphs']:
+        prefix = graph['name']
+        metrics[f"{prefix}/load_s"] = graph['load_s']
+        for kind in ('cold', 'repeat', 'cached'):
+            metrics[f"{prefix}/shortest_path_{kind}_mean_us"] = graph['shortest_path'][kind]['mean_us']
+        metrics[f"{prefix}/reservation_pairs_per_second"] = graph['reservations']['pairs_per_second']
+        for fleet in graph['fleet']:
+            metrics[f"{prefix}/step_mean_ms@{fleet['robots']}"] = fleet['step_mean_ms']
+    return metrics
+
+def compare(report, baseline):
+    """
+    Print how a report compares to a baseline report.
+    
+    Returns:
+        int: Number of metrics that regressed by more than the threshold
+    """
+    current = flatten(report)
+    previous = flatten(baseline)
+    regressions = 0
+    
+    for metric, value in current.items():
+        if metric not in previous or previous[metric] == 0:
+            continue
+        # Throughputs regress when they drop, times when they grow
+        change = value / previous[metric] - 1.0
+        if metric.endswith('per_second'):
+            change = -change
+        regressed = change > REGRESSION_THRESHOLD
+        regressions += regressed
+        print(f"{metric:60s} {previous[metric]:12.3f} -> {value:12.3f} "
+              f"(slowdown {change:+.0%}){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    """Entry point of the benchmark harness."""
+    parser = argparse.ArgumentParser(description='Fleet Management System benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='Vertex counts of the synthetic graphs')
+    parser.add_argument('--layouts', nargs='+', choices=('grid', 'warehouse'),
+                        default=['grid', 'warehouse'], help='Synthetic graph layouts')
+    parser.add_argument('--no_bundled', action='store_true',
+                        help='Skip the bundled data/nav_graph_*.json graphs')
+    parser.add_argument('--robots', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Fleet sizes of the stepping benchmark')
+    parser.add_argument('--steps', type=int, default=200,
+                        help='Timed simulation steps per fleet size')
+    parser.add_argument('--warmup', type=int, default=60,
+                        help='Untimed simulation steps before timing')
+    parser.add_argument('--queries', type=int, default=200,
+                        help='Random shortest path queries per graph')
+    parser.add_argument('--reservations', type=int, default=100000,
+                        help='Lane reserve/release pairs per graph')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Graph loads timed per graph, the best one is kept')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed of queries and scenarios')
+    parser.add_argument('--output', type=str, default='benchmark_report.json',
+                        help='Path of the JSON report')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='Baseline JSON report to compare against')
+    parser.add_argument('--imports_only', action='store_true',
+                        help='Only check the import time of the core modules')
+    
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    
+    report = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'settings': vars(args),
+        'graphs': [],
+    }
+    
+    # Headless runs must not pay for the GUI or NetworkX
+    print("Timing imports ...")
+    report['imports'] = bench_imports(args.repeat)
+    print(f"Core modules import in {report['imports']['import_ms']:.1f} ms")
+    heavy = report['imports']['heavy_modules']
+    if heavy:
+        print(f"REGRESSION: importing the core modules imports {', '.join(heavy)}")
+    
+    if not args.imports_only:
+        if not args.no_bundled:
+            for filename in BUNDLED_GRAPHS:
+                report['graphs'].append(bench_graph(filename, os.path.join(DATA_DIR, filename),
+                                                    args, rng))
+        
+        generators = {'grid': grid_graph, 'warehouse': warehouse_graph}
+        with tempfile.TemporaryDirectory() as graph_dir:
+            for layout in args.layouts:
+                for size in args.sizes:
+                    path = os.path.join(graph_dir, f'{layout}_{size}.json')
+                    write_graph(generators[layout](size), path)
+                    report['graphs'].append(bench_graph(f'{layout}_{size}', path, args, rng))
+    
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    
+    regressions = len(heavy)
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions += compare(report, baseline)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
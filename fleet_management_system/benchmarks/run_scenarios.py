@@ -0,0 +1,202 @@
+import os
+import io
+import sys
+import csv
+import glob
+import time
+import pickle
+import argparse
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Add the project directory to the path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.nav_graph import NavGraph
+from src.simulation.simulator import Simulator
+from src.simulation.event_simulator import EventSimulator
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Per-run metrics summarized over the runs of a configuration
+SUMMARY_METRICS = ('throughput_per_minute', 'deadlocks_resolved', 'mean_waiting_robots',
+                   'mean_wait_s', 'p95_wait_s', 'mean_lead_time_s', 'batteries_emptied')
+
+# Pickled navigation graphs of the worker process, by map name
+_graphs = {}
+
+def quiet(function, *args, **kwargs):
+    """Call a function with its console output suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+def _init_worker(graphs):
+    """Keep the pickled graphs in the worker; forked workers inherit them for free."""
+    global _graphs
+    _graphs = graphs
+
+def run_scenario(scenario):
+    """
+    Run one headless scenario in a worker process.
+    
+    Every run unpickles a fresh copy of its map, which is much faster than
+    parsing the JSON file again.
+    
+    Args:
+        scenario (dict): Map name, robot count, seed, duration, task rate
+            and simulator options of the run
+    
+    Returns:
+        dict: The scenario's settings and its statistics
+    """
+    nav_graph = pickle.loads(_graphs[scenario['map']])
+    simulator_class = EventSimulator if scenario['event_driven'] else Simulator
+    simulator = simulator_class(nav_graph, seed=scenario['seed'],
+                                cooperative=scenario['cooperative'])
+    spawned = len(simulator.spawn_robots(scenario['robots']))
+    stats = simulator.run(scenario['duration'], task_rate=scenario['task_rate'])
+    simulator.close()
+    
+    row = dict(scenario)
+    row.update({
+        'spawned': spawned,
+        'tasks_completed': stats['tasks_completed'],
+        'throughput_per_minute': stats['throughput_per_minute'],
+        'deadlocks_resolved': stats['deadlocks_resolved'],
+        'mean_waiting_robots': stats['mean_waiting_robots'],
+        'batteries_emptied': stats['chargers']['emptied'],
+        'wall_time': stats['wall_time'],
+    })
+    
+    # With a task stream, tasks are scheduled and their waits measured
+    if scenario['task_rate'] is not None:
+        scheduler = stats['scheduler']
+        for metric in ('mean_wait_s', 'p95_wait_s', 'mean_lead_time_s'):
+            row[metric] = scheduler[metric]
+    return row
+
+def make_scenarios(args):
+    """
+    Expand the command line options into one scenario per run.
+    
+    Every run gets its own seed, derived from the base seed and the run's
+    position, so any single run can be repeated on its own.
+    
+    Returns:
+        list: Scenario dicts
+    """
+    scenarios = []
+    configs = itertools.product(args.maps, args.robots, args.task_rates)
+    for index, ((map_path, robots, task_rate), run) in enumerate(
+            itertools.product(configs, range(args.runs))):
+        scenarios.append({
+            'map': os.path.basename(map_path),
+            'robots': robots,
+            'task_rate': task_rate,
+            'run': run,
+            'seed': args.seed + index,
+            'duration': args.duration,
+            'event_driven': not args.fixed_step,
+            'cooperative': args.cooperative,
+        })
+    return scenarios
+
+def summarize(rows):
+    """
+    Aggregate runs that share a map, fleet size and task rate.
+    
+    Returns:
+        list: One summary dict per configuration, with the mean, 5th and
+            95th percentile of every metric
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['map'], row['robots'], row['task_rate']), []).append(row)
+    
+    summary = []
+    for (map_name, robots, task_rate), group in sorted(groups.items(), key=lambda item: (
+            item[0][0], item[0][1], -1 if item[0][2] is None else item[0][2])):
+        entry = {'map': map_name, 'robots': robots, 'task_rate': task_rate, 'runs': len(group)}
+        for metric in SUMMARY_METRICS:
+            values = np.array([row[metric] for row in group if row.get(metric) is not None])
+            if len(values) == 0:
+                continue
+            entry[f'{metric}_mean'] = float(values.mean())
+            entry[f'{metric}_p5'] = float(np.percentile(values, 5))
+            entry[f'{metric}_p95'] = float(np.percentile(values, 95))
+        summary.append(entry)
+    return summary
+
+def write_csv(path, rows):
+    """Write dicts as CSV rows, with the union of their keys as columns."""
+    columns = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main():
+    """Entry point of the scenario runner."""
+    parser = argparse.ArgumentParser(
+        description='Run randomized headless scenarios in parallel for capacity planning')
+    parser.add_argument('--maps', nargs='+',
+                        default=sorted(glob.glob(os.path.join(DATA_DIR, 'nav_graph_*.json'))),
+                        help='Navigation graph JSON files, by default the bundled ones')
+    parser.add_argument('--robots', type=int, nargs='+', default=[5, 10, 20],
+                        help='Fleet sizes')
+    parser.add_argument('--task_rates', type=float, nargs='+', default=None,
+                        help='Scheduled tasks per simulated hour; by default every robot '
+                             'is kept busy with random tasks')
+    parser.add_argument('--runs', type=int, default=10,
+                        help='Randomized runs per map, fleet size and task rate')
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='Simulated seconds per run')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Base random seed; run i uses seed + i')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes, by default one per CPU core')
+    parser.add_argument('--fixed_step', action='store_true',
+                        help='Step the simulation by a fixed time step instead of '
+                             'running it as a discrete-event simulation')
+    parser.add_argument('--cooperative', action='store_true',
+                        help='Plan robot paths against a space-time reservation table')
+    parser.add_argument('--output', type=str, default='scenario_runs.csv',
+                        help='Path of the CSV file with one row per run')
+    parser.add_argument('--summary', type=str, default='scenario_summary.csv',
+                        help='Path of the CSV file with one row per configuration')
+    
+    args = parser.parse_args()
+    if args.task_rates is None:
+        args.task_rates = [None]
+    
+    # Parse every map once; workers get a compact pickled copy
+    graphs = {}
+    for map_path in args.maps:
+        graphs[os.path.basename(map_path)] = pickle.dumps(quiet(NavGraph, map_path),
+                                                         protocol=pickle.HIGHEST_PROTOCOL)
+    
+    scenarios = make_scenarios(args)
+    print(f"Running {len(scenarios)} scenarios on {args.workers} workers ...")
+    
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(graphs,)) as executor:
+        futures = [executor.submit(run_scenario, scenario) for scenario in scenarios]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows.append(future.result())
+            if done % max(1, len(futures) // 20) == 0 or done == len(futures):
+                print(f"  {done}/{len(futures)} done ({time.perf_counter() - started:.1f} s)")
+    
+    rows.sort(key=lambda row: row['seed'])
+    write_csv(args.output, rows)
+    write_csv(args.summary, summarize(rows))
+    print(f"Wrote {args.output} and {args.summary}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 import pygame
 import time
+import numpy as np
+
+from src.models.graph_storage import NO_ROBOT
+from gui.text_cache import TextCache
 
 class FleetGUI:
     """GUI for the fleet management system using Pygame."""
@@ -23,7 +27,8 @@ class FleetGUI:
     
     MESSAGE_COLOR = (255, 100, 100)
     
-    def __init__(self, width, height, nav_graph, fleet_manager, traffic_manager):
+    def __init__(self, width, height, nav_graph, fleet_manager, traffic_manager, sim_clock=None,
+                 profiler=None):
         """
         Initialize the GUI.
         
@@ -33,12 +38,17 @@ class FleetGUI:
             nav_graph (NavGraph): Reference to the navigation graph
             fleet_manager (FleetManager): Reference to the fleet manager
             traffic_manager (TrafficManager): Reference to the traffic manager
+            sim_clock (SimulationClock): Clock stepping the simulation, whose
+                time scale the keyboard controls
+            profiler (Profiler): Profiler shown on the HUD
         """
         self.width = width
         self.height = height
         self.nav_graph = nav_graph
         self.fleet_manager = fleet_manager
         self.traffic_manager = traffic_manager
+        self.sim_clock = sim_clock
+        self.profiler = profiler
         
         # Initialize pygame
         pygame.init()
@@ -52,6 +62,7 @@ class FleetGUI:
         self.font_small = pygame.font.SysFont('Arial', 12)
         self.font_medium = pygame.font.SysFont('Arial', 16)
         self.font_large = pygame.font.SysFont('Arial', 24)
+        self.text_cache = TextCache()
         
         # Set up clock
         self.clock = pygame.time.Clock()
@@ -69,6 +80,23 @@ class FleetGUI:
         # For displaying logs
         self.logs = []
         self.max_logs = 10
+        
+        # Pre-rendered static scene, built on the first frame
+        self.background = None
+        self.vertex_layer = None
+        self.ui_layer = None
+        self.minimap_transform = None
+        
+        # Screen areas drawn over the background in the last frame
+        self.dirty_rects = []
+        
+        # Robot ID -> (status text, rendered status text) of the status panel
+        self.status_rows = {}
+        
+        # Profiler HUD lines, rendered again every hud_refresh seconds
+        self.hud_lines = []
+        self.hud_updated = 0.0
+        self.hud_refresh = 0.5
     
     def add_message(self, message):
         """
@@ -116,6 +144,26 @@ class FleetGUI:
                 elif event.key == pygame.K_a:
                     self.mode = "assign"
                     self.add_message("Mode: Assign Tasks")
+                
+                # Change the simulation speed
+                elif self.sim_clock is not None and event.key in (pygame.K_EQUALS, pygame.K_PLUS,
+                                                                  pygame.K_KP_PLUS):
+                    self.sim_clock.faster()
+                    self.add_message(f"Speed: {self.sim_clock.get_time_scale_text()}")
+                
+                elif self.sim_clock is not None and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.sim_clock.slower()
+                    self.add_message(f"Speed: {self.sim_clock.get_time_scale_text()}")
+                
+                elif self.sim_clock is not None and event.key == pygame.K_u:
+                    self.sim_clock.set_time_scale(1.0 if self.sim_clock.unthrottled else None)
+                    self.add_message(f"Speed: {self.sim_clock.get_time_scale_text()}")
+                
+                # Show or hide the profiler HUD
+                elif self.profiler is not None and event.key == pygame.K_h:
+                    enabled = self.profiler.toggle()
+                    self.hud_updated = 0.0
+                    self.add_message(f"Profiler: {'On' if enabled else 'Off'}")
             
             elif event.type == pygame.MOUSEMOTION:
                 # Handle hover effects
@@ -180,85 +228,140 @@ class FleetGUI:
                 # Get potential path to hover vertex
                 self.preview_path = self.nav_graph.get_shortest_path(current_vertex, self.hover_vertex)
     
+    def invalidate_background(self):
+        """Rebuild the pre-rendered background on the next frame."""
+        self.background = None
+    
     def render(self):
-        """Render the GUI."""
-        # Clear screen
-        self.screen.fill(self.WHITE)
+        """
+        Render the GUI.
         
-        # Draw lanes
-        self._draw_lanes()
+        The static graph is pre-rendered once, so each frame only restores
+        the areas drawn over in the last frame, draws the occupied lanes,
+        robots and UI on top and updates those areas of the display.
+        """
+        full_redraw = self.background is None
+        if full_redraw:
+            self._build_background()
+            self.screen.blit(self.background, (0, 0))
+        else:
+            # Erase what was drawn over the background in the last frame
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
         
-        # Draw vertices
-        self._draw_vertices()
+        # Draw occupied lanes
+        world_rects = self._draw_occupied_lanes()
+        
+        # Draw hovered vertex
+        if self.hover_vertex is not None:
+            world_rects.append(self._draw_vertex(self.screen, self.hover_vertex,
+                                                 self.VERTEX_HIGHLIGHT, 14))
         
         # Draw robots
-        self._draw_robots()
+        world_rects.extend(self._draw_robots())
         
         # Draw path preview
         if self.preview_path:
-            self._draw_path_preview()
+            world_rects.extend(self._draw_path_preview())
         
-        # Draw UI elements
-        self._draw_ui()
+        # Keep the instructions and minimap on top of the scene
+        for rect in world_rects:
+            self.screen.blit(self.ui_layer, rect, rect)
         
-        # Draw messages
-        self._draw_messages()
+        # Draw UI elements, messages and logs
+        ui_rects = self._draw_ui()
+        ui_rects.extend(self._draw_messages())
+        ui_rects.extend(self._draw_logs())
         
-        # Draw logs
-        self._draw_logs()
+        # Draw profiler HUD
+        if self.profiler is not None and self.profiler.enabled:
+            ui_rects.append(self._draw_hud())
         
-        # Update the display
-        pygame.display.flip()
+        # Update the display where this frame or the last one drew anything
+        rects = world_rects + ui_rects
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects + rects)
+        self.dirty_rects = rects
     
-    def _draw_lanes(self):
-        """Draw the lanes of the navigation graph."""
+    def _build_background(self):
+        """
+        Pre-render the parts of the scene that never change.
+        
+        The background holds the lanes, vertices, instructions and minimap
+        graph. Vertices and the static UI are also kept on transparent
+        layers of their own, so that they can be laid back over anything
+        drawn on top of the background.
+        """
+        size = (self.width, self.height)
+        self.background = pygame.Surface(size).convert()
+        self.background.fill(self.WHITE)
+        self.vertex_layer = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        self.ui_layer = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        
+        self._draw_lanes(self.background)
+        self._draw_vertices(self.vertex_layer)
+        self._draw_instructions(self.ui_layer)
+        self._draw_minimap(self.ui_layer)
+        
+        self.background.blit(self.vertex_layer, (0, 0))
+        self.background.blit(self.ui_layer, (0, 0))
+    
+    def _draw_lanes(self, surface):
+        """
+        Draw the lanes of the navigation graph.
+        
+        Args:
+            surface (pygame.Surface): Surface to draw on
+        """
         # First pass: draw all lane lines
         for lane in self.nav_graph.lanes:
-            from_vertex = lane['from_vertex']
-            to_vertex = lane['to_vertex']
-            
-            from_pos = self.nav_graph.get_scaled_position(from_vertex)
-            to_pos = self.nav_graph.get_scaled_position(to_vertex)
-            
-            # Determine lane color based on occupation
-            color = self.LANE_COLOR
-            width = 2
-            
-            if lane['occupying_robot'] is not None:
-                color = self.LANE_OCCUPIED
-                width = 3
-            
-            # Draw the lane with slightly thicker line
-            pygame.draw.line(self.screen, color, from_pos, to_pos, width)
+            from_pos = self.nav_graph.get_scaled_position(lane['from_vertex'])
+            to_pos = self.nav_graph.get_scaled_position(lane['to_vertex'])
+            pygame.draw.line(surface, self.LANE_COLOR, from_pos, to_pos, 2)
         
         # Second pass: draw all arrows (so they appear on top of crossing lines)
         for lane in self.nav_graph.lanes:
-            from_vertex = lane['from_vertex']
-            to_vertex = lane['to_vertex']
+            from_pos = self.nav_graph.get_scaled_position(lane['from_vertex'])
+            to_pos = self.nav_graph.get_scaled_position(lane['to_vertex'])
+            self._draw_arrow(surface, from_pos, to_pos, self.LANE_COLOR)
+    
+    def _draw_occupied_lanes(self):
+        """
+        Draw the lanes occupied by robots over the background.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        nav_graph = self.nav_graph
+        rects = []
+        for lane_id in np.flatnonzero(nav_graph.lane_occupant != NO_ROBOT).tolist():
+            from_pos = nav_graph.get_scaled_position(int(nav_graph.lane_from[lane_id]))
+            to_pos = nav_graph.get_scaled_position(int(nav_graph.lane_to[lane_id]))
             
-            from_pos = self.nav_graph.get_scaled_position(from_vertex)
-            to_pos = self.nav_graph.get_scaled_position(to_vertex)
+            rect = pygame.draw.line(self.screen, self.LANE_OCCUPIED, from_pos, to_pos, 3)
+            rect.union_ip(self._draw_arrow(self.screen, from_pos, to_pos, self.LANE_OCCUPIED))
             
-            # Determine lane color based on occupation
-            color = self.LANE_COLOR
-            if lane['occupying_robot'] is not None:
-                color = self.LANE_OCCUPIED
-                
-            # Draw an arrow to show direction
-            self._draw_arrow(from_pos, to_pos, color)
+            # Keep the vertices on top of the lane
+            self.screen.blit(self.vertex_layer, rect, rect)
+            rects.append(rect)
+        return rects
     
-    def _draw_arrow(self, start_pos, end_pos, color, arrow_size=8):
+    def _draw_arrow(self, surface, start_pos, end_pos, color, arrow_size=8):
         """
         Draw an arrow to indicate lane direction.
         
         Args:
+            surface (pygame.Surface): Surface to draw on
             start_pos (tuple): Starting position (x, y)
             end_pos (tuple): Ending position (x, y)
             color (tuple): RGB color
             arrow_size (int): Size of the arrow head
-        """
-        import numpy as np
         
+        Returns:
+            pygame.Rect: Area drawn over
+        """
         # Calculate direction vector
         dx = end_pos[0] - start_pos[0]
         dy = end_pos[1] - start_pos[1]
@@ -266,7 +369,7 @@ class FleetGUI:
         # Normalize
         length = ((dx ** 2) + (dy ** 2)) ** 0.5
         if length == 0:
-            return
+            return pygame.Rect(start_pos, (0, 0))
         
         dx /= length
         dy /= length
@@ -293,79 +396,100 @@ class FleetGUI:
         )
         
         # Draw arrow head
-        pygame.draw.polygon(self.screen, color, [arrow_pos, left_point, right_point])
+        return pygame.draw.polygon(surface, color, [arrow_pos, left_point, right_point])
     
-    def _draw_vertices(self):
-        """Draw the vertices of the navigation graph."""
+    def _draw_vertices(self, surface):
+        """
+        Draw the vertices of the navigation graph.
+        
+        Args:
+            surface (pygame.Surface): Surface to draw on
+        """
         for vertex in self.nav_graph.vertices:
-            vertex_id = vertex['id']
-            position = self.nav_graph.get_scaled_position(vertex_id)
-            
-            # Determine vertex color
-            color = self.VERTEX_COLOR
-            
-            # Highlight if hovering or if it's a charging station
-            if vertex_id == self.hover_vertex:
-                color = self.VERTEX_HIGHLIGHT
-                radius = 14  # Bigger when hovered
-            elif vertex.get('is_charger', False):
-                color = self.CHARGER_COLOR
-                radius = 12  # Slightly bigger for chargers
+            # Charging stations are slightly bigger
+            if vertex.get('is_charger', False):
+                self._draw_vertex(surface, vertex['id'], self.CHARGER_COLOR, 12)
             else:
-                radius = 10
-            
-            # Draw the vertex with outline for better visibility
-            pygame.draw.circle(self.screen, color, position, radius)
-            pygame.draw.circle(self.screen, self.BLACK, position, radius, 1)
+                self._draw_vertex(surface, vertex['id'], self.VERTEX_COLOR, 10)
+    
+    def _draw_vertex(self, surface, vertex_id, color, radius):
+        """
+        Draw a vertex with its ID and name.
+        
+        Args:
+            surface (pygame.Surface): Surface to draw on
+            vertex_id (int): Vertex ID
+            color (tuple): RGB fill color
+            radius (int): Radius of the vertex circle
+        
+        Returns:
+            pygame.Rect: Area drawn over
+        """
+        position = self.nav_graph.get_scaled_position(vertex_id)
+        name = self.nav_graph.vertices[vertex_id]['name']
+        
+        # Draw the vertex with outline for better visibility
+        rect = pygame.draw.circle(surface, color, position, radius)
+        pygame.draw.circle(surface, self.BLACK, position, radius, 1)
+        
+        # Draw vertex ID
+        id_text = self.text_cache.render(self.font_small, str(vertex_id), self.WHITE)
+        surface.blit(id_text, (position[0] - id_text.get_width() // 2, 
+                               position[1] - id_text.get_height() // 2))
+        
+        # Draw vertex name below
+        if name:
+            # Create a slightly darker background for better text visibility
+            name_text = self.text_cache.render(self.font_small, name, self.BLACK)
+            text_width = name_text.get_width()
+            text_height = name_text.get_height()
             
-            # Draw vertex ID
-            id_text = self.font_small.render(str(vertex_id), True, self.WHITE)
-            self.screen.blit(id_text, (position[0] - id_text.get_width() // 2, 
-                                      position[1] - id_text.get_height() // 2))
+            # Draw text background
+            bg_rect = pygame.Rect(
+                position[0] - text_width // 2 - 2,
+                position[1] + 12 - 2,
+                text_width + 4,
+                text_height + 4
+            )
+            pygame.draw.rect(surface, (240, 240, 240), bg_rect)
+            pygame.draw.rect(surface, self.DARK_GRAY, bg_rect, 1)
+            rect.union_ip(bg_rect)
             
-            # Draw vertex name below
-            if vertex['name']:
-                # Create a slightly darker background for better text visibility
-                name_text = self.font_small.render(vertex['name'], True, self.BLACK)
-                text_width = name_text.get_width()
-                text_height = name_text.get_height()
-                
-                # Draw text background
-                bg_rect = pygame.Rect(
-                    position[0] - text_width // 2 - 2,
-                    position[1] + 12 - 2,
-                    text_width + 4,
-                    text_height + 4
-                )
-                pygame.draw.rect(self.screen, (240, 240, 240), bg_rect)
-                pygame.draw.rect(self.screen, self.DARK_GRAY, bg_rect, 1)
-                
-                # Draw the name text
-                self.screen.blit(name_text, (position[0] - text_width // 2, 
-                                           position[1] + 12))
+            # Draw the name text
+            surface.blit(name_text, (position[0] - text_width // 2, 
+                                     position[1] + 12))
+        return rect
     
     def _draw_robots(self):
-        """Draw all robots."""
+        """
+        Draw all robots.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        rects = []
         for robot_id, robot in self.fleet_manager.robots.items():
             # Draw robot
             position = robot.position
             color = robot.color
             
             # Draw robot body
-            pygame.draw.circle(self.screen, color, position, 12)
+            rect = pygame.draw.circle(self.screen, color, position, 12)
             pygame.draw.circle(self.screen, self.ROBOT_OUTLINE, position, 12, 2)
             
             # Highlight selected robot
             if robot_id == self.selected_robot:
-                pygame.draw.circle(self.screen, self.WHITE, position, 16, 2)
+                rect = pygame.draw.circle(self.screen, self.WHITE, position, 16, 2)
             
             # Draw robot ID
-            id_text = self.font_small.render(str(robot_id), True, self.WHITE)
-            self.screen.blit(id_text, (position[0] - id_text.get_width() // 2, 
-                                      position[1] - id_text.get_height() // 2))
+            id_text = self.text_cache.render(self.font_small, str(robot_id), self.WHITE)
+            rect.union_ip(self.screen.blit(id_text, (position[0] - id_text.get_width() // 2, 
+                                                     position[1] - id_text.get_height() // 2)))
             
             # Draw robot state indicator
-            self._draw_robot_state(robot, position)
+            rect.union_ip(self._draw_robot_state(robot, position))
+            rects.append(rect)
+        return rects
     
     def _draw_robot_state(self, robot, position):
         """
@@ -374,6 +498,9 @@ class FleetGUI:
         Args:
             robot (Robot): Robot object
             position (tuple): Robot position (x, y)
+        
+        Returns:
+            pygame.Rect: Area drawn over
         """
         state = robot.state
         indicator_pos = (position[0], position[1] - 20)
@@ -393,13 +520,20 @@ class FleetGUI:
             color = (100, 100, 100)
         
         # Draw state indicator
-        pygame.draw.circle(self.screen, color, indicator_pos, 5)
+        rect = pygame.draw.circle(self.screen, color, indicator_pos, 5)
         pygame.draw.circle(self.screen, self.BLACK, indicator_pos, 5, 1)
+        return rect
     
     def _draw_path_preview(self):
-        """Draw the path preview for selected robot destination."""
+        """
+        Draw the path preview for selected robot destination.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        rects = []
         if not self.preview_path or len(self.preview_path) < 2:
-            return
+            return rects
         
         # Draw path segments
         for i in range(len(self.preview_path) - 1):
@@ -410,7 +544,8 @@ class FleetGUI:
             to_pos = self.nav_graph.get_scaled_position(to_vertex)
             
             # Draw line with dashed style
-            self._draw_dashed_line(from_pos, to_pos, (0, 100, 200))
+            rects.append(self._draw_dashed_line(from_pos, to_pos, (0, 100, 200)))
+        return rects
     
     def _draw_dashed_line(self, start_pos, end_pos, color, dash_length=5, gap_length=3):
         """
@@ -422,9 +557,10 @@ class FleetGUI:
             color (tuple): RGB color
             dash_length (int): Length of each dash
             gap_length (int): Length of each gap between dashes
-        """
-        import numpy as np
         
+        Returns:
+            pygame.Rect: Area drawn over
+        """
         # Calculate direction vector
         dx = end_pos[0] - start_pos[0]
         dy = end_pos[1] - start_pos[1]
@@ -441,6 +577,7 @@ class FleetGUI:
             dy /= distance
         
         # Draw dashes
+        rect = pygame.Rect(start_pos, (0, 0))
         for i in range(dash_count):
             start = i * (dash_length + gap_length)
             x1 = start_pos[0] + dx * start
@@ -450,49 +587,90 @@ class FleetGUI:
             x2 = start_pos[0] + dx * min(end, distance)
             y2 = start_pos[1] + dy * min(end, distance)
             
-            pygame.draw.line(self.screen, color, (x1, y1), (x2, y2), 2)
+            rect.union_ip(pygame.draw.line(self.screen, color, (x1, y1), (x2, y2), 2))
+        return rect
     
     def _draw_ui(self):
-        """Draw UI elements."""
+        """
+        Draw the UI elements that change between frames.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        rects = []
+        
         # Draw mode indicator
-        mode_text = self.font_medium.render(f"Mode: {'Spawn' if self.mode == 'spawn' else 'Assign'}", 
-                                           True, self.BLACK)
-        self.screen.blit(mode_text, (10, 10))
+        mode_text = self.text_cache.render(self.font_medium,
+                                           f"Mode: {'Spawn' if self.mode == 'spawn' else 'Assign'}",
+                                           self.BLACK)
+        rects.append(self.screen.blit(mode_text, (10, 10)))
+        
+        # Draw simulation speed and time
+        if self.sim_clock is not None:
+            minutes, seconds = divmod(int(self.sim_clock.time), 60)
+            hours, minutes = divmod(minutes, 60)
+            clock_text = self.text_cache.render(
+                self.font_medium,
+                f"Speed: {self.sim_clock.get_time_scale_text()}  "
+                f"Time: {hours:02d}:{minutes:02d}:{seconds:02d}",
+                self.BLACK)
+            rects.append(self.screen.blit(clock_text, (10 + mode_text.get_width() + 30, 10)))
+        
+        # Draw robots on the mini-map
+        rects.extend(self._draw_minimap_robots())
+        
+        # Draw robot statuses, as many as fit on the screen
+        status_y = 40
         
-        # Draw instructions
+        for robot_id, robot in self.fleet_manager.robots.items():
+            if status_y >= self.height:
+                break
+            color = robot.color
+            
+            # Draw status text with robot color indicator
+            rect = pygame.draw.circle(self.screen, color, (self.width - 20, status_y + 6), 6)
+            pygame.draw.circle(self.screen, self.BLACK, (self.width - 20, status_y + 6), 6, 1)
+            
+            # Only render the text again when the status changed
+            status = robot.get_status_display()
+            row = self.status_rows.get(robot_id)
+            if row is None or row[0] != status:
+                row = (status, self.font_small.render(status, True, self.BLACK))
+                self.status_rows[robot_id] = row
+            status_text = row[1]
+            
+            rect.union_ip(self.screen.blit(status_text, (self.width - 30 - status_text.get_width(), status_y)))
+            rects.append(rect)
+            status_y += 20
+        return rects
+    
+    def _draw_instructions(self, surface):
+        """
+        Draw the keyboard and mouse instructions.
+        
+        Args:
+            surface (pygame.Surface): Surface to draw on
+        """
         instructions = [
             "Press S: Switch to Spawn mode",
             "Press A: Switch to Assign mode",
             "Left Click: Spawn robot (in Spawn mode) or select/assign (in Assign mode)",
+            "+/-: Speed up/slow down simulation, U: Toggle unthrottled",
+            "H: Toggle profiler HUD",
             "ESC: Quit"
         ]
         
         for i, instruction in enumerate(instructions):
             text = self.font_small.render(instruction, True, self.DARK_GRAY)
-            self.screen.blit(text, (10, 40 + i * 20))
-        
-        # Draw mini-map overview
-        self._draw_minimap()
-        
-        # Draw robot statuses
-        statuses = self.fleet_manager.get_all_robot_statuses()
-        status_y = 40
-        
-        for robot_id, status in statuses.items():
-            if robot_id in self.fleet_manager.robots:
-                robot = self.fleet_manager.robots[robot_id]
-                color = robot.color
-                
-                # Draw status text with robot color indicator
-                pygame.draw.circle(self.screen, color, (self.width - 20, status_y + 6), 6)
-                pygame.draw.circle(self.screen, self.BLACK, (self.width - 20, status_y + 6), 6, 1)
-                
-                status_text = self.font_small.render(status, True, self.BLACK)
-                self.screen.blit(status_text, (self.width - 30 - status_text.get_width(), status_y))
-                status_y += 20
+            surface.blit(text, (10, 40 + i * 20))
     
-    def _draw_minimap(self):
-        """Draw a minimap overview of the entire graph."""
+    def _draw_minimap(self, surface):
+        """
+        Draw a minimap overview of the entire graph, without the robots.
+        
+        Args:
+            surface (pygame.Surface): Surface to draw on
+        """
         # Define minimap size and position
         minimap_width = 150
         minimap_height = 120
@@ -500,9 +678,9 @@ class FleetGUI:
         minimap_y = self.height - minimap_height - 10
         
         # Draw minimap background
-        pygame.draw.rect(self.screen, (240, 240, 240), 
+        pygame.draw.rect(surface, (240, 240, 240), 
                          (minimap_x, minimap_y, minimap_width, minimap_height))
-        pygame.draw.rect(self.screen, self.BLACK, 
+        pygame.draw.rect(surface, self.BLACK, 
                          (minimap_x, minimap_y, minimap_width, minimap_height), 1)
         
         # Calculate scaling for the minimap
@@ -517,6 +695,9 @@ class FleetGUI:
         y_offset = minimap_y + padding + (minimap_height - 2 * padding - 
                   (self.nav_graph.max_y - self.nav_graph.min_y) * scale) / 2
         
+        # Robots are drawn every frame with the same transform
+        self.minimap_transform = (x_offset, y_offset, scale)
+        
         # Draw lanes
         for lane in self.nav_graph.lanes:
             from_vertex = self.nav_graph.vertices[lane['from_vertex']]
@@ -527,7 +708,7 @@ class FleetGUI:
             to_x = x_offset + (to_vertex['x'] - self.nav_graph.min_x) * scale
             to_y = y_offset + (to_vertex['y'] - self.nav_graph.min_y) * scale
             
-            pygame.draw.line(self.screen, self.LANE_COLOR, (from_x, from_y), (to_x, to_y), 1)
+            pygame.draw.line(surface, self.LANE_COLOR, (from_x, from_y), (to_x, to_y), 1)
         
         # Draw vertices
         for vertex in self.nav_graph.vertices:
@@ -538,45 +719,101 @@ class FleetGUI:
             if vertex.get('is_charger', False):
                 color = self.CHARGER_COLOR
                 
-            pygame.draw.circle(self.screen, color, (x, y), 2)
-        
-        # Draw robots
-        for robot_id, robot in self.fleet_manager.robots.items():
-            # Get the real position and convert to minimap coordinates
-            vertex = self.nav_graph.vertices[robot.current_vertex]
-            x = x_offset + (vertex['x'] - self.nav_graph.min_x) * scale
-            y = y_offset + (vertex['y'] - self.nav_graph.min_y) * scale
-            
-            pygame.draw.circle(self.screen, robot.color, (x, y), 3)
+            pygame.draw.circle(surface, color, (x, y), 2)
         
         # Draw title
         title_text = self.font_small.render("Overview", True, self.BLACK)
-        self.screen.blit(title_text, (minimap_x + 5, minimap_y + 2))
+        surface.blit(title_text, (minimap_x + 5, minimap_y + 2))
+    
+    def _draw_minimap_robots(self):
+        """
+        Draw the robots on the minimap.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        x_offset, y_offset, scale = self.minimap_transform
+        nav_graph = self.nav_graph
+        rects = []
+        for robot in self.fleet_manager.robots.values():
+            # Get the real position and convert to minimap coordinates
+            vertex = robot.current_vertex
+            x = x_offset + (nav_graph.vertex_x[vertex] - nav_graph.min_x) * scale
+            y = y_offset + (nav_graph.vertex_y[vertex] - nav_graph.min_y) * scale
+            
+            rects.append(pygame.draw.circle(self.screen, robot.color, (x, y), 3))
+        return rects
     
     def _draw_messages(self):
-        """Draw notification messages."""
+        """
+        Draw notification messages.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
+        rects = []
         message_y = self.height - 30
         
         for message in reversed(self.messages):
-            text = self.font_medium.render(message['text'], True, self.MESSAGE_COLOR)
-            self.screen.blit(text, (self.width // 2 - text.get_width() // 2, message_y))
+            text = self.text_cache.render(self.font_medium, message['text'], self.MESSAGE_COLOR)
+            rects.append(self.screen.blit(text, (self.width // 2 - text.get_width() // 2, message_y)))
             message_y -= 25
+        return rects
     
     def _draw_logs(self):
-        """Draw log entries."""
+        """
+        Draw log entries.
+        
+        Returns:
+            list: Screen areas drawn over
+        """
         log_x = 10
         log_y = self.height - 150
         
         # Draw background
-        pygame.draw.rect(self.screen, self.LIGHT_GRAY, (log_x, log_y, 300, 120))
+        rect = pygame.draw.rect(self.screen, self.LIGHT_GRAY, (log_x, log_y, 300, 120))
         
         # Draw title
-        title_text = self.font_medium.render("Recent Events:", True, self.BLACK)
+        title_text = self.text_cache.render(self.font_medium, "Recent Events:", self.BLACK)
         self.screen.blit(title_text, (log_x + 5, log_y + 5))
         
         # Draw log entries
         entry_y = log_y + 30
         for log in self.logs:
-            text = self.font_small.render(log, True, self.BLACK)
-            self.screen.blit(text, (log_x + 10, entry_y))
+            text = self.text_cache.render(self.font_small, log, self.BLACK)
+            rect.union_ip(self.screen.blit(text, (log_x + 10, entry_y)))
             entry_y += 18
+        return [rect]
+    
+    def _draw_hud(self):
+        """
+        Draw the profiler HUD with frame phase times and counters.
+        
+        Returns:
+            pygame.Rect: Area drawn over
+        """
+        # The numbers change every frame, so only render them now and then
+        current_time = time.time()
+        if current_time - self.hud_updated >= self.hud_refresh:
+            self.hud_updated = current_time
+            report = self.profiler.get_report()
+            frame_ms = report['frame_ms']
+            lines = [f"Frame: {frame_ms:.1f} ms ({1e3 / frame_ms if frame_ms else 0.0:.0f} FPS)"]
+            for phase, ms in report['phases'].items():
+                lines.append(f"{phase}: {ms:.2f} ms")
+            for name, (total, rate) in report['counters'].items():
+                lines.append(f"{name}: {total} ({rate:.0f}/s)")
+            self.hud_lines = [self.font_small.render(line, True, self.WHITE) for line in lines]
+        
+        # Draw background
+        hud_width = 260
+        rect = pygame.Rect(self.width // 2 - hud_width // 2, 10, hud_width,
+                           10 + 16 * len(self.hud_lines))
+        pygame.draw.rect(self.screen, self.DARK_GRAY, rect)
+        
+        # Draw lines
+        line_y = rect.y + 5
+        for text in self.hud_lines:
+            self.screen.blit(text, (rect.x + 8, line_y))
+            line_y += 16
+        return rect
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+class TextCache:
+    """
+    Least-recently-used cache of rendered text surfaces.
+    
+    Rendering text is the most expensive part of drawing a frame, while the
+    labels on screen (vertex and robot IDs, log lines, messages) rarely
+    change. Surfaces are cached by font, text and color, and the least
+    recently used ones are dropped once the cache is full.
+    """
+    
+    def __init__(self, max_entries=512):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries (int): Maximum number of cached surfaces
+        """
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, font, text, color):
+        """
+        Get an anti-aliased rendering of a text.
+        
+        Args:
+            font (pygame.font.Font): Font to render with
+            text (str): Text to render
+            color (tuple): RGB text color
+        
+        Returns:
+            pygame.Surface: Rendered text; must not be drawn on, as it is shared
+        """
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def clear(self):
+        """Drop every cached surface."""
+        self.surfaces.clear()
@@ -0,0 +1,244 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from ..models.graph_storage import NO_ROBOT
+from ..models.robot import Robot
+from ..utils.backoff import RetryBackoff
+
+class ChargerScheduler:
+    """
+    Sends robots with low batteries to chargers and queues them for one.
+    
+    Every charger serves one robot at a time. A robot whose battery runs
+    low goes to the charger it can reach fastest among the free ones, read
+    from the navigation graph's cached distance fields; when every charger
+    is taken it waits in a first-come, first-served queue and is sent to
+    the next charger that frees up. Robots busy with a task finish it
+    first. Robots that finish charging are handed back to the task
+    scheduler.
+    """
+    
+    def __init__(self, fleet_manager):
+        """
+        Initialize the charger scheduler.
+        
+        Args:
+            fleet_manager (FleetManager): Fleet whose robots are charged
+        """
+        self.fleet_manager = fleet_manager
+        self.nav_graph = fleet_manager.nav_graph
+        self.chargers = np.flatnonzero(self.nav_graph.vertex_is_charger).tolist()
+        
+        self.charger_robot = {}  # charger vertex -> robot heading there or charging
+        self.robot_charger = {}  # robot ID -> charger vertex
+        self.queue = deque()     # robot IDs waiting for a free charger
+        self.queued_since = {}   # robot ID -> time it joined the queue
+        self.time = 0.0
+        
+        # Robots that stopped somewhere since the last update, and robots
+        # that could not be sent to their charger yet, retried with backoff
+        self.arrived = []
+        self.unsent = RetryBackoff()
+        
+        # Metrics
+        self.sessions = 0
+        self.emptied = 0
+        self.max_queue_length = 0
+        self.queue_times = []  # Seconds spent queueing for a charger
+        
+        fleet_manager.add_state_listener(self._on_robot_state_change)
+    
+    def needs_charge(self, robot):
+        """
+        Check whether a robot's battery is below the low level.
+        
+        Args:
+            robot (Robot): Robot to check
+        
+        Returns:
+            bool: True if the robot should go and charge
+        """
+        return robot.battery < robot.fleet_state.battery_model.low_level
+    
+    def claim(self, robot_id):
+        """
+        Take a robot that just became free if it needs to charge.
+        
+        Args:
+            robot_id (int): ID of a robot without a task
+        
+        Returns:
+            bool: True if the robot is queued for, heading to or on a
+                charger and must not be given a task
+        """
+        if robot_id in self.robot_charger or robot_id in self.queued_since:
+            return True
+        robot = self.fleet_manager.robots[robot_id]
+        if robot.state == Robot.CHARGING or not self.needs_charge(robot):
+            return False
+        self.request(robot)
+        return True
+    
+    def request(self, robot):
+        """
+        Send a robot to the fastest free charger, or queue it.
+        
+        Args:
+            robot (Robot): Robot to charge
+        """
+        self.fleet_manager.task_scheduler.free_robots.discard(robot.id)
+        charger = self._nearest_free_charger(robot)
+        if charger is None:
+            if robot.id not in self.queued_since:
+                self.queue.append(robot.id)
+                self.queued_since[robot.id] = self.time
+                self.max_queue_length = max(self.max_queue_length, len(self.queue))
+                self.fleet_manager.log_event(f"robot_{robot.id}", "Queued for a charger",
+                                             battery=robot.battery)
+            return
+        self._send(robot, charger)
+    
+    def _nearest_free_charger(self, robot):
+        """Get the free charger a robot reaches fastest, or None."""
+        nearest, nearest_time = None, math.inf
+        occupants = self.nav_graph.vertex_occupant
+        for charger in self.chargers:
+            # Chargers reserved for or held by another robot are taken
+            occupant = int(occupants[charger])
+            if charger in self.charger_robot or occupant not in (NO_ROBOT, robot.id):
+                continue
+            time = float(self.nav_graph.get_distance_field(charger)[robot.current_vertex])
+            if time < nearest_time:
+                nearest, nearest_time = charger, time
+        return nearest
+    
+    def _send(self, robot, charger):
+        """Reserve a charger for a robot and drive it there."""
+        self.charger_robot[charger] = robot.id
+        self.robot_charger[robot.id] = charger
+        self.fleet_manager.log_event(f"robot_{robot.id}", f"Sent to charger at vertex {charger}",
+                                     battery=robot.battery)
+        
+        if robot.current_vertex == charger and robot.state in (Robot.IDLE, Robot.COMPLETED):
+            # Already there: start charging in the next update
+            robot.fleet_state.active[robot.slot] = True
+            return
+        if not self.fleet_manager.assign_batch([(robot.id, charger)])[robot.id]:
+            # Busy robots end up here too and are sent once they stop
+            self.unsent.failed(robot.id, self.time)
+    
+    def _release(self, robot_id):
+        """Free the charger reserved for a robot and serve the queue."""
+        charger = self.robot_charger.pop(robot_id, None)
+        if charger is None:
+            return
+        del self.charger_robot[charger]
+        self.unsent.discard(robot_id)
+        
+        while self.queue:
+            robot_id = self.queue.popleft()
+            self.queue_times.append(self.time - self.queued_since.pop(robot_id))
+            if robot_id in self.robot_charger:
+                # Topped up on a charger it came across meanwhile
+                continue
+            # A robot that is busy, e.g. backing off for another robot,
+            # keeps the charger and is sent there once it stops
+            self._send(self.fleet_manager.robots[robot_id], charger)
+            return
+    
+    def _on_robot_state_change(self, robot_id, old_state, new_state):
+        """Track robots arriving somewhere, starting and leaving a charger."""
+        if new_state == Robot.COMPLETED:
+            self.arrived.append(robot_id)
+        elif new_state == Robot.CHARGING:
+            # Robots also top up on chargers they were not sent to; a robot
+            # heading there then needs another charger
+            charger = self.fleet_manager.robots[robot_id].current_vertex
+            if self.robot_charger.get(robot_id) != charger:
+                self._release(robot_id)
+                other = self.charger_robot.pop(charger, None)
+                self.charger_robot[charger] = robot_id
+                self.robot_charger[robot_id] = charger
+                if other is not None:
+                    del self.robot_charger[other]
+                    self.unsent.discard(other)
+                    self.request(self.fleet_manager.robots[other])
+        elif old_state == Robot.CHARGING:
+            self.sessions += 1
+            self._release(robot_id)
+            robot = self.fleet_manager.robots[robot_id]
+            if robot.state == Robot.IDLE and not robot.needs_update():
+                self.fleet_manager.task_scheduler.add_free_robot(robot_id)
+    
+    def update(self, delta_time, ran_low, emptied):
+        """
+        Send robots that ran low to charge and retry failed trips that are due.
+        
+        Args:
+            delta_time (float): Time elapsed since last update in seconds
+            ran_low (list): Robots whose battery ran low this step
+            emptied (int): Number of batteries that ran empty this step
+        """
+        self.time += delta_time
+        self.emptied += emptied
+        
+        # Robots without a task go now, the others once their task is done
+        free_robots = self.fleet_manager.task_scheduler.free_robots
+        for robot in ran_low:
+            if robot.id in free_robots and robot.state in (Robot.IDLE, Robot.COMPLETED):
+                self.claim(robot.id)
+        
+        # A robot that stopped anywhere but at its charger was rerouted
+        resend = []
+        arrived, self.arrived = self.arrived, []
+        for robot_id in arrived:
+            charger = self.robot_charger.get(robot_id)
+            robot = self.fleet_manager.robots[robot_id]
+            if charger is not None and robot.current_vertex != charger:
+                resend.append(robot_id)
+        
+        # Robots that could not be sent before are retried less often the
+        # longer it keeps failing
+        for robot_id in self.unsent.pop_due(self.time):
+            if robot_id in self.robot_charger and robot_id not in resend:
+                resend.append(robot_id)
+        
+        if resend:
+            results = self.fleet_manager.assign_batch(
+                [(robot_id, self.robot_charger[robot_id]) for robot_id in resend])
+            claimed = self.fleet_manager.last_claimed
+            for robot_id in resend:
+                if results[robot_id]:
+                    self.unsent.discard(robot_id)
+                elif robot_id in claimed:
+                    # Not a planning failure, so retry without backing off
+                    self.unsent.requeue(robot_id, self.time)
+                else:
+                    self.unsent.failed(robot_id, self.time)
+    
+    def get_metrics(self):
+        """
+        Get charger usage statistics.
+        
+        Returns:
+            dict: Charger count, robots charging, heading to a charger and
+                queued, finished charging sessions, batteries that ran
+                empty, the longest queue, and mean and 95th percentile of
+                the time spent queueing in seconds
+        """
+        charging = sum(1 for robot_id in self.robot_charger
+                       if self.fleet_manager.robots[robot_id].state == Robot.CHARGING)
+        queue_times = np.asarray(self.queue_times)
+        return {
+            'chargers': len(self.chargers),
+            'charging': charging,
+            'heading': len(self.robot_charger) - charging,
+            'queued': len(self.queue),
+            'sessions': self.sessions,
+            'emptied': self.emptied,
+            'max_queue_length': self.max_queue_length,
+            'mean_queue_s': float(queue_times.mean()) if len(queue_times) else 0.0,
+            'p95_queue_s': float(np.percentile(queue_times, 95)) if len(queue_times) else 0.0,
+        }
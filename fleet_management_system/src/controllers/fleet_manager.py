@@ -1,24 +1,54 @@
-import time
 import random
+from ..models.fleet_state import FleetState
 from ..models.robot import Robot
+from ..utils.event_logger import EventLogger
+from ..utils.spatial_index import GridIndex
+from .task_scheduler import TaskScheduler
+from .charger_scheduler import ChargerScheduler
 
 class FleetManager:
     """Manager for robot fleet operations and task assignment."""
     
-    def __init__(self, nav_graph, log_file_path):
+    def __init__(self, nav_graph, log_file_path, log_format='text', log_level='DEBUG',
+                 battery_model=None):
         """
         Initialize the fleet manager.
         
         Args:
             nav_graph (NavGraph): Reference to the navigation graph
-            log_file_path (str): Path to the log file
+            log_file_path (str): Path to the log file, or None to disable logging
+            log_format (str): 'text' lines or structured 'json' lines
+            log_level (str): Lowest level logged; robot state changes are
+                'DEBUG', so 'INFO' leaves them out
+            battery_model (BatteryModel): Battery parameters of the robots,
+                by default BatteryModel()
         """
         self.nav_graph = nav_graph
         self.robots = {}
+        self.fleet_state = FleetState(battery_model=battery_model)
+        
+        # Grid index over robot positions, rebuilt lazily once robots moved
+        self.robot_index = GridIndex(cell_size=20)
+        self._robot_index_version = None
         self.next_robot_id = 0
         self.selected_robot = None
         self.log_file_path = log_file_path
         
+        # Optional cooperative planner (e.g. TrafficManager) used for tasks
+        self.path_planner = None
+        
+        # Robots of the last batch that were not assigned because another
+        # robot of the batch claimed their destination: robot ID -> claiming robot ID
+        self.last_claimed = {}
+        
+        # Callbacks notified when a robot changes state during update()
+        self.state_listeners = []
+        
+        # Queue of tasks dispatched to robots as they become free, and
+        # chargers robots with low batteries are sent to
+        self.task_scheduler = TaskScheduler(self)
+        self.charger_scheduler = ChargerScheduler(self)
+        
         # Define a set of visually distinct colors for robots
         self.robot_colors = [
             (255, 0, 0),    # Red
@@ -36,31 +66,38 @@ class FleetManager:
         ]
         
         # Initialize logging
-        self._init_logging()
+        self.logger = None
+        self._init_logging(log_format, log_level)
     
-    def _init_logging(self):
-        """Initialize the log file."""
+    def _init_logging(self, log_format, log_level):
+        """Initialize the log file and its background writer."""
+        if self.log_file_path is None:
+            return
         try:
-            with open(self.log_file_path, 'w') as f:
-                f.write(f"=== Fleet Management System Log - {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+            self.logger = EventLogger(self.log_file_path, log_format=log_format, level=log_level)
             self.log_event("system", "Fleet Management System initialized")
-        except Exception as e:
+        except OSError as e:
             print(f"Error initializing log file: {e}")
     
-    def log_event(self, source, message):
+    def log_event(self, source, message, level='INFO', **fields):
         """
         Log an event to the log file.
         
+        The event is only queued here; a background thread writes it.
+        
         Args:
             source (str): Source of the event (e.g., robot ID, system)
             message (str): Event message
+            level (str): Log level of the event
+            **fields: Extra values stored with the event in the JSON format
         """
-        try:
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.log_file_path, 'a') as f:
-                f.write(f"[{timestamp}] [{source}] {message}\n")
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
+        if self.logger is not None:
+            self.logger.log(source, message, level, **fields)
+    
+    def shutdown(self):
+        """Write out every pending log event and close the log file."""
+        if self.logger is not None:
+            self.logger.close()
     
     def spawn_robot(self, vertex_id):
         """
@@ -82,7 +119,8 @@ class FleetManager:
         robot_color = self.robot_colors[color_index]
         
         # Create new robot
-        robot = Robot(self.next_robot_id, vertex_id, self.nav_graph, robot_color)
+        robot = Robot(self.next_robot_id, vertex_id, self.nav_graph, robot_color,
+                      fleet_state=self.fleet_state)
         self.robots[self.next_robot_id] = robot
         
         # Log the event
@@ -91,6 +129,7 @@ class FleetManager:
         # Increment robot ID counter
         current_id = self.next_robot_id
         self.next_robot_id += 1
+        self.task_scheduler.add_free_robot(current_id)
         
         return current_id
     
@@ -106,16 +145,10 @@ class FleetManager:
         Returns:
             int or None: Selected robot ID if found, None otherwise
         """
-        min_distance = tolerance
         selected = None
-        
-        for robot_id, robot in self.robots.items():
-            rx, ry = robot.position
-            distance = ((rx - x) ** 2 + (ry - y) ** 2) ** 0.5
-            
-            if distance < min_distance:
-                min_distance = distance
-                selected = robot_id
+        slot = self.get_robot_index().query_nearest(x, y, tolerance)
+        if slot is not None:
+            selected = self.fleet_state.robots[slot].id
         
         if selected is not None:
             self.selected_robot = selected
@@ -123,6 +156,23 @@ class FleetManager:
         
         return selected
     
+    def get_robot_index(self):
+        """
+        Get the grid index over robot positions, indexed by fleet slot.
+        
+        The index is only rebuilt when a robot moved since the last call,
+        so repeated queries between updates are cheap.
+        
+        Returns:
+            GridIndex: Index whose point IDs are FleetState slots
+        """
+        fleet_state = self.fleet_state
+        if self._robot_index_version != fleet_state.version:
+            n = fleet_state.size
+            self.robot_index.build(fleet_state.pos_x[:n], fleet_state.pos_y[:n])
+            self._robot_index_version = fleet_state.version
+        return self.robot_index
+    
     def assign_navigation_task(self, destination_vertex):
         """
         Assign a navigation task to the selected robot.
@@ -139,7 +189,7 @@ class FleetManager:
         robot = self.robots[self.selected_robot]
         
         # Try to assign the task
-        success = robot.assign_task(destination_vertex)
+        success = robot.assign_task(destination_vertex, planner=self.path_planner)
         
         if success:
             # Log the task assignment
@@ -152,20 +202,142 @@ class FleetManager:
                           f"Failed to assign navigation task to vertex {destination_vertex}")
             return False
     
+    def assign_batch(self, assignments, time_budget=1.0, suboptimality=1.0):
+        """
+        Assign navigation tasks to several robots at once.
+        
+        With a cooperative planner the batch is planned jointly, so the
+        robots' paths are conflict-free; otherwise each robot takes its own
+        fastest path.
+        
+        Args:
+            assignments (list): (robot ID, destination vertex ID) pairs
+            time_budget (float): Seconds allowed for joint planning
+            suboptimality (float): Cost bound for joint planning, 1.0 for optimal
+        
+        Returns:
+            dict: Robot ID -> True if its task was assigned, False otherwise;
+                robots that failed because another robot of the batch claimed
+                their destination are listed in last_claimed
+        """
+        requests = []
+        for robot_id, destination_vertex in assignments:
+            robot = self.robots.get(robot_id)
+            if robot is not None and robot.state in (robot.IDLE, robot.COMPLETED):
+                requests.append((robot_id, robot.current_vertex, destination_vertex))
+        
+        if self.path_planner is not None:
+            paths = self.path_planner.plan_batch(requests, time_budget=time_budget,
+                                                 suboptimality=suboptimality)
+            wait_step_duration = self.path_planner.step_duration
+            self.last_claimed = dict(self.path_planner.last_claimed)
+        else:
+            paths = {robot_id: self.nav_graph.get_shortest_path(start_vertex, goal_vertex)
+                     for robot_id, start_vertex, goal_vertex in requests}
+            wait_step_duration = None
+            self.last_claimed = {}
+        
+        results = {robot_id: False for robot_id, _ in assignments}
+        for robot_id, start_vertex, goal_vertex in requests:
+            path = paths.get(robot_id)
+            robot = self.robots[robot_id]
+            if path is not None and robot.follow_path(path, wait_step_duration):
+                results[robot_id] = True
+                self.log_event(f"robot_{robot_id}",
+                               f"Assigned navigation task from vertex {start_vertex} to {goal_vertex}")
+            elif robot_id in self.last_claimed:
+                self.log_event(f"robot_{robot_id}",
+                               f"Failed to assign navigation task to vertex {goal_vertex}: "
+                               f"goal already claimed by robot {self.last_claimed[robot_id]}")
+            else:
+                self.log_event(f"robot_{robot_id}",
+                               f"Failed to assign navigation task to vertex {goal_vertex}")
+        
+        return results
+    
+    def add_task(self, destination_vertex, pickup_vertex=None, priority=0, deadline=None):
+        """
+        Queue a task for the next free robot.
+        
+        Queued tasks are dispatched to free robots during update().
+        
+        Args:
+            destination_vertex (int): Destination (dropoff) vertex ID
+            pickup_vertex (int): Vertex to visit first, or None for a plain
+                navigation task
+            priority (int): Dispatch priority, higher goes first
+            deadline (float): Simulated time by which the task should be
+                completed, or None for no deadline
+        
+        Returns:
+            int: Task ID
+        """
+        stops = [destination_vertex] if pickup_vertex is None else [pickup_vertex, destination_vertex]
+        return self.task_scheduler.submit(stops, priority=priority, deadline=deadline)
+    
+    def add_state_listener(self, callback):
+        """
+        Register a callback for robot state changes.
+        
+        Args:
+            callback (callable): Called as callback(robot_id, old_state,
+                new_state) whenever a robot changes state during update()
+        """
+        self.state_listeners.append(callback)
+    
     def update(self, delta_time):
         """
         Update all robots and handle events.
         
+        Moving robots are advanced together in one vectorized step, and only
+        the robots that arrived or have something to do run Python code.
+        
         Args:
             delta_time (float): Time elapsed since last update in seconds
         """
-        for robot_id, robot in self.robots.items():
-            status_update = robot.update(delta_time)
-            
-            # Log significant events
-            if status_update['event']:
-                self.log_event(f"robot_{robot_id}", 
-                              f"State: {status_update['state']}, Event: {status_update['event']}")
+        fleet_state = self.fleet_state
+        active_robots = fleet_state.get_active_robots()
+        
+        for robot in fleet_state.step_moving(delta_time):
+            self.apply_status(robot, robot.MOVING, robot.arrive())
+        
+        for robot in active_robots:
+            old_state = robot.state
+            self.apply_status(robot, old_state, robot.update(delta_time))
+        
+        # Charge and drain batteries; full robots leave their chargers
+        ran_low, charged, emptied = fleet_state.update_batteries(delta_time)
+        for robot in charged:
+            self.apply_status(robot, robot.CHARGING, robot.finish_charging())
+        self.charger_scheduler.update(delta_time, ran_low, emptied)
+        
+        # Move robots on to their next stops and hand out queued tasks
+        self.task_scheduler.update(delta_time)
+    
+    def apply_status(self, robot, old_state, status_update):
+        """
+        Log a robot's status update and notify listeners of state changes.
+        
+        Called for every status update of a robot, including updates made
+        outside update() by event-driven simulators.
+        
+        Args:
+            robot (Robot): Robot that was updated
+            old_state (str): Robot state before the update
+            status_update (dict): Status returned by the robot's update
+        """
+        self.fleet_state.active[robot.slot] = robot.needs_update()
+        
+        if robot.state != old_state:
+            for callback in self.state_listeners:
+                callback(robot.id, old_state, robot.state)
+        
+        # Log significant events
+        if status_update['event'] and self.logger is not None and self.logger.is_enabled('DEBUG'):
+            self.log_event(f"robot_{robot.id}", 
+                          f"State: {status_update['state']}, Event: {status_update['event']}",
+                          'DEBUG', robot_id=robot.id, state=status_update['state'],
+                          event=status_update['event'])
     
     def get_all_robot_statuses(self):
         """
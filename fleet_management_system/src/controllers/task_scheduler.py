@@ -0,0 +1,323 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from ..models.robot import Robot
+from ..models.task import Task
+from ..planning.assignment import match_finite
+from ..utils.backoff import RetryBackoff
+
+class TaskScheduler:
+    """
+    Queue of transport tasks dispatched to free robots.
+    
+    Pending tasks wait in a heap ordered by priority and deadline. The
+    scheduler only reacts to events: robots finishing a stop, robots
+    spawning and tasks being submitted. A robot finishing a stop goes
+    straight on to the task's next stop, and a robot finishing its task
+    rejoins the free robots. Whenever there are both pending tasks and
+    free robots, the most urgent tasks are matched to the free robots with
+    the least total travel time to their next stops.
+    """
+    
+    def __init__(self, fleet_manager):
+        """
+        Initialize the task scheduler.
+        
+        Args:
+            fleet_manager (FleetManager): Fleet whose robots run the tasks
+        """
+        self.fleet_manager = fleet_manager
+        self.nav_graph = fleet_manager.nav_graph
+        self.time = 0.0  # Simulated seconds so far
+        
+        self.tasks = {}           # task ID -> Task, pending and active
+        self.pending = []         # heap of (sort key, sequence, Task)
+        self.active = {}          # robot ID -> Task it is working on
+        self.free_robots = set()  # robots without a task, as far as we know
+        self.next_task_id = 0
+        self._sequence = itertools.count()
+        
+        # Robots that reached a stop since the last update, and robots
+        # whose next stop could not be planned yet, retried with backoff
+        self.arrived = []
+        self.stalled = RetryBackoff()
+        self._dispatch_due = False
+        
+        # Metrics of completed tasks
+        self.submitted = 0
+        self.completed = 0
+        self.late = 0
+        self.wait_times = []  # Seconds from submission to dispatch
+        self.lead_times = []  # Seconds from submission to completion
+        
+        fleet_manager.add_state_listener(self._on_robot_state_change)
+    
+    def submit(self, stops, priority=0, deadline=None):
+        """
+        Add a task to the queue.
+        
+        Args:
+            stops (list): Vertex IDs to visit in order, e.g. [pickup, dropoff]
+            priority (int): Dispatch priority, higher goes first
+            deadline (float): Simulated time by which the task should be
+                completed, or None for no deadline
+        
+        Returns:
+            int: Task ID
+        """
+        task = Task(self.next_task_id, stops, priority, deadline, created_time=self.time)
+        self.next_task_id += 1
+        self.tasks[task.id] = task
+        self._push(task)
+        self.submitted += 1
+        self._dispatch_due = True
+        
+        self.fleet_manager.log_event("scheduler", f"Queued task {task.id} with stops {task.stops}",
+                                     'DEBUG', task_id=task.id, priority=priority)
+        return task.id
+    
+    def add_free_robot(self, robot_id):
+        """
+        Make a robot available for dispatch, e.g. after it spawned.
+        
+        Robots that need to charge first are left to the charger scheduler.
+        
+        Args:
+            robot_id (int): Robot ID
+        """
+        if robot_id in self.active or self.fleet_manager.charger_scheduler.claim(robot_id):
+            return
+        self.free_robots.add(robot_id)
+        self._dispatch_due = True
+    
+    def _push(self, task):
+        """Put a task into the pending heap."""
+        task.state = Task.PENDING
+        heapq.heappush(self.pending, (task.sort_key(), next(self._sequence), task))
+    
+    def _on_robot_state_change(self, robot_id, old_state, new_state):
+        """Remember robots that finished driving, to be handled in update()."""
+        if new_state == Robot.COMPLETED:
+            self.arrived.append(robot_id)
+    
+    def update(self, delta_time):
+        """
+        Advance tasks of robots that arrived and dispatch pending tasks.
+        
+        Only robots that changed state, and stalled robots whose retry is
+        due, are looked at, so the cost of an update does not grow with the
+        size of the fleet or the queue.
+        
+        Args:
+            delta_time (float): Time elapsed since last update in seconds
+        """
+        self.time += delta_time
+        
+        next_stops = []
+        arrived, self.arrived = self.arrived, []
+        for robot_id in arrived:
+            robot = self.fleet_manager.robots[robot_id]
+            task = self.active.get(robot_id)
+            if task is None:
+                self.add_free_robot(robot_id)
+                continue
+            if robot.current_vertex == task.current_stop:
+                task.next_stop += 1
+            self._continue_task(robot, task, next_stops)
+        
+        # Retry robots whose next stop could not be planned before, less
+        # often the longer it keeps failing, together with the stalled
+        # robots in their way
+        arriving = {robot_id for robot_id, _ in next_stops}
+        for robot_id in self.stalled.pop_due(self.time):
+            task = self.active.get(robot_id)
+            if task is not None and robot_id not in arriving:
+                next_stops.append((robot_id, task.current_stop))
+        
+        if next_stops:
+            self._add_blockers(next_stops)
+            results = self.fleet_manager.assign_batch(next_stops)
+            claimed = self.fleet_manager.last_claimed
+            for robot_id, _ in next_stops:
+                if results[robot_id]:
+                    self.stalled.discard(robot_id)
+                elif robot_id in claimed:
+                    # Another robot of the batch heads for the same stop first
+                    self.stalled.requeue(robot_id, self.time)
+                else:
+                    self.stalled.failed(robot_id, self.time)
+        
+        if self._dispatch_due and self.pending and self.free_robots:
+            self._dispatch_due = False
+            self.dispatch()
+    
+    def _add_blockers(self, next_stops):
+        """
+        Add stalled robots standing on the way of a batch to the batch.
+        
+        Two stalled robots that each need the other's vertex, e.g. one on a
+        cut vertex and one on its stop behind it, fail every retry on their
+        own, so they are planned jointly with their own next stops instead.
+        
+        Args:
+            next_stops (list): (robot ID, stop vertex ID) pairs, extended in
+                place; robots added are checked for blockers in turn
+        """
+        robots = self.fleet_manager.robots
+        vertex_occupant = self.nav_graph.vertex_occupant
+        batch = {robot_id for robot_id, _ in next_stops}
+        for robot_id, stop in next_stops:
+            path = self.nav_graph.get_shortest_path(robots[robot_id].current_vertex, stop)
+            for vertex in path or ():
+                blocker = int(vertex_occupant[vertex])
+                if (blocker in batch or blocker not in self.stalled or blocker not in self.active or
+                        robots[blocker].state not in (Robot.IDLE, Robot.COMPLETED)):
+                    continue
+                batch.add(blocker)
+                next_stops.append((blocker, self.active[blocker].current_stop))
+    
+    @staticmethod
+    def _skip_visited(task, vertex):
+        """Get the index of the first remaining stop of a task away from a vertex."""
+        # Stops at the robot's vertex count as visited right away
+        next_stop = task.next_stop
+        while next_stop < len(task.stops) and task.stops[next_stop] == vertex:
+            next_stop += 1
+        return next_stop
+    
+    def _continue_task(self, robot, task, next_stops):
+        """Send a robot on to its task's next stop, or finish the task."""
+        task.next_stop = self._skip_visited(task, robot.current_vertex)
+        if task.current_stop is not None:
+            next_stops.append((robot.id, task.current_stop))
+            return
+        
+        task.state = Task.COMPLETED
+        task.completed_time = self.time
+        del self.active[robot.id]
+        robot.task_id = None
+        # A robot that finished on a charger may top up there now
+        robot.fleet_state.active[robot.slot] = robot.needs_update()
+        del self.tasks[task.id]
+        self.completed += 1
+        self.late += task.is_late()
+        self.lead_times.append(task.completed_time - task.created_time)
+        self.fleet_manager.log_event(f"robot_{robot.id}", f"Completed task {task.id}",
+                                     task_id=task.id, late=task.is_late())
+        self.add_free_robot(robot.id)
+    
+    def dispatch(self):
+        """
+        Match the most urgent pending tasks to the free robots.
+        
+        The number of tasks taken from the queue is the number of free
+        robots, so lower priorities never overtake higher ones. The
+        matching minimizes the total travel time to the stops the robots
+        would be sent to; tasks no free robot can reach, or whose robot
+        could not be planned, go back into the queue unchanged.
+        
+        Returns:
+            int: Number of tasks dispatched
+        """
+        robots = []
+        for robot_id in list(self.free_robots):
+            robot = self.fleet_manager.robots[robot_id]
+            if (robot.state in (Robot.IDLE, Robot.COMPLETED) and
+                    (not robot.path or robot.current_path_index >= len(robot.path) - 1)):
+                robots.append(robot)
+            else:
+                # Busy with a task given by hand; it comes back when done
+                self.free_robots.discard(robot_id)
+        if not robots:
+            return 0
+        
+        tasks = [heapq.heappop(self.pending)[2] for _ in range(min(len(robots), len(self.pending)))]
+        cost = self.nav_graph.travel_time_matrix([robot.current_vertex for robot in robots],
+                                                 [task.current_stop for task in tasks])
+        
+        # Unreachable pairs (infinite travel time) are never matched
+        rows, cols = match_finite(cost)
+        matched = [(robots[row], tasks[col]) for row, col in zip(rows.tolist(), cols.tolist())]
+        
+        # A task only moves on to its next stop once the robot took it, so
+        # a task whose robot could not be sent stays as it was in the queue
+        next_stops = []
+        planned = {}
+        dispatched = set()
+        for robot, task in matched:
+            next_stop = self._skip_visited(task, robot.current_vertex)
+            if next_stop < len(task.stops):
+                next_stops.append((robot.id, task.stops[next_stop]))
+                planned[robot.id] = (task, next_stop)
+            else:
+                # Every stop is where the robot already is
+                self._activate(robot, task)
+                self._continue_task(robot, task, [])
+                dispatched.add(task.id)
+        
+        results = self.fleet_manager.assign_batch(next_stops) if next_stops else {}
+        for robot_id, (task, next_stop) in planned.items():
+            if results[robot_id]:
+                task.next_stop = next_stop
+                self._activate(self.fleet_manager.robots[robot_id], task)
+                dispatched.add(task.id)
+            elif robot_id in self.fleet_manager.last_claimed:
+                # The robot lost its stop to another robot of the batch, so
+                # match it again at the next update instead of the next event
+                self._dispatch_due = True
+        
+        for task in tasks:
+            if task.id in dispatched:
+                self.wait_times.append(task.dispatched_time - task.created_time)
+                self.fleet_manager.log_event(f"robot_{task.robot_id}",
+                                             f"Dispatched task {task.id}", task_id=task.id)
+            elif task.state != Task.COMPLETED:
+                self._push(task)
+        return len(dispatched)
+    
+    def _activate(self, robot, task):
+        """Hand a task to a robot that is on its way to the task's next stop."""
+        task.state = Task.ACTIVE
+        task.robot_id = robot.id
+        task.dispatched_time = self.time
+        robot.task_id = task.id
+        self.active[robot.id] = task
+        self.free_robots.discard(robot.id)
+    
+    def get_task(self, task_id):
+        """
+        Get a pending or active task.
+        
+        Args:
+            task_id (int): Task ID
+        
+        Returns:
+            Task or None: The task, None if it is unknown or completed
+        """
+        return self.tasks.get(task_id)
+    
+    def get_metrics(self):
+        """
+        Get throughput and latency statistics of the tasks.
+        
+        Returns:
+            dict: Task counts, completed tasks per simulated hour, tasks
+                completed after their deadline, and mean and 95th percentile
+                of the wait (submission to dispatch) and lead time
+                (submission to completion) in seconds
+        """
+        metrics = {
+            'submitted': self.submitted,
+            'pending': len(self.pending),
+            'active': len(self.active),
+            'completed': self.completed,
+            'late': self.late,
+            'throughput_per_hour': 3600.0 * self.completed / self.time if self.time > 0 else 0.0,
+        }
+        for name, samples in (('wait', self.wait_times), ('lead_time', self.lead_times)):
+            samples = np.asarray(samples)
+            metrics[f'mean_{name}_s'] = float(samples.mean()) if len(samples) else 0.0
+            metrics[f'p95_{name}_s'] = float(np.percentile(samples, 95)) if len(samples) else 0.0
+        return metrics
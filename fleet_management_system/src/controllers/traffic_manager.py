@@ -1,3 +1,14 @@
+import numpy as np
+
+from ..models.graph_storage import NO_ROBOT
+from ..models.reservation_table import ReservationTable
+from ..planning.cooperative_astar import CooperativePlanner, timed_path_to_vertices
+from ..planning.cbs import CBSPlanner
+from ..planning.dstar_lite import DStarLite
+
+# Ways of choosing which robot of a deadlock cycle gives way
+DEADLOCK_POLICIES = ('wait_time', 'path_length', 'priority')
+
 class TrafficManager:
     """
     Manager for traffic negotiation and collision avoidance.
@@ -5,20 +16,229 @@ class TrafficManager:
     coordinate robot movements and prevent collisions.
     """
     
-    def __init__(self, nav_graph, fleet_manager):
+    # Most robots moved along to clear the way for a robot of a deadlock
+    MAKE_WAY_DEPTH = 8
+    
+    def __init__(self, nav_graph, fleet_manager, step_duration=1.0, planning_window=32,
+                 deadlock_policy='wait_time'):
         """
         Initialize the traffic manager.
         
         Args:
             nav_graph (NavGraph): Reference to the navigation graph
             fleet_manager (FleetManager): Reference to the fleet manager
+            step_duration (float): Length of one reservation time step in seconds
+            planning_window (int): Steps planned against reservations by
+                the cooperative planner
+            deadlock_policy (str): Which robot of a deadlock gives way:
+                'wait_time' (the one that started waiting last),
+                'path_length' (the one with the longest remaining trip) or
+                'priority' (the one with the lowest priority)
         """
+        if deadlock_policy not in DEADLOCK_POLICIES:
+            raise ValueError(f"Unknown deadlock policy '{deadlock_policy}'")
+        
         self.nav_graph = nav_graph
         self.fleet_manager = fleet_manager
         
         # Initialize collision tracking
         self.collision_warnings = []
-        self.lane_usage = {}  # Track lane usage for each timestep in the future
+        
+        # Wait-for graph, updated only for robots that changed state
+        self.deadlock_policy = deadlock_policy
+        self.wait_for = {}        # waiting robot ID -> (blocking robot ID, resource)
+        self.waiting_since = {}   # waiting robot ID -> time it started waiting
+        self._changed_robots = set()  # robots to look for new deadlocks from
+        self._unresolved = set()      # robots of deadlocks not broken yet
+        fleet_manager.add_state_listener(self._on_robot_state_change)
+        
+        # Space-time reservations of planned paths, and the planner using them
+        self.reservations = ReservationTable(step_duration)
+        self.cooperative_planner = CooperativePlanner(nav_graph, self.reservations,
+                                                      window=planning_window)
+        self.batch_planner = CBSPlanner(self.cooperative_planner)
+        
+        # Robots of the last batch left out because another robot of the
+        # batch claimed their goal: robot ID -> claiming robot ID
+        self.last_claimed = {}
+        
+        # Incremental planners of robots whose route crossed a lane that
+        # was blocked, kept until they arrive so that later changes to the
+        # lanes only cost a repair of the search
+        self.incremental_planners = {}  # robot ID -> DStarLite
+        self.pending_repairs = set()    # robots whose route must be checked
+        self.routes_repaired = 0
+        nav_graph.add_lane_listener(self._on_lanes_changed)
+    
+    @property
+    def step_duration(self):
+        """Length of one reservation time step in seconds."""
+        return self.reservations.step_duration
+    
+    def plan_path(self, robot_id, start_vertex, goal_vertex):
+        """
+        Plan and reserve a path that is conflict-free against existing reservations.
+        
+        Waits are encoded as repeated vertices, one per time step.
+        
+        Args:
+            robot_id (int): Robot the path is planned for
+            start_vertex (int): Starting vertex ID
+            goal_vertex (int): Destination vertex ID
+        
+        Returns:
+            list: List of vertex IDs forming the path, or None if no path exists
+        """
+        request = (robot_id, start_vertex, goal_vertex)
+        if self._make_room([request]):
+            # Robots standing in the way move aside, planned together with this one
+            return self.plan_batch([request]).get(robot_id)
+        
+        result = self.cooperative_planner.plan(robot_id, start_vertex, goal_vertex)
+        if result is None:
+            return None
+        
+        timed_path, lane_ids = result
+        if self.cooperative_planner.last_fallback:
+            self.fleet_manager.log_event(
+                "traffic_manager",
+                f"Planning robot {robot_id} to vertex {goal_vertex} ran out of search effort; "
+                f"the rest of its route follows the fastest path",
+                'WARNING'
+            )
+        self.reservations.reserve_path(robot_id, timed_path, lane_ids)
+        return timed_path_to_vertices(timed_path)
+    
+    def plan_batch(self, requests, time_budget=1.0, suboptimality=1.0):
+        """
+        Jointly plan and reserve conflict-free paths for a batch of robots.
+        
+        Robots outside the batch that stand still on the way of one of its
+        robots, e.g. parked on a cut vertex or on a goal, are planned along
+        with the batch to a free vertex nearby and sent there.
+        
+        Args:
+            requests (list): (robot ID, start vertex ID, goal vertex ID) tuples
+            time_budget (float): Seconds allowed for Conflict-Based Search
+                before falling back to prioritized planning
+            suboptimality (float): 1.0 for optimal CBS, above 1.0 for the
+                bounded-suboptimal ECBS-style search
+        
+        Returns:
+            dict: Robot ID -> list of vertex IDs; robots that could not be
+                planned are left out, and those left out because another
+                robot of the batch claimed their goal are listed in
+                last_claimed
+        """
+        # The batch replaces whatever the robots had reserved before
+        moves = self._make_room(requests)
+        batch = list(requests) + moves
+        for robot_id, _, _ in batch:
+            self.reservations.release(robot_id)
+        
+        solution = self.batch_planner.solve(batch, time_budget=time_budget,
+                                            suboptimality=suboptimality)
+        
+        paths = {}
+        for robot_id, (timed_path, lane_ids) in solution.items():
+            self.reservations.reserve_path(robot_id, timed_path, lane_ids)
+            paths[robot_id] = timed_path_to_vertices(timed_path)
+        self.last_claimed = dict(self.batch_planner.last_claimed)
+        
+        # Robots only move aside for a batch that goes ahead
+        planned = any(robot_id in paths for robot_id, _, _ in requests)
+        for robot_id, vertex, free_vertex in moves:
+            path = paths.pop(robot_id, None)
+            robot = self.fleet_manager.robots[robot_id]
+            if planned and path is not None and robot.follow_path(path, self.step_duration):
+                self.fleet_manager.log_event(
+                    f"robot_{robot_id}",
+                    f"Making room at vertex {vertex}: moving aside to vertex {free_vertex}"
+                )
+            else:
+                self.reservations.release(robot_id)
+        
+        self.fleet_manager.log_event(
+            "traffic_manager",
+            f"Planned batch of {len(requests)} robots with {self.batch_planner.last_method}: "
+            f"{len(paths)} paths, cost {self.batch_planner.last_cost} steps"
+        )
+        return paths
+    
+    def _make_room(self, requests):
+        """
+        Find robots standing still on the way of a batch and where they can go.
+        
+        A robot without a path holds its vertex for good, so a batch robot
+        whose fastest path runs through it, or ends on it, could never be
+        planned. Each such robot gets the closest free vertex off the
+        batch's fastest paths.
+        
+        Args:
+            requests (list): (robot ID, start vertex ID, goal vertex ID) tuples
+        
+        Returns:
+            list: (robot ID, vertex ID, free vertex ID) requests moving the
+                robots aside
+        """
+        nav_graph = self.nav_graph
+        robots = self.fleet_manager.robots
+        batch = {robot_id for robot_id, _, _ in requests}
+        busy = set()
+        standing = []
+        for _, start_vertex, goal_vertex in requests:
+            path = nav_graph.get_shortest_path(start_vertex, goal_vertex)
+            if path is None:
+                continue
+            busy.update(path)
+            for vertex in path[1:]:
+                occupant = int(nav_graph.vertex_occupant[vertex])
+                if occupant == NO_ROBOT or occupant in batch:
+                    continue
+                robot = robots[occupant]
+                # Charging robots and robots about to move keep their vertex
+                if (robot.current_vertex == vertex and
+                        robot.state in (robot.IDLE, robot.COMPLETED) and not robot.needs_update()):
+                    batch.add(occupant)
+                    standing.append(robot)
+        
+        moves = []
+        for robot in standing:
+            free_vertex = self._closest_free_vertex(robot.current_vertex, busy)
+            if free_vertex is not None:
+                busy.add(free_vertex)
+                moves.append((robot.id, robot.current_vertex, free_vertex))
+        return moves
+    
+    def _closest_free_vertex(self, vertex, busy):
+        """
+        Get the vertex closest to a vertex, in lanes, that a robot could park on.
+        
+        Args:
+            vertex (int): Vertex to search from
+            busy (set): Vertices to leave free
+        
+        Returns:
+            int or None: Free vertex ID, None if none can be reached
+        """
+        nav_graph = self.nav_graph
+        parked = self.reservations.parked
+        seen = {vertex}
+        frontier = [vertex]
+        while frontier:
+            next_frontier = []
+            for from_vertex in frontier:
+                for lane_id in nav_graph.get_outgoing_lane_ids(from_vertex):
+                    neighbor = int(nav_graph.lane_to[lane_id])
+                    if neighbor in seen or nav_graph.lane_blocked[lane_id]:
+                        continue
+                    seen.add(neighbor)
+                    if (neighbor not in busy and neighbor not in parked and
+                            nav_graph.vertex_occupant[neighbor] == NO_ROBOT):
+                        return neighbor
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
     
     def check_path_conflicts(self, robot_id, path):
         """
@@ -39,11 +259,10 @@ class TrafficManager:
             to_vertex = path[i+1]
             
             # Check if lane is currently blocked
-            for lane in self.nav_graph.lanes:
-                if lane['from_vertex'] == from_vertex and lane['to_vertex'] == to_vertex:
-                    if lane['occupying_robot'] is not None and lane['occupying_robot'] != robot_id:
-                        conflicts.append(to_vertex)
-                    break
+            lane = self.nav_graph.get_lane(from_vertex, to_vertex)
+            if lane is not None:
+                if lane['occupying_robot'] is not None and lane['occupying_robot'] != robot_id:
+                    conflicts.append(to_vertex)
             
             # Check if destination vertex is currently occupied
             if self.nav_graph.vertices[to_vertex]['occupying_robot'] is not None:
@@ -51,75 +270,468 @@ class TrafficManager:
         
         return conflicts
     
+    def _on_robot_state_change(self, robot_id, old_state, new_state):
+        """Track waiting robots and remember where to look for new deadlocks."""
+        robot = self.fleet_manager.robots[robot_id]
+        if new_state == robot.WAITING:
+            self.waiting_since[robot_id] = self.reservations.elapsed_time
+        elif old_state == robot.WAITING:
+            self.waiting_since.pop(robot_id, None)
+            self.wait_for.pop(robot_id, None)
+        if new_state == robot.COMPLETED:
+            self.incremental_planners.pop(robot_id, None)
+            self.pending_repairs.discard(robot_id)
+        
+        # A new cycle always runs through the robot that closed it by
+        # starting to wait; deadlocks that could not be broken are retried
+        # whenever a robot moves
+        self._changed_robots.add(robot_id)
+        self._changed_robots |= self._unresolved
+    
+    def update_wait_for_graph(self, robot_ids=None):
+        """
+        Update the wait-for edges of some robots.
+        
+        Args:
+            robot_ids (iterable): Robots whose edges to update, by default
+                every waiting robot
+        """
+        for robot_id in list(self.waiting_since if robot_ids is None else robot_ids):
+            self._update_edge(robot_id)
+    
+    def _update_edge(self, robot_id):
+        """Set a robot's wait-for edge from what it waits for right now."""
+        blocker = None
+        if robot_id in self.waiting_since:
+            blocker = self.fleet_manager.robots[robot_id].get_blocker()
+        if blocker is not None and blocker[0] is not None:
+            self.wait_for[robot_id] = blocker
+            return blocker
+        self.wait_for.pop(robot_id, None)
+        return None
+    
+    def find_deadlocks(self, robot_ids=None):
+        """
+        Find the cycles of the wait-for graph through some robots.
+        
+        Every waiting robot waits for at most one other robot, so following
+        the edges from a robot either ends at a robot that is not waiting
+        or runs into a cycle. The edges are updated along the way, so the
+        cost is the length of the walks, not the size of the fleet.
+        
+        Args:
+            robot_ids (iterable): Robots to start from, by default every
+                waiting robot
+        
+        Returns:
+            list: One list of robot IDs per cycle, in wait-for order
+        """
+        cycles = []
+        visited = set()
+        for start in list(self.waiting_since if robot_ids is None else robot_ids):
+            trail = []
+            position = {}
+            robot_id = start
+            while robot_id not in visited:
+                blocker = self._update_edge(robot_id)
+                if blocker is None:
+                    break
+                visited.add(robot_id)
+                position[robot_id] = len(trail)
+                trail.append(robot_id)
+                robot_id = blocker[0]
+            
+            # Only a walk that comes back onto itself is a new cycle
+            if robot_id in position:
+                cycles.append(trail[position[robot_id]:])
+        return cycles
+    
     def resolve_deadlocks(self):
         """
-        Attempt to resolve deadlocks by prioritizing robots.
-        This is a simple implementation that could be improved.
+        Detect deadlocks in the wait-for graph and break them.
+        
+        Only cycles through robots that changed state since the last call
+        are looked for. In each cycle one robot, chosen by the deadlock
+        policy, is rerouted around the other robots or, failing that, backs
+        off to a free neighboring vertex. When no robot of the cycle can,
+        robots outside the cycle standing next to it move along to make
+        room for one.
         
         Returns:
             int: Number of deadlocks resolved
         """
+        if not self._changed_robots:
+            return 0
+        changed, self._changed_robots = self._changed_robots, set()
+        
         resolved = 0
-        waiting_robots = []
+        self._unresolved = set()
+        for cycle in self.find_deadlocks(changed):
+            if any(robot_id not in self.wait_for for robot_id in cycle):
+                # Robots moved to break an earlier cycle; look again next time
+                self._changed_robots.update(cycle)
+                continue
+            if self._break_cycle(cycle):
+                resolved += 1
+            else:
+                self._unresolved.update(cycle)
+                self.fleet_manager.log_event(
+                    "traffic_manager",
+                    f"Deadlock between robots {cycle} could not be resolved",
+                    'WARNING'
+                )
+        return resolved
+    
+    def _victim_order(self, cycle):
+        """Order the robots of a cycle by who should give way first."""
+        robots = self.fleet_manager.robots
+        if self.deadlock_policy == 'wait_time':
+            return sorted(cycle, key=lambda r: (-self.waiting_since.get(r, 0.0), r))
+        if self.deadlock_policy == 'path_length':
+            def remaining(r):
+                robot = robots[r]
+                return self.nav_graph.get_path_travel_time(robot.path[robot.current_path_index:])
+            return sorted(cycle, key=lambda r: (-remaining(r), r))
+        return sorted(cycle, key=lambda r: (robots[r].priority, r))
+    
+    def _break_cycle(self, cycle):
+        """Reroute or back off one robot of a deadlock cycle, or make way for one."""
+        robots = self.fleet_manager.robots
+        occupied = set(np.flatnonzero(self.nav_graph.vertex_occupant != NO_ROBOT).tolist())
+        victims = self._victim_order(cycle)
+        last_resort = None
+        for robot_id in victims:
+            robot = robots[robot_id]
+            
+            # Go around every vertex held by another robot, so that the new
+            # route does not run straight into the next deadlock
+            held = occupied - {robot.current_vertex}
+            _, (kind, resource_id) = self.wait_for[robot_id]
+            path = self.nav_graph.find_path(
+                robot.current_vertex, robot.target_vertex, avoid_vertices=held,
+                avoid_lanes=(resource_id,) if kind == 'lane' else ())
+            action = "Rerouted"
+            if path is None:
+                ahead = self._ahead(cycle, robot_id)
+                path = self._back_off_path(robot, held, ahead)
+                action = "Backed off"
+                if path is not None and path[1] in ahead:
+                    # Backing off onto the others' way only moves the deadlock along
+                    last_resort = last_resort or (robot, path)
+                    continue
+            if path is not None and self._give_path(robot, path):
+                return self._cycle_broken(cycle, robot_id, f"{action} robot {robot_id}")
+        
+        # Robots outside the cycle that stand in the way make room for one
+        # of the cycle to back off, off the others' way if possible
+        for robot_id in victims:
+            helpers = self._make_way(robots[robot_id], cycle, occupied, off_the_way=True)
+            if helpers is not None:
+                return self._cycle_broken(cycle, robot_id,
+                                          f"Robots {helpers} made way for robot {robot_id}")
+        
+        # Otherwise back off onto the others' way, or make way there
+        if last_resort is not None and self._give_path(*last_resort):
+            robot_id = last_resort[0].id
+            return self._cycle_broken(cycle, robot_id, f"Backed off robot {robot_id}")
+        for robot_id in victims:
+            helpers = self._make_way(robots[robot_id], cycle, occupied, off_the_way=False)
+            if helpers is not None:
+                return self._cycle_broken(cycle, robot_id,
+                                          f"Robots {helpers} made way for robot {robot_id}")
+        return False
+    
+    def _cycle_broken(self, cycle, robot_id, action):
+        """Log how a deadlock cycle was broken by moving one of its robots."""
+        # The rest of the cycle is looked at again in the next update
+        self._changed_robots.update(other for other in cycle if other != robot_id)
+        self.fleet_manager.log_event(
+            "traffic_manager",
+            f"Resolving deadlock between robots {cycle}: {action} ({self.deadlock_policy} policy)"
+        )
+        return True
+    
+    def _ahead(self, cycle, robot_id):
+        """Get the vertices the robots of a cycle other than one still have to drive through."""
+        robots = self.fleet_manager.robots
+        ahead = set()
+        for other in cycle:
+            if other != robot_id:
+                ahead.update(robots[other].path[robots[other].current_path_index + 1:])
+        return ahead
+    
+    def _give_path(self, robot, path):
+        """
+        Replace a robot's path to break a deadlock.
+        
+        Args:
+            robot (Robot): Robot that is waiting or stands still
+            path (list): List of vertex IDs starting at the current vertex
+        
+        Returns:
+            bool: True if the robot took the path
+        """
+        if robot.state == robot.WAITING:
+            accepted = robot.reroute(path)
+        else:
+            accepted = robot.follow_path(path)
+        if not accepted:
+            return False
+        
+        # The robot's old plan is void, so are its reservations
+        self.reservations.release(robot.id)
+        self.waiting_since.pop(robot.id, None)
+        self.wait_for.pop(robot.id, None)
+        return True
+    
+    def _make_way(self, robot, cycle, occupied, off_the_way):
+        """
+        Clear the way for a robot of a deadlock cycle to back off.
+        
+        Looks for the closest free vertex reachable through vertices held
+        by robots outside the cycle that stand still, e.g. a robot parked
+        in the only siding. Each of those robots moves one vertex towards
+        the free one and the robot of the cycle backs off into the vertex
+        next to it; robots with a destination then go on to it.
+        
+        Args:
+            robot (Robot): Robot of the cycle to make way for
+            cycle (list): Robot IDs of the deadlock cycle
+            occupied (set): Vertices held by any robot
+            off_the_way (bool): Only clear vertices the other robots of the
+                cycle do not have to drive through
+        
+        Returns:
+            list: IDs of the robots that made way, or None if there is no
+                free vertex within MAKE_WAY_DEPTH robots
+        """
+        nav_graph = self.nav_graph
+        robots = self.fleet_manager.robots
+        ahead = self._ahead(cycle, robot.id) if off_the_way else set()
+        
+        # Breadth-first search from the robot through standing robots
+        parent = {robot.current_vertex: None}
+        frontier = [robot.current_vertex]
+        free_vertex = None
+        for _ in range(self.MAKE_WAY_DEPTH):
+            next_frontier = []
+            for vertex in frontier:
+                for lane_id in nav_graph.get_outgoing_lane_ids(vertex):
+                    neighbor = int(nav_graph.lane_to[lane_id])
+                    if (neighbor in parent or nav_graph.lane_blocked[lane_id] or
+                            nav_graph.lane_occupant[lane_id] != NO_ROBOT):
+                        continue
+                    if neighbor in ahead:
+                        # Making room on the others' way only moves the deadlock along
+                        continue
+                    occupant = int(nav_graph.vertex_occupant[neighbor])
+                    if occupant == NO_ROBOT:
+                        parent[neighbor] = vertex
+                        free_vertex = neighbor
+                        break
+                    other = robots[occupant]
+                    if (occupant not in cycle and other.current_vertex == neighbor and
+                            other.state in (other.IDLE, other.COMPLETED, other.WAITING)):
+                        parent[neighbor] = vertex
+                        next_frontier.append(neighbor)
+                if free_vertex is not None:
+                    break
+            if free_vertex is not None or not next_frontier:
+                break
+            frontier = next_frontier
+        if free_vertex is None:
+            return None
+        
+        # Vertices from the robot to the free vertex, and their new paths
+        chain = [free_vertex]
+        while parent[chain[-1]] is not None:
+            chain.append(parent[chain[-1]])
+        chain.reverse()
+        moves = []
+        for vertex, next_vertex in zip(chain, chain[1:]):
+            mover = robots[int(nav_graph.vertex_occupant[vertex])]
+            if mover is not robot and (not mover.path or
+                                       mover.current_path_index >= len(mover.path) - 1):
+                moves.append((mover, [vertex, next_vertex]))
+                continue
+            onward = nav_graph.find_path(
+                next_vertex, mover.target_vertex,
+                avoid_vertices=occupied - {vertex, next_vertex, mover.target_vertex})
+            if onward is None:
+                onward = nav_graph.find_path(next_vertex, mover.target_vertex)
+            if onward is None:
+                return None
+            moves.append((mover, [vertex] + onward))
         
-        # Find waiting robots
+        # The robot next to the free vertex goes first, the others follow
+        for mover, path in reversed(moves):
+            self._give_path(mover, path)
+        return [mover.id for mover, _ in moves[1:]]
+    
+    def _back_off_path(self, robot, held, ahead):
+        """
+        Get a path that first steps aside to a free neighbor.
+        
+        Args:
+            robot (Robot): Robot backing off
+            held (set): Vertices held by other robots; they and the vertex
+                backed off from are avoided on the way on where possible
+            ahead (set): Vertices the other robots of the deadlock still have
+                to drive through; stepping aside onto them only moves the
+                deadlock along, so they are used as a last resort
+        
+        Returns:
+            list: Path via the free neighbor with the fastest way on to the
+                robot's destination, or just to the neighbor for a robot
+                without one; None if no neighbor is free
+        """
+        nav_graph = self.nav_graph
+        parked = not robot.path or robot.current_path_index >= len(robot.path) - 1
+        
+        # The other robots are about to move into the vertex we leave
+        avoid = (held | {robot.current_vertex}) - {robot.target_vertex}
+        best_path = None
+        best_rank = None
+        for lane_id in nav_graph.get_outgoing_lane_ids(robot.current_vertex):
+            neighbor = int(nav_graph.lane_to[lane_id])
+            if (nav_graph.lane_blocked[lane_id] or
+                    nav_graph.lane_occupant[lane_id] != NO_ROBOT or
+                    nav_graph.vertex_occupant[neighbor] != NO_ROBOT):
+                continue
+            
+            if parked:
+                onward = [neighbor]
+            else:
+                onward = nav_graph.find_path(neighbor, robot.target_vertex, avoid_vertices=avoid)
+                if onward is None:
+                    onward = nav_graph.find_path(neighbor, robot.target_vertex)
+            if onward is None:
+                continue
+            path = [robot.current_vertex] + onward
+            rank = (neighbor in ahead, nav_graph.get_path_travel_time(path))
+            if best_rank is None or rank < best_rank:
+                best_path = path
+                best_rank = rank
+        return best_path
+    
+    def _on_lanes_changed(self, lane_ids):
+        """Find the robots whose routes a change to the lanes affects."""
+        # Robots with an incremental planner may now have a faster route
+        for planner in self.incremental_planners.values():
+            planner.update_lanes(lane_ids)
+        self.pending_repairs.update(self.incremental_planners)
+        
+        # Other robots only need a new route if theirs became unusable
+        nav_graph = self.nav_graph
+        closed = {(int(nav_graph.lane_from[lane_id]), int(nav_graph.lane_to[lane_id]))
+                  for lane_id in lane_ids if nav_graph.lane_blocked[lane_id]}
+        if not closed:
+            return
         for robot_id, robot in self.fleet_manager.robots.items():
-            if robot.state == robot.WAITING:
-                waiting_robots.append(robot_id)
+            if robot_id in self.pending_repairs or not robot.path:
+                continue
+            # A robot finishes the lane it is driving along
+            first = robot.current_path_index + (robot.state == robot.MOVING)
+            remaining = robot.path[first:]
+            if any(lane in closed for lane in zip(remaining, remaining[1:])):
+                self.pending_repairs.add(robot_id)
+    
+    def repair_routes(self):
+        """
+        Give robots affected by blocked, unblocked or slowed lanes a new route.
         
-        if not waiting_robots:
-            return 0
+        Each affected robot keeps a D* Lite planner until it arrives, so a
+        route is repaired in time proportional to what changed around it.
+        Robots driving along a lane are repaired once they reach its end.
+        A route is only replaced when it became unusable or a faster one
+        opened up; the robot's reservations are released with it.
         
-        # Simple resolution strategy: randomly allow one robot to proceed
-        if waiting_robots:
-            # Choose a robot to prioritize (could be improved with more sophisticated algorithms)
-            # For now, just choose the robot that has been waiting the longest
-            # In a real implementation, you might consider factors like:
-            # - Battery level
-            # - Task priority
-            # - Path length
-            # - Time spent waiting
-            prioritized_robot_id = waiting_robots[0]
-            robot = self.fleet_manager.robots[prioritized_robot_id]
+        Returns:
+            int: Number of robots that were given a new route
+        """
+        robots = self.fleet_manager.robots
+        repaired = 0
+        for robot_id in list(self.pending_repairs):
+            robot = robots[robot_id]
+            if robot.state == robot.MOVING:
+                continue
+            self.pending_repairs.discard(robot_id)
+            if not robot.path or robot.current_path_index >= len(robot.path) - 1:
+                self.incremental_planners.pop(robot_id, None)
+                continue
+            
+            planner = self.incremental_planners.get(robot_id)
+            if planner is None or planner.goal != robot.target_vertex:
+                planner = DStarLite(self.nav_graph, robot.current_vertex, robot.target_vertex)
+                self.incremental_planners[robot_id] = planner
+            else:
+                planner.move_to(robot.current_vertex)
+            
+            path = planner.get_path()
+            if path is None:
+                # Retried whenever a lane changes again
+                self.fleet_manager.log_event(
+                    f"robot_{robot_id}",
+                    f"No route to vertex {robot.target_vertex} while lanes are blocked",
+                    'WARNING'
+                )
+                continue
+            
+            # Keep a route that is still usable and as fast, with its waits
+            remaining = robot.path[robot.current_path_index:]
+            lane_blocked = self.nav_graph.lane_blocked
+            usable = all(from_vertex == to_vertex or
+                         not lane_blocked[self.nav_graph.get_lane_id(from_vertex, to_vertex)]
+                         for from_vertex, to_vertex in zip(remaining, remaining[1:]))
+            if usable and (self.nav_graph.get_path_travel_time(remaining) <=
+                           self.nav_graph.get_path_travel_time(path) + 1e-9):
+                continue
             
-            if robot.path and robot.current_path_index < len(robot.path) - 1:
-                next_vertex = robot.path[robot.current_path_index + 1]
-                
-                # Force reservation (temporarily clear obstacles)
-                for lane in self.nav_graph.lanes:
-                    if (lane['from_vertex'] == robot.current_vertex and 
-                        lane['to_vertex'] == next_vertex):
-                        if lane['occupying_robot'] is not None:
-                            # Log the resolution
-                            self.fleet_manager.log_event(
-                                "traffic_manager", 
-                                f"Resolving deadlock: Prioritizing robot {prioritized_robot_id} "
-                                f"over robot {lane['occupying_robot']}"
-                            )
-                            
-                            # Clear the lane (in a real system, you'd coordinate this better)
-                            lane['occupying_robot'] = None
-                            resolved += 1
+            if robot.state == robot.WAITING:
+                accepted = robot.reroute(path)
+            else:
+                accepted = robot.follow_path(path)
+            if not accepted:
+                continue
+            
+            self.reservations.release(robot_id)
+            repaired += 1
+            self.fleet_manager.log_event(
+                "traffic_manager",
+                f"Repaired route of robot {robot_id} to vertex {robot.target_vertex} "
+                f"after lanes changed"
+            )
         
-        return resolved
+        self.routes_repaired += repaired
+        return repaired
     
-    def update(self):
+    def update(self, delta_time=0.0):
         """
         Update the traffic management system.
         
+        Args:
+            delta_time (float): Time elapsed since last update in seconds
+        
         Returns:
             dict: Status information about the traffic system
         """
         # Clear previous warnings
         self.collision_warnings = []
         
-        # Check for and resolve deadlocks periodically
+        # Move the reservation clock forward
+        self.reservations.advance(delta_time)
+        
+        # Reroute robots around lanes that were blocked since the last update
+        routes_repaired = self.repair_routes() if self.pending_repairs else 0
+        
+        # Resolve deadlocks if the wait-for graph changed
         deadlocks_resolved = self.resolve_deadlocks()
         
         # Return status information
         return {
             'collision_warnings': self.collision_warnings,
-            'deadlocks_resolved': deadlocks_resolved
+            'deadlocks_resolved': deadlocks_resolved,
+            'routes_repaired': routes_repaired
         }
     
     def get_lane_status(self, from_vertex, to_vertex):
@@ -133,24 +745,24 @@ class TrafficManager:
         Returns:
             dict: Lane status information
         """
-        for lane in self.nav_graph.lanes:
-            if lane['from_vertex'] == from_vertex and lane['to_vertex'] == to_vertex:
-                occupying_robot = lane['occupying_robot']
-                robot_info = None
-                
-                if occupying_robot is not None and occupying_robot in self.fleet_manager.robots:
-                    robot = self.fleet_manager.robots[occupying_robot]
-                    robot_info = {
-                        'id': robot.id,
-                        'state': robot.state
-                    }
-                
-                return {
-                    'from_vertex': from_vertex,
-                    'to_vertex': to_vertex,
-                    'is_blocked': lane['is_blocked'],
-                    'occupying_robot': occupying_robot,
-                    'robot_info': robot_info
-                }
+        lane = self.nav_graph.get_lane(from_vertex, to_vertex)
+        if lane is None:
+            return None
         
-        return None
+        occupying_robot = lane['occupying_robot']
+        robot_info = None
+        
+        if occupying_robot is not None and occupying_robot in self.fleet_manager.robots:
+            robot = self.fleet_manager.robots[occupying_robot]
+            robot_info = {
+                'id': robot.id,
+                'state': robot.state
+            }
+        
+        return {
+            'from_vertex': from_vertex,
+            'to_vertex': to_vertex,
+            'is_blocked': lane['is_blocked'],
+            'occupying_robot': occupying_robot,
+            'robot_info': robot_info
+        }
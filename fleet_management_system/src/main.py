@@ -1,17 +1,73 @@
 import os
 import sys
 import time
-import pygame
+import cProfile
 import argparse
 
 # Add the parent directory to the path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.models.nav_graph import NavGraph
-from src.models.robot import Robot
-from src.controllers.fleet_manager import FleetManager
-from src.controllers.traffic_manager import TrafficManager
-from src.gui.fleet_gui import FleetGUI
+from src.models.battery import BatteryModel
+from src.simulation.clock import SimulationClock
+from src.simulation.simulator import Simulator
+from src.simulation.event_simulator import EventSimulator
+from src.utils.profiling import Profiler
+
+DEFAULT_LOG_FILE = 'src/logs/fleet_logs.txt'
+
+def make_battery_model(args):
+    """Build the robots' battery model from the command line options."""
+    return BatteryModel(drain_per_unit=args.battery_drain, charge_rate=args.charge_rate)
+
+def run_headless(args):
+    """Run a random task scenario without a window and print throughput stats."""
+    if args.log_file is not None:
+        os.makedirs(os.path.dirname(args.log_file) or '.', exist_ok=True)
+    
+    simulator_class = EventSimulator if args.event_driven else Simulator
+    simulator = simulator_class(args.nav_graph, log_file_path=args.log_file, dt=args.dt,
+                                cooperative=args.cooperative, seed=args.seed,
+                                log_format=args.log_format, log_level=args.log_level,
+                                battery_model=make_battery_model(args))
+    simulator.spawn_robots(args.robots)
+    if args.profile_output is not None:
+        profile = cProfile.Profile()
+        stats = profile.runcall(simulator.run, args.duration, task_rate=args.task_rate)
+        profile.dump_stats(args.profile_output)
+        print(f"Wrote profile of the run to {args.profile_output}")
+    else:
+        stats = simulator.run(args.duration, task_rate=args.task_rate)
+    simulator.close()
+    
+    print(f"Robots:              {stats['robots']}")
+    print(f"Simulated time:      {stats['sim_time']:.1f} s in {stats['steps']} steps")
+    print(f"Wall time:           {stats['wall_time']:.2f} s "
+          f"({stats['steps_per_second']:.0f} steps/s)")
+    if 'events' in stats:
+        print(f"Events:              {stats['events']}")
+    print(f"Tasks:               {stats['tasks_completed']} completed, "
+          f"{stats['tasks_assigned']} assigned, {stats['tasks_failed']} failed")
+    print(f"Throughput:          {stats['throughput_per_minute']:.2f} tasks/min")
+    print(f"Deadlocks resolved:  {stats['deadlocks_resolved']}")
+    print(f"Mean waiting robots: {stats['mean_waiting_robots']:.2f}")
+    
+    if args.task_rate is not None:
+        scheduler = stats['scheduler']
+        print(f"Scheduled tasks:     {scheduler['completed']} completed "
+              f"({scheduler['late']} late), {scheduler['active']} active, "
+              f"{scheduler['pending']} pending")
+        print(f"Task throughput:     {scheduler['throughput_per_hour']:.0f} tasks/h")
+        print(f"Task wait:           {scheduler['mean_wait_s']:.1f} s mean, "
+              f"{scheduler['p95_wait_s']:.1f} s p95")
+        print(f"Task lead time:      {scheduler['mean_lead_time_s']:.1f} s mean, "
+              f"{scheduler['p95_lead_time_s']:.1f} s p95")
+    
+    chargers = stats['chargers']
+    print(f"Charging:            {chargers['sessions']} sessions on {chargers['chargers']} chargers, "
+          f"{chargers['charging']} charging, {chargers['queued']} queued "
+          f"(longest queue {chargers['max_queue_length']})")
+    print(f"Charger queueing:    {chargers['mean_queue_s']:.1f} s mean, "
+          f"{chargers['p95_queue_s']:.1f} s p95, {chargers['emptied']} batteries ran empty")
 
 def main():
     """Main entry point for the Fleet Management System."""
@@ -19,31 +75,94 @@ def main():
     parser = argparse.ArgumentParser(description='Fleet Management System')
     parser.add_argument('--nav_graph', type=str, default='data/nav_graph_1.json',
                         help='Path to navigation graph JSON file')
-    parser.add_argument('--log_file', type=str, default='src/logs/fleet_logs.txt',
-                        help='Path to log file')
+    parser.add_argument('--log_file', type=str, default=None,
+                        help=f'Path to log file (GUI default: {DEFAULT_LOG_FILE}, '
+                             'headless default: no log)')
+    parser.add_argument('--log_format', choices=('text', 'json'), default='text',
+                        help='Write log events as text lines or JSON lines')
+    parser.add_argument('--log_level', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        default='DEBUG', help='Lowest level of logged events')
     parser.add_argument('--width', type=int, default=1200,
                         help='Window width')
     parser.add_argument('--height', type=int, default=600,
                         help='Window height')
+    parser.add_argument('--cooperative', action='store_true',
+                        help='Plan robot paths against a space-time reservation table')
+    parser.add_argument('--headless', action='store_true',
+                        help='Run a random task scenario without a window and print stats')
+    parser.add_argument('--robots', type=int, default=5,
+                        help='Number of robots in the headless scenario')
+    parser.add_argument('--duration', type=float, default=60.0,
+                        help='Simulated seconds of the headless scenario')
+    parser.add_argument('--task_rate', type=float, default=None,
+                        help='Submit random pickup and dropoff tasks to the task scheduler '
+                             'at this rate per simulated hour in the headless scenario')
+    parser.add_argument('--battery_drain', type=float, default=0.002,
+                        help='Share of a full battery used per map unit driven')
+    parser.add_argument('--charge_rate', type=float, default=0.01,
+                        help='Share of a full battery charged per second on a charger')
+    parser.add_argument('--event_driven', action='store_true',
+                        help='Run the headless scenario as a discrete-event simulation '
+                             'that jumps from event to event instead of stepping by --dt')
+    parser.add_argument('--dt', type=float, default=1.0 / 60.0,
+                        help='Simulated seconds per simulation step')
+    parser.add_argument('--time_scale', type=float, default=1.0,
+                        help='Simulated seconds per real second in the GUI, 0 for unthrottled')
+    parser.add_argument('--fps', type=int, default=60,
+                        help='GUI frames rendered per second')
+    parser.add_argument('--profile', action='store_true',
+                        help='Start the GUI with the profiler HUD shown (toggle with H)')
+    parser.add_argument('--profile_output', type=str, default=None,
+                        help='Write a cProfile/pstats file of the first --profile_frames '
+                             'GUI frames, or of the whole headless run')
+    parser.add_argument('--profile_frames', type=int, default=600,
+                        help='Number of GUI frames recorded with --profile_output')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed of the headless scenario')
     
     args = parser.parse_args()
     
+    if args.headless:
+        run_headless(args)
+        return
+    
+    # The GUI needs a display, so only import it when running with one
+    import pygame
+    from gui.fleet_gui import FleetGUI
+    
     # Create log directory if it doesn't exist
+    if args.log_file is None:
+        args.log_file = DEFAULT_LOG_FILE
     os.makedirs(os.path.dirname(args.log_file), exist_ok=True)
     
     # Initialize components
     try:
-        # Load navigation graph
-        nav_graph = NavGraph(args.nav_graph)
+        # Load navigation graph and set up the fleet and traffic managers
+        simulator = Simulator(args.nav_graph, log_file_path=args.log_file, dt=args.dt,
+                              cooperative=args.cooperative, log_format=args.log_format,
+                              log_level=args.log_level, battery_model=make_battery_model(args))
+        nav_graph = simulator.nav_graph
         
-        # Initialize fleet manager
-        fleet_manager = FleetManager(nav_graph, args.log_file)
+        # Fixed-timestep clock, stepped as often as the time scale asks
+        sim_clock = SimulationClock(args.dt, time_scale=args.time_scale or None)
         
-        # Initialize traffic manager
-        traffic_manager = TrafficManager(nav_graph, fleet_manager)
+        # Profiler for the HUD; costs nothing until it is switched on
+        profiler = Profiler()
         
         # Initialize GUI
-        gui = FleetGUI(args.width, args.height, nav_graph, fleet_manager, traffic_manager)
+        gui = FleetGUI(args.width, args.height, nav_graph, simulator.fleet_manager,
+                       simulator.traffic_manager, sim_clock=sim_clock, profiler=profiler)
+        
+        # Time every phase of a frame and track the subsystem counters
+        profiler.add_phase(simulator.fleet_manager, 'update', 'fleet_manager.update')
+        profiler.add_phase(simulator.traffic_manager, 'update', 'traffic_manager.update')
+        profiler.add_phase(gui, 'update', 'gui.update')
+        profiler.add_phase(gui, 'render', 'gui.render')
+        simulator.add_profiler_counters(profiler)
+        if args.profile:
+            profiler.enable()
+        if args.profile_output is not None:
+            profiler.start_capture(args.profile_output, args.profile_frames)
         
         # Add startup messages
         gui.add_message("Fleet Management System initialized")
@@ -51,35 +170,41 @@ def main():
         gui.add_log("System started")
         gui.add_log(f"Loaded nav graph with {len(nav_graph.vertices)} vertices")
         
-        # Main loop
+        def step():
+            traffic_status = simulator.step()
+            
+            # Log any traffic events
+            if traffic_status['deadlocks_resolved'] > 0:
+                gui.add_log(f"Resolved {traffic_status['deadlocks_resolved']} traffic deadlocks")
+        
+        # Main loop: simulate in fixed steps, render at the frame rate
         running = True
-        last_time = time.time()
+        frame_time = 1.0 / args.fps
+        last_time = time.perf_counter()
         
         while running:
             # Calculate delta time
-            current_time = time.time()
+            current_time = time.perf_counter()
             delta_time = current_time - last_time
             last_time = current_time
             
             # Handle events
             running = gui.handle_events()
             
-            # Update components
-            fleet_manager.update(delta_time)
-            traffic_status = traffic_manager.update()
+            # Run the simulation steps due, leaving time to render
+            sim_clock.advance(step, delta_time, 0.8 * frame_time)
             gui.update(delta_time)
             
-            # Log any traffic events
-            if traffic_status['deadlocks_resolved'] > 0:
-                gui.add_log(f"Resolved {traffic_status['deadlocks_resolved']} traffic deadlocks")
-            
             # Render GUI
             gui.render()
+            profiler.end_frame()
             
             # Cap frame rate
-            pygame.time.delay(16)  # ~60 FPS
+            gui.clock.tick(args.fps)
         
         # Clean up
+        profiler.stop_capture()
+        simulator.close()
         pygame.quit()
         
     except Exception as e:
@@ -0,0 +1,36 @@
+class BatteryModel:
+    """
+    Battery parameters shared by the robots of a fleet.
+    
+    Battery levels are fractions of a full charge, from 0.0 to 1.0. Driving
+    drains the battery per map unit travelled, standing still drains it
+    slowly over time, and robots on a charger gain charge at a fixed rate.
+    """
+    
+    def __init__(self, drain_per_unit=0.002, idle_drain=0.00001, charge_rate=0.01,
+                 low_level=0.2, top_up_level=0.9, full_level=0.95):
+        """
+        Initialize the battery model.
+        
+        Args:
+            drain_per_unit (float): Charge used per map unit driven
+            idle_drain (float): Charge used per second while standing
+                still off a charger
+            charge_rate (float): Charge gained per second on a charger
+            low_level (float): Level below which a robot goes to charge
+            top_up_level (float): Level below which a robot standing on a
+                charger starts charging
+            full_level (float): Level at which a robot stops charging
+        """
+        if not 0.0 <= low_level <= top_up_level < full_level <= 1.0:
+            raise ValueError(f"Battery levels must satisfy 0 <= low <= top up < full <= 1, "
+                             f"got low={low_level}, top up={top_up_level} and full={full_level}")
+        if min(drain_per_unit, idle_drain) < 0 or charge_rate <= 0:
+            raise ValueError("Battery drain must not be negative and charge rate must be positive")
+        
+        self.drain_per_unit = drain_per_unit
+        self.idle_drain = idle_drain
+        self.charge_rate = charge_rate
+        self.low_level = low_level
+        self.top_up_level = top_up_level
+        self.full_level = full_level
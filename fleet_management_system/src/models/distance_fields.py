@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import numpy as np
+
+
+class DistanceFieldCache:
+    """
+    Cache of distance fields over a NavGraph.
+    
+    A distance field holds the fastest travel time from every vertex to
+    one goal vertex, found by a single backward search, so one field
+    answers the question for any number of robots heading to that goal.
+    Fields are stored as read-only float32 arrays, rounded down so they
+    stay admissible as search heuristics, and evicted in
+    least-recently-used order. Any change to which lanes are usable or how
+    fast they are must be followed by a call to invalidate().
+    """
+    
+    def __init__(self, nav_graph, max_fields=256, memory_budget=64 * 1024 * 1024):
+        """
+        Initialize the distance field cache.
+        
+        Args:
+            nav_graph (NavGraph): Graph to compute fields over
+            max_fields (int): Maximum number of cached fields
+            memory_budget (int): Upper bound in bytes for cached fields; on
+                large graphs this lowers the number of cached fields
+        """
+        self.nav_graph = nav_graph
+        
+        # Each field is one float32 per vertex
+        field_bytes = max(1, nav_graph.num_vertices * 4)
+        self.max_fields = max(1, min(max_fields, memory_budget // field_bytes))
+        
+        self.fields = OrderedDict()  # goal vertex -> travel time array
+        
+        # Query statistics
+        self.hits = 0
+        self.misses = 0
+    
+    def invalidate(self):
+        """Drop every cached field after lanes were blocked or changed speed."""
+        self.fields.clear()
+    
+    def get_field(self, goal_vertex):
+        """
+        Get the travel times from every vertex to a goal.
+        
+        Args:
+            goal_vertex (int): Goal vertex ID
+        
+        Returns:
+            np.ndarray: Read-only float32 travel time in seconds per vertex,
+                inf where the goal cannot be reached
+        """
+        field = self.fields.get(goal_vertex)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(goal_vertex)
+            return field
+        
+        self.misses += 1
+        exact = self.nav_graph.travel_times_to(goal_vertex)
+        field = exact.astype(np.float32)
+        
+        # Never overestimate: step down wherever float32 rounded up
+        rounded_up = field > exact
+        field[rounded_up] = np.nextafter(field[rounded_up], np.float32(0))
+        field.flags.writeable = False
+        
+        self.fields[goal_vertex] = field
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
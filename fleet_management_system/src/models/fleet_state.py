@@ -0,0 +1,226 @@
+import math
+import numpy as np
+
+from .battery import BatteryModel
+
+class FleetState:
+    """
+    Struct-of-arrays store of the kinematic state of a fleet.
+    
+    Each robot owns one slot in the arrays. Positions, targets and speeds
+    of all robots live in NumPy arrays so that every driving robot can be
+    moved with a handful of array operations per step; Robot exposes its
+    slot through the position, target_position and move_speed properties.
+    """
+    
+    def __init__(self, capacity=64, battery_model=None):
+        """
+        Initialize an empty fleet state.
+        
+        Args:
+            capacity (int): Number of slots allocated up front; the arrays
+                grow as needed
+            battery_model (BatteryModel): Battery parameters of the fleet,
+                by default BatteryModel()
+        """
+        capacity = max(1, capacity)
+        self.size = 0
+        self.robots = []  # slot -> Robot
+        
+        self.pos_x = np.zeros(capacity)
+        self.pos_y = np.zeros(capacity)
+        self.target_x = np.zeros(capacity)
+        self.target_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        
+        # Robots being moved by step_moving(), and robots that need their
+        # own update() call (they have a path to follow or a state to leave)
+        self.moving = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        
+        # Battery level (0 to 1), charge used per second while driving,
+        # robots standing on a charger, and batteries already reported as
+        # low (1) or empty (2) by update_batteries()
+        self.battery_model = battery_model if battery_model is not None else BatteryModel()
+        self.battery = np.zeros(capacity)
+        self.drain_rate = np.zeros(capacity)
+        self.charging = np.zeros(capacity, dtype=bool)
+        self.battery_alert = np.zeros(capacity, dtype=np.int8)
+        
+        # Lane or vertex resource -> slots of robots waiting for it to be freed
+        self.waiters = {}
+        
+        # Bumped whenever a position changes, so position indexes know when to rebuild
+        self.version = 0
+    
+    def add_robot(self, robot, position, speed):
+        """
+        Allocate a slot for a robot.
+        
+        Args:
+            robot (Robot): Robot owning the slot
+            position (tuple): Initial position (x, y)
+            speed (float): Driving speed in pixels per second
+        
+        Returns:
+            int: Slot index of the robot
+        """
+        if self.size == len(self.pos_x):
+            self._grow(2 * self.size)
+        
+        slot = self.size
+        self.size += 1
+        self.robots.append(robot)
+        self.pos_x[slot] = self.target_x[slot] = position[0]
+        self.pos_y[slot] = self.target_y[slot] = position[1]
+        self.speed[slot] = speed
+        self.battery[slot] = 1.0
+        self.version += 1
+        return slot
+    
+    def _grow(self, capacity):
+        """Reallocate every array with room for capacity slots."""
+        for name in ('pos_x', 'pos_y', 'target_x', 'target_y', 'speed', 'moving', 'active',
+                     'battery', 'drain_rate', 'charging', 'battery_alert'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+    
+    def add_waiter(self, resource, slot):
+        """
+        Put a robot to sleep until a resource is freed.
+        
+        Args:
+            resource (tuple): ('lane', lane ID) or ('vertex', vertex ID)
+            slot (int): Slot index of the waiting robot
+        """
+        self.waiters.setdefault(resource, []).append(slot)
+        self.active[slot] = False
+    
+    def wake(self, resource):
+        """
+        Wake the robots waiting for a resource that was just freed.
+        
+        Args:
+            resource (tuple): ('lane', lane ID) or ('vertex', vertex ID)
+        """
+        slots = self.waiters.pop(resource, None)
+        if slots:
+            self.active[slots] = True
+    
+    def get_active_robots(self):
+        """
+        Get the robots that need their own update() this step.
+        
+        Returns:
+            list: Robots flagged active and not moving, in slot order
+        """
+        n = self.size
+        slots = np.flatnonzero(self.active[:n] & ~self.moving[:n])
+        robots = self.robots
+        return [robots[slot] for slot in slots.tolist()]
+    
+    def step_moving(self, delta_time):
+        """
+        Move every moving robot towards its target for one time step.
+        
+        Robots closer to their target than one step snap onto it and stop
+        moving; handling the arrival is left to the robot.
+        
+        Args:
+            delta_time (float): Length of the time step in seconds
+        
+        Returns:
+            list: Robots that reached their target this step
+        """
+        slots = np.flatnonzero(self.moving[:self.size])
+        if len(slots) == 0:
+            return []
+        self.version += 1
+        self.battery[slots] -= self.drain_rate[slots] * delta_time
+        
+        dx = self.target_x[slots] - self.pos_x[slots]
+        dy = self.target_y[slots] - self.pos_y[slots]
+        distance = np.hypot(dx, dy)
+        step = self.speed[slots] * delta_time
+        arrived = distance <= step
+        
+        # Advance the others by one step along their direction of travel
+        driving = ~arrived
+        scale = step[driving] / distance[driving]
+        self.pos_x[slots[driving]] += dx[driving] * scale
+        self.pos_y[slots[driving]] += dy[driving] * scale
+        
+        done = slots[arrived]
+        self.pos_x[done] = self.target_x[done]
+        self.pos_y[done] = self.target_y[done]
+        self.moving[done] = False
+        
+        robots = self.robots
+        return [robots[slot] for slot in done.tolist()]
+    
+    def step_one(self, slot, delta_time):
+        """
+        Move a single robot towards its target for one time step.
+        
+        Args:
+            slot (int): Slot index of the robot
+            delta_time (float): Length of the time step in seconds
+        
+        Returns:
+            bool: True if the robot reached its target
+        """
+        dx = self.target_x[slot] - self.pos_x[slot]
+        dy = self.target_y[slot] - self.pos_y[slot]
+        distance = math.hypot(dx, dy)
+        step = self.speed[slot] * delta_time
+        self.version += 1
+        self.battery[slot] -= self.drain_rate[slot] * delta_time
+        
+        if distance <= step:
+            self.pos_x[slot] = self.target_x[slot]
+            self.pos_y[slot] = self.target_y[slot]
+            self.moving[slot] = False
+            return True
+        
+        scale = step / distance
+        self.pos_x[slot] += dx * scale
+        self.pos_y[slot] += dy * scale
+        return False
+    
+    def update_batteries(self, delta_time):
+        """
+        Drain idle batteries and charge the robots on a charger.
+        
+        Driving drain is applied by step_moving() and step_one(), so moving
+        robots and robots on a charger are left out of the idle drain.
+        
+        Args:
+            delta_time (float): Length of the time step in seconds
+        
+        Returns:
+            tuple: (robots whose battery ran low, robots that finished
+                charging, number of batteries that ran empty) this step
+        """
+        n = self.size
+        model = self.battery_model
+        battery = self.battery[:n]
+        charging = self.charging[:n]
+        alert = self.battery_alert[:n]
+        
+        battery[~self.moving[:n] & ~charging] -= model.idle_drain * delta_time
+        battery[charging] += model.charge_rate * delta_time
+        np.clip(battery, 0.0, 1.0, out=battery)
+        
+        # Report every battery once when it runs low and once when it runs empty
+        new_alert = np.where(battery <= 0.0, 2, battery < model.low_level).astype(np.int8)
+        ran_low = (new_alert > 0) & (alert == 0)
+        emptied = int(np.count_nonzero((new_alert == 2) & (alert < 2)))
+        alert[:] = new_alert
+        charged = charging & (battery >= model.full_level)
+        
+        robots = self.robots
+        return ([robots[slot] for slot in np.flatnonzero(ran_low).tolist()],
+                [robots[slot] for slot in np.flatnonzero(charged).tolist()],
+                emptied)
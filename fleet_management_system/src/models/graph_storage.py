@@ -0,0 +1,190 @@
+from collections.abc import MutableMapping, Sequence
+import numpy as np
+
+# Sentinel stored in occupancy arrays when nothing occupies a vertex or lane
+NO_ROBOT = -1
+
+
+class _RecordView(MutableMapping):
+    """
+    Dict-like view of one row of the NavGraph arrays.
+    
+    Reading a key reads the backing array, and writing a key writes it, so
+    code that treats vertices and lanes as dicts keeps working without the
+    graph having to store a dict per record.
+    """
+    
+    __slots__ = ('_nav_graph', '_index')
+    
+    # Keys exposed by the view, in display order
+    KEYS = ()
+    
+    def __init__(self, nav_graph, index):
+        """
+        Initialize the view.
+        
+        Args:
+            nav_graph (NavGraph): Graph owning the backing arrays
+            index (int): Row index of the record
+        """
+        self._nav_graph = nav_graph
+        self._index = index
+    
+    def __iter__(self):
+        return iter(self.KEYS)
+    
+    def __len__(self):
+        return len(self.KEYS)
+    
+    def __delitem__(self, key):
+        raise TypeError(f"Cannot delete '{key}' from a graph record")
+    
+    def __eq__(self, other):
+        if isinstance(other, _RecordView):
+            return (type(self) is type(other) and
+                    self._nav_graph is other._nav_graph and
+                    self._index == other._index)
+        return super().__eq__(other)
+    
+    def __hash__(self):
+        return hash((type(self), id(self._nav_graph), self._index))
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class VertexView(_RecordView):
+    """Dict-like view of a vertex stored in the NavGraph arrays."""
+    
+    __slots__ = ()
+    
+    KEYS = ('id', 'x', 'y', 'name', 'is_charger', 'occupying_robot', 'is_blocked')
+    
+    def __getitem__(self, key):
+        g = self._nav_graph
+        i = self._index
+        if key == 'id':
+            return i
+        if key == 'x':
+            return float(g.vertex_x[i])
+        if key == 'y':
+            return float(g.vertex_y[i])
+        if key == 'name':
+            return g.vertex_names[i]
+        if key == 'is_charger':
+            return bool(g.vertex_is_charger[i])
+        if key == 'occupying_robot':
+            robot_id = int(g.vertex_occupant[i])
+            return None if robot_id == NO_ROBOT else robot_id
+        if key == 'is_blocked':
+            return bool(g.vertex_blocked[i])
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        g = self._nav_graph
+        i = self._index
+        if key == 'occupying_robot':
+            g.vertex_occupant[i] = NO_ROBOT if value is None else value
+        elif key == 'is_blocked':
+            g.set_vertex_blocked(i, value)
+        elif key == 'is_charger':
+            g.vertex_is_charger[i] = bool(value)
+        elif key == 'name':
+            g.vertex_names[i] = value
+        else:
+            raise KeyError(f"Vertex field '{key}' is read-only")
+
+
+class LaneView(_RecordView):
+    """Dict-like view of a lane stored in the NavGraph arrays."""
+    
+    __slots__ = ()
+    
+    KEYS = ('id', 'from_vertex', 'to_vertex', 'speed_limit',
+            'occupying_robot', 'is_blocked')
+    
+    def __getitem__(self, key):
+        g = self._nav_graph
+        i = self._index
+        if key == 'id':
+            return i
+        if key == 'from_vertex':
+            return int(g.lane_from[i])
+        if key == 'to_vertex':
+            return int(g.lane_to[i])
+        if key == 'speed_limit':
+            return float(g.lane_speed_limit[i])
+        if key == 'occupying_robot':
+            robot_id = int(g.lane_occupant[i])
+            return None if robot_id == NO_ROBOT else robot_id
+        if key == 'is_blocked':
+            return bool(g.lane_blocked[i])
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        g = self._nav_graph
+        i = self._index
+        if key == 'occupying_robot':
+            g.lane_occupant[i] = NO_ROBOT if value is None else value
+        elif key == 'is_blocked':
+            g.set_lane_blocked_by_id(i, value)
+        elif key == 'speed_limit':
+            g.set_lane_speed_limit_by_id(i, value)
+        else:
+            raise KeyError(f"Lane field '{key}' is read-only")
+
+
+class RecordSequence(Sequence):
+    """List-like sequence of record views over the NavGraph arrays."""
+    
+    __slots__ = ('_nav_graph', '_view_class', '_length')
+    
+    def __init__(self, nav_graph, view_class, length):
+        """
+        Initialize the sequence.
+        
+        Args:
+            nav_graph (NavGraph): Graph owning the backing arrays
+            view_class (type): VertexView or LaneView
+            length (int): Number of records
+        """
+        self._nav_graph = nav_graph
+        self._view_class = view_class
+        self._length = length
+    
+    def __len__(self):
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return self._view_class(self._nav_graph, index)
+    
+    def __iter__(self):
+        view_class = self._view_class
+        nav_graph = self._nav_graph
+        for i in range(self._length):
+            yield view_class(nav_graph, i)
+
+
+def build_csr(keys, num_rows):
+    """
+    Build a compressed sparse row index grouping record IDs by key.
+    
+    Args:
+        keys (np.ndarray): Row key (e.g. from-vertex) of every record
+        num_rows (int): Number of rows in the index
+    
+    Returns:
+        tuple: (offsets, record_ids) where the records for row r are
+            record_ids[offsets[r]:offsets[r + 1]]
+    """
+    record_ids = np.argsort(keys, kind='stable').astype(np.int32)
+    counts = np.bincount(keys, minlength=num_rows)
+    offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, record_ids
@@ -1,87 +1,115 @@
+import heapq
 import json
-import networkx as nx
+import math
+import os
+import shutil
+import hashlib
+import tempfile
 import numpy as np
 
+from .graph_storage import NO_ROBOT, VertexView, LaneView, RecordSequence, build_csr
+from .path_cache import PathCache, UNREACHED
+from .distance_fields import DistanceFieldCache
+from ..utils.spatial_index import GridIndex
+
+# Suffix of the compiled cache directory written next to a graph's JSON file
+CACHE_SUFFIX = '.navcache'
+
+# Version of the compiled cache layout; caches of other versions are rebuilt
+CACHE_VERSION = 1
+
+# Arrays stored in the compiled cache, one .npy file each
+CACHE_ARRAYS = ('vertex_x', 'vertex_y', 'vertex_is_charger', 'vertex_names',
+                'lane_from', 'lane_to', 'lane_speed_limit',
+                'out_offsets', 'out_lanes', 'in_offsets', 'in_lanes')
+
 class NavGraph:
-    """Navigation graph representation for robot fleet management."""
+    """
+    Navigation graph representation for robot fleet management.
+    
+    Vertices and lanes are stored as NumPy arrays (struct-of-arrays), with
+    outgoing and incoming lanes indexed in CSR form. ``vertices`` and
+    ``lanes`` expose dict-like views over those arrays for callers that
+    treat records as dicts.
+    """
     
-    def __init__(self, json_file_path):
+    # Travel speed (map units per second) on lanes without a speed limit
+    DEFAULT_SPEED_LIMIT = 1.0
+    
+    # Cell size in pixels of the grid index over scaled vertex positions
+    HIT_TEST_CELL_SIZE = 16
+    
+    def __init__(self, json_file_path, path_cache_size=256, precompute_paths=False,
+                 distance_field_cache_size=256, use_cache=True):
         """
         Initialize the navigation graph from a JSON file.
         
         Args:
             json_file_path (str): Path to the navigation graph JSON file
+            path_cache_size (int): Maximum number of source vertices whose
+                shortest path trees are cached
+            precompute_paths (bool): Precompute an all-pairs next-hop table;
+                only worthwhile for small graphs
+            distance_field_cache_size (int): Maximum number of goal vertices
+                whose distance fields are cached
+            use_cache (bool): Load the graph from, and save it to, a
+                compiled cache next to the JSON file
         """
-        self.graph = nx.DiGraph()
-        self.vertices = []
-        self.lanes = []
+        self._graph = None
+        self._search_adjacency = None
+        self._reverse_search_adjacency = None
+        self.blocked_lanes = set()  # IDs of lanes closed to traffic
+        self.closed_lanes = set()   # IDs of lanes blocked by name, not by a blocked vertex
+        self.lane_listeners = []    # Callbacks told which lanes changed cost
+        self.vertices = RecordSequence(self, VertexView, 0)
+        self.lanes = RecordSequence(self, LaneView, 0)
+        self.lane_index = {}    # from_vertex * num_vertices + to_vertex -> lane ID
         self.scale_factor = 50  # Scale factor for visualization
         self.offset_x = 300     # X offset for visualization
         self.offset_y = 300     # Y offset for visualization
         
+        # Scaled vertex positions and their grid index, rebuilt on rescale
+        self.screen_x = np.zeros(0, dtype=np.int64)
+        self.screen_y = np.zeros(0, dtype=np.int64)
+        self.vertex_index = GridIndex(self.HIT_TEST_CELL_SIZE)
+        
+        # Failed vertex and lane reservations, for profiling
+        self.reservation_failures = 0
+        
+        # Path cache settings, the cache itself is rebuilt on every load
+        self.path_cache_size = path_cache_size
+        self.precompute_paths = precompute_paths
+        self.distance_field_cache_size = distance_field_cache_size
+        self.use_cache = use_cache
+        
         self.load_from_json(json_file_path)
         
     def load_from_json(self, json_file_path):
         """
         Load and parse the navigation graph from a JSON file.
         
+        With the compiled cache enabled, the graph's arrays are memory-mapped
+        from the cache next to the JSON file as long as it was compiled from
+        the same JSON content; otherwise the JSON is parsed and the cache
+        written anew.
+        
         Args:
             json_file_path (str): Path to the navigation graph JSON file
         """
         try:
-            with open(json_file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Extract the level name (assuming there's only one level)
-            level_name = list(data['levels'].keys())[0]
-            level_data = data['levels'][level_name]
-            
-            # Parse vertices
-            self.vertices = []
-            for i, vertex_data in enumerate(level_data['vertices']):
-                x, y, attrs = vertex_data
-                
-                # Default values if not specified
-                name = attrs.get('name', f'v{i}')
-                is_charger = attrs.get('is_charger', False)
-                
-                # Store vertex data
-                vertex = {
-                    'id': i,
-                    'x': x,
-                    'y': y,
-                    'name': name,
-                    'is_charger': is_charger,
-                    'occupying_robot': None  # Track which robot is at this vertex
-                }
-                self.vertices.append(vertex)
-                
-                # Add vertex to the graph
-                self.graph.add_node(i, **vertex)
+            with open(json_file_path, 'rb') as f:
+                raw = f.read()
             
-            # Parse lanes
-            self.lanes = []
-            for lane_data in level_data['lanes']:
-                from_vertex, to_vertex, attrs = lane_data
-                
-                # Default values if not specified
-                speed_limit = attrs.get('speed_limit', 0)
-                
-                # Store lane data
-                lane = {
-                    'from_vertex': from_vertex,
-                    'to_vertex': to_vertex,
-                    'speed_limit': speed_limit,
-                    'occupying_robot': None,  # Track which robot is on this lane
-                    'is_blocked': False       # Flag for traffic management
-                }
-                self.lanes.append(lane)
-                
-                # Add edge to the graph
-                self.graph.add_edge(from_vertex, to_vertex, **lane)
-            
-            # Calculate position bounds for visualization scaling
-            self._calculate_bounds()
+            arrays = None
+            if self.use_cache:
+                source_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                cache_path = self.get_cache_path(json_file_path)
+                arrays = self._read_cache(cache_path, source_hash)
+            if arrays is None:
+                arrays = self._parse_json(json.loads(raw))
+                if self.use_cache:
+                    self._write_cache(cache_path, source_hash, arrays)
+            self._set_arrays(arrays)
             
             print(f"Loaded navigation graph with {len(self.vertices)} vertices and {len(self.lanes)} lanes")
             
@@ -89,19 +117,231 @@ class NavGraph:
             print(f"Error loading navigation graph: {e}")
             raise
     
+    def _parse_json(self, data):
+        """
+        Parse the vertices and lanes of a navigation graph JSON document.
+        
+        Args:
+            data (dict): Parsed JSON document
+        
+        Returns:
+            dict: Arrays named as in CACHE_ARRAYS
+        """
+        # Extract the level name (assuming there's only one level)
+        level_name = list(data['levels'].keys())[0]
+        level_data = data['levels'][level_name]
+        
+        # Parse vertices
+        vertex_data = level_data['vertices']
+        num_vertices = len(vertex_data)
+        vertex_x = np.empty(num_vertices, dtype=np.float64)
+        vertex_y = np.empty(num_vertices, dtype=np.float64)
+        vertex_is_charger = np.zeros(num_vertices, dtype=bool)
+        vertex_names = []
+        for i, (x, y, attrs) in enumerate(vertex_data):
+            vertex_x[i] = x
+            vertex_y[i] = y
+            
+            # Default values if not specified
+            vertex_names.append(attrs.get('name', f'v{i}'))
+            vertex_is_charger[i] = attrs.get('is_charger', False)
+        
+        # Parse lanes
+        lane_from = []
+        lane_to = []
+        lane_speed_limit = []
+        lane_index = {}
+        for from_vertex, to_vertex, attrs in level_data['lanes']:
+            # Default values if not specified
+            speed_limit = attrs.get('speed_limit', 0)
+            
+            # Duplicate lanes collapse onto one, the last speed limit wins
+            key = from_vertex * num_vertices + to_vertex
+            if key in lane_index:
+                lane_speed_limit[lane_index[key]] = speed_limit
+                continue
+            
+            lane_index[key] = len(lane_from)
+            lane_from.append(from_vertex)
+            lane_to.append(to_vertex)
+            lane_speed_limit.append(speed_limit)
+        
+        lane_from = np.array(lane_from, dtype=np.int32)
+        lane_to = np.array(lane_to, dtype=np.int32)
+        
+        # CSR adjacency: lanes leaving / entering each vertex
+        out_offsets, out_lanes = build_csr(lane_from, num_vertices)
+        in_offsets, in_lanes = build_csr(lane_to, num_vertices)
+        
+        return {
+            'vertex_x': vertex_x,
+            'vertex_y': vertex_y,
+            'vertex_is_charger': vertex_is_charger,
+            'vertex_names': np.array(vertex_names, dtype=str),
+            'lane_from': lane_from,
+            'lane_to': lane_to,
+            'lane_speed_limit': np.array(lane_speed_limit, dtype=np.float64),
+            'out_offsets': out_offsets,
+            'out_lanes': out_lanes,
+            'in_offsets': in_offsets,
+            'in_lanes': in_lanes,
+        }
+    
+    @staticmethod
+    def get_cache_path(json_file_path):
+        """
+        Get the directory of the compiled cache of a navigation graph.
+        
+        Args:
+            json_file_path (str): Path to the navigation graph JSON file
+        
+        Returns:
+            str: Path of the cache directory next to the JSON file
+        """
+        return json_file_path + CACHE_SUFFIX
+    
+    def _read_cache(self, cache_path, source_hash):
+        """
+        Memory-map the arrays of a compiled cache.
+        
+        Arrays are mapped copy-on-write, so nothing is read from disk until
+        used and changes made at runtime never reach the cache.
+        
+        Args:
+            cache_path (str): Cache directory
+            source_hash (str): Hash of the JSON content the cache must match
+        
+        Returns:
+            dict: Arrays named as in CACHE_ARRAYS, or None if there is no
+                cache or it is stale
+        """
+        try:
+            with open(os.path.join(cache_path, 'meta.json'), 'r') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_VERSION or meta.get('source_hash') != source_hash:
+                return None
+            return {name: np.load(os.path.join(cache_path, f'{name}.npy'), mmap_mode='c')
+                    for name in CACHE_ARRAYS}
+        except (OSError, ValueError):
+            return None
+    
+    def _write_cache(self, cache_path, source_hash, arrays):
+        """
+        Write a compiled cache, replacing any stale one.
+        
+        The cache is built in a temporary directory and moved into place, so
+        readers never see half of it. Failing to write it (e.g. next to a
+        read-only JSON file) is not an error.
+        
+        Args:
+            cache_path (str): Cache directory
+            source_hash (str): Hash of the JSON content the arrays come from
+            arrays (dict): Arrays named as in CACHE_ARRAYS
+        """
+        temp_path = None
+        try:
+            temp_path = tempfile.mkdtemp(prefix='.navcache-',
+                                         dir=os.path.dirname(os.path.abspath(cache_path)))
+            for name in CACHE_ARRAYS:
+                np.save(os.path.join(temp_path, f'{name}.npy'), arrays[name])
+            with open(os.path.join(temp_path, 'meta.json'), 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'source_hash': source_hash}, f)
+            
+            if os.path.isdir(cache_path):
+                shutil.rmtree(cache_path)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write navigation graph cache {cache_path}: {e}")
+            if temp_path is not None:
+                shutil.rmtree(temp_path, ignore_errors=True)
+    
+    def _set_arrays(self, arrays):
+        """
+        Take over the vertex and lane arrays and reset all derived state.
+        
+        Args:
+            arrays (dict): Arrays named as in CACHE_ARRAYS
+        """
+        self.vertex_x = arrays['vertex_x']
+        self.vertex_y = arrays['vertex_y']
+        self.vertex_is_charger = arrays['vertex_is_charger']
+        self.vertex_names = arrays['vertex_names'].tolist()
+        self.lane_from = arrays['lane_from']
+        self.lane_to = arrays['lane_to']
+        self.lane_speed_limit = arrays['lane_speed_limit']
+        self.out_offsets = arrays['out_offsets']
+        self.out_lanes = arrays['out_lanes']
+        self.in_offsets = arrays['in_offsets']
+        self.in_lanes = arrays['in_lanes']
+        
+        num_vertices = len(self.vertex_x)
+        num_lanes = len(self.lane_from)
+        keys = self.lane_from.astype(np.int64) * num_vertices + self.lane_to
+        self.lane_index = dict(zip(keys.tolist(), range(num_lanes)))
+        self.lane_length = np.hypot(self.vertex_x[self.lane_to] - self.vertex_x[self.lane_from],
+                                    self.vertex_y[self.lane_to] - self.vertex_y[self.lane_from])
+        
+        # Track which robot is at each vertex, and vertices closed to traffic
+        self.vertex_occupant = np.full(num_vertices, NO_ROBOT, dtype=np.int32)
+        self.vertex_blocked = np.zeros(num_vertices, dtype=bool)
+        
+        # Track which robot is on each lane, and lanes closed to traffic
+        self.lane_occupant = np.full(num_lanes, NO_ROBOT, dtype=np.int32)
+        self.lane_blocked = np.zeros(num_lanes, dtype=bool)
+        self.blocked_lanes = set()
+        self.closed_lanes = set()
+        
+        self.num_vertices = num_vertices
+        self.num_lanes = num_lanes
+        self.vertices = RecordSequence(self, VertexView, num_vertices)
+        self.lanes = RecordSequence(self, LaneView, num_lanes)
+        self._graph = None
+        self._update_travel_times()
+        self.path_cache = PathCache(self, max_sources=self.path_cache_size,
+                                    precompute=self.precompute_paths)
+        self.distance_fields = DistanceFieldCache(self, max_fields=self.distance_field_cache_size)
+        
+        # Calculate position bounds for visualization scaling
+        self._calculate_bounds()
+    
+    @property
+    def graph(self):
+        """
+        NetworkX view of the graph topology, built on first use.
+        
+        NetworkX is only imported here, so that loading and searching the
+        graph does not pay for it. Only static attributes (vertex
+        coordinates, lane speed limits and travel times) are copied onto the
+        graph; occupancy and blocking live in the NavGraph arrays.
+        
+        Returns:
+            nx.DiGraph: Directed graph of vertices and lanes
+        """
+        if self._graph is None:
+            import networkx as nx
+            graph = nx.DiGraph()
+            graph.add_nodes_from(
+                (i, {'x': float(x), 'y': float(y)})
+                for i, (x, y) in enumerate(zip(self.vertex_x, self.vertex_y))
+            )
+            graph.add_edges_from(
+                (int(u), int(v), {'speed_limit': float(s), 'travel_time': float(t)})
+                for u, v, s, t in zip(self.lane_from, self.lane_to,
+                                      self.lane_speed_limit, self.lane_travel_time)
+            )
+            self._graph = graph
+        return self._graph
+    
     def _calculate_bounds(self):
         """Calculate bounds for visualization scaling."""
         if not self.vertices:
             return
         
         # Find min and max x, y coordinates
-        x_coords = [v['x'] for v in self.vertices]
-        y_coords = [v['y'] for v in self.vertices]
-        
-        self.min_x = min(x_coords)
-        self.max_x = max(x_coords)
-        self.min_y = min(y_coords)
-        self.max_y = max(y_coords)
+        self.min_x = float(self.vertex_x.min())
+        self.max_x = float(self.vertex_x.max())
+        self.min_y = float(self.vertex_y.min())
+        self.max_y = float(self.vertex_y.max())
         
         # Add padding to ensure vertices aren't at the edge
         padding = 2.0
@@ -123,6 +363,12 @@ class NavGraph:
         # Center the graph in the available space
         self.offset_x = margin_x + (screen_width - 2*margin_x - width * self.scale_factor) / 2
         self.offset_y = margin_y + (screen_height - 2*margin_y - height * self.scale_factor) / 2
+        
+        # Scale every vertex once and index the result for hit-testing
+        self.screen_x = ((self.vertex_x - self.min_x) * self.scale_factor + self.offset_x).astype(np.int64)
+        self.screen_y = ((self.vertex_y - self.min_y) * self.scale_factor + self.offset_y).astype(np.int64)
+        self.vertex_index.build(self.screen_x, self.screen_y)
+    
     def get_scaled_position(self, vertex_id):
         """
         Get the scaled position of a vertex for visualization.
@@ -133,10 +379,7 @@ class NavGraph:
         Returns:
             tuple: (x, y) scaled position coordinates
         """
-        vertex = self.vertices[vertex_id]
-        x = (vertex['x'] - self.min_x) * self.scale_factor + self.offset_x
-        y = (vertex['y'] - self.min_y) * self.scale_factor + self.offset_y
-        return (int(x), int(y))
+        return (int(self.screen_x[vertex_id]), int(self.screen_y[vertex_id]))
     
     def get_vertex_at_position(self, x, y, tolerance=15):
         """
@@ -148,18 +391,27 @@ class NavGraph:
             tolerance (int): Click tolerance in pixels
         
         Returns:
-            int or None: Vertex ID if found, None otherwise
+            int or None: ID of the closest vertex within the tolerance,
+                None if there is none
         """
-        for vertex in self.vertices:
-            pos_x, pos_y = self.get_scaled_position(vertex['id'])
-            distance = np.sqrt((pos_x - x)**2 + (pos_y - y)**2)
-            if distance <= tolerance:
-                return vertex['id']
-        return None
+        return self.vertex_index.query_nearest(x, y, tolerance)
+    
+    def _update_travel_times(self):
+        """Recompute lane travel times after lengths or speed limits change."""
+        speeds = np.where(self.lane_speed_limit > 0, self.lane_speed_limit,
+                          self.DEFAULT_SPEED_LIMIT)
+        self.lane_speed = speeds
+        self.lane_travel_time = self.lane_length / speeds
+        self.max_speed = float(speeds.max()) if len(speeds) else self.DEFAULT_SPEED_LIMIT
+        self._graph = None
+        self._search_adjacency = None
+        self._reverse_search_adjacency = None
     
     def get_shortest_path(self, start_vertex, end_vertex):
         """
-        Get the shortest path between two vertices.
+        Get the fastest path between two vertices.
+        
+        Answers come from the path cache; blocked lanes are never used.
         
         Args:
             start_vertex (int): Starting vertex ID
@@ -168,12 +420,515 @@ class NavGraph:
         Returns:
             list: List of vertex IDs forming the path
         """
-        try:
-            path = nx.shortest_path(self.graph, start_vertex, end_vertex)
-            return path
-        except nx.NetworkXNoPath:
+        return self.path_cache.get_path(start_vertex, end_vertex)
+    
+    def find_path(self, start_vertex, end_vertex, avoid_vertices=(), avoid_lanes=()):
+        """
+        Find the fastest path between two vertices with A*.
+        
+        Lanes are weighted by travel time (length / speed limit) and the
+        search is guided by the straight-line distance to the destination at
+        the fastest speed on the graph, which never overestimates.
+        
+        Args:
+            start_vertex (int): Starting vertex ID
+            end_vertex (int): Destination vertex ID
+            avoid_vertices (iterable): Vertex IDs the path must not enter
+            avoid_lanes (iterable): Lane IDs the path must not use, on top
+                of the blocked lanes
+        
+        Returns:
+            list: List of vertex IDs forming the path, or None if no path exists
+        """
+        offsets, targets, lane_ids, weights = self.get_search_adjacency()
+        xs, ys = self._search_coords
+        blocked = self.blocked_lanes
+        if avoid_lanes:
+            blocked = blocked | set(avoid_lanes)
+        avoid_vertices = set(avoid_vertices)
+        
+        goal_x = xs[end_vertex]
+        goal_y = ys[end_vertex]
+        inv_speed = 1.0 / self.max_speed
+        
+        def heuristic(vertex):
+            return math.hypot(xs[vertex] - goal_x, ys[vertex] - goal_y) * inv_speed
+        
+        cost = {start_vertex: 0.0}
+        parent = {start_vertex: start_vertex}
+        closed = set()
+        
+        # Heap entries carry the negated cost so that ties on the estimated
+        # total are broken towards vertices closer to the destination
+        heap = [(heuristic(start_vertex), -0.0, start_vertex)]
+        
+        while heap:
+            _, neg_cost, vertex = heapq.heappop(heap)
+            if vertex == end_vertex:
+                path = [vertex]
+                while vertex != start_vertex:
+                    vertex = parent[vertex]
+                    path.append(vertex)
+                path.reverse()
+                return path
+            
+            if vertex in closed:
+                continue
+            closed.add(vertex)
+            cost_so_far = -neg_cost
+            
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                if lane_ids[k] in blocked:
+                    continue
+                neighbor = targets[k]
+                if neighbor in avoid_vertices:
+                    continue
+                new_cost = cost_so_far + weights[k]
+                if new_cost < cost.get(neighbor, math.inf):
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = vertex
+                    heapq.heappush(heap, (new_cost + heuristic(neighbor), -new_cost, neighbor))
+        
+        return None
+    
+    def shortest_path_tree(self, source):
+        """
+        Search outwards from a vertex over all unblocked lanes.
+        
+        Uses Dijkstra's algorithm with the same travel-time weights as
+        find_path, so cached paths match A* results.
+        
+        Args:
+            source (int): Source vertex ID
+        
+        Returns:
+            np.ndarray: Predecessor of every vertex on a fastest path from
+                the source (the source is its own predecessor), or
+                UNREACHED for vertices that cannot be reached
+        """
+        offsets, targets, lane_ids, weights = self.get_search_adjacency()
+        blocked = self.blocked_lanes
+        
+        predecessors = [UNREACHED] * self.num_vertices
+        predecessors[source] = source
+        cost = [math.inf] * self.num_vertices
+        cost[source] = 0.0
+        
+        heap = [(0.0, source)]
+        while heap:
+            cost_so_far, vertex = heapq.heappop(heap)
+            if cost_so_far > cost[vertex]:
+                continue
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                if lane_ids[k] in blocked:
+                    continue
+                neighbor = targets[k]
+                new_cost = cost_so_far + weights[k]
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    predecessors[neighbor] = vertex
+                    heapq.heappush(heap, (new_cost, neighbor))
+        
+        return np.array(predecessors, dtype=np.int32)
+    
+    def travel_times_to(self, goal_vertex):
+        """
+        Get the fastest travel time from every vertex to a goal.
+        
+        Runs Dijkstra's algorithm backwards over incoming lanes, so one
+        search covers every possible start vertex.
+        
+        Args:
+            goal_vertex (int): Goal vertex ID
+        
+        Returns:
+            np.ndarray: Travel time in seconds per vertex, inf where the goal
+                cannot be reached
+        """
+        offsets, sources, lane_ids, weights = self.get_reverse_search_adjacency()
+        blocked = self.blocked_lanes
+        
+        cost = [math.inf] * self.num_vertices
+        cost[goal_vertex] = 0.0
+        
+        heap = [(0.0, goal_vertex)]
+        while heap:
+            cost_so_far, vertex = heapq.heappop(heap)
+            if cost_so_far > cost[vertex]:
+                continue
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                if lane_ids[k] in blocked:
+                    continue
+                neighbor = sources[k]
+                new_cost = cost_so_far + weights[k]
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+        
+        return np.array(cost, dtype=np.float64)
+    
+    def get_distance_field(self, goal_vertex):
+        """
+        Get the cached fastest travel time from every vertex to a goal.
+        
+        Args:
+            goal_vertex (int): Goal vertex ID
+        
+        Returns:
+            np.ndarray: Read-only float32 travel time in seconds per vertex,
+                inf where the goal cannot be reached
+        """
+        return self.distance_fields.get_field(goal_vertex)
+    
+    def estimate_travel_time(self, from_vertex, to_vertex):
+        """
+        Get the fastest travel time between two vertices.
+        
+        Args:
+            from_vertex (int): Start vertex ID
+            to_vertex (int): Goal vertex ID
+        
+        Returns:
+            float: Travel time in seconds, inf if the goal cannot be reached
+        """
+        return float(self.get_distance_field(to_vertex)[from_vertex])
+    
+    def get_nearest_charger(self, vertex_id):
+        """
+        Get the charger that can be reached fastest from a vertex.
+        
+        Args:
+            vertex_id (int): Start vertex ID
+        
+        Returns:
+            tuple: (charger vertex ID, travel time in seconds), or
+                (None, inf) if no charger can be reached
+        """
+        nearest, nearest_time = None, math.inf
+        for charger in np.flatnonzero(self.vertex_is_charger).tolist():
+            time = float(self.get_distance_field(charger)[vertex_id])
+            if time < nearest_time:
+                nearest, nearest_time = charger, time
+        return nearest, nearest_time
+    
+    def travel_time_matrix(self, source_vertices, target_vertices):
+        """
+        Get the fastest travel times from a set of vertices to another.
+        
+        Reads one distance field per distinct target vertex.
+        
+        Args:
+            source_vertices (list): Start vertex IDs
+            target_vertices (list): Goal vertex IDs
+        
+        Returns:
+            np.ndarray: Travel time in seconds of shape (sources, targets),
+                inf where a target cannot be reached
+        """
+        sources = np.asarray(source_vertices, dtype=np.int64)
+        targets, target_columns = np.unique(np.asarray(target_vertices, dtype=np.int64),
+                                            return_inverse=True)
+        
+        times = np.empty((len(sources), len(targets)))
+        for k, target in enumerate(targets.tolist()):
+            times[:, k] = self.get_distance_field(target)[sources]
+        return times[:, target_columns]
+    
+    def get_travel_time(self, from_vertex, to_vertex):
+        """
+        Get the time needed to traverse a lane.
+        
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+        
+        Returns:
+            float or None: Travel time in seconds, None if there is no lane
+        """
+        lane_id = self.get_lane_id(from_vertex, to_vertex)
+        if lane_id is None:
             return None
+        return float(self.lane_travel_time[lane_id])
+    
+    def get_path_travel_time(self, path):
+        """
+        Get the total time needed to follow a path.
+        
+        Args:
+            path (list): List of vertex IDs; repeated vertices (waits) add
+                no travel time
+        
+        Returns:
+            float: Travel time in seconds
+        """
+        total = 0.0
+        for from_vertex, to_vertex in zip(path, path[1:]):
+            if from_vertex == to_vertex:
+                continue
+            total += self.lane_travel_time[self.get_lane_id(from_vertex, to_vertex)]
+        return float(total)
+    
+    def get_search_adjacency(self):
+        """
+        Get the outgoing CSR adjacency as plain lists for search loops.
+        
+        Indexing Python lists is much faster than indexing NumPy scalars one
+        at a time, so searches use this copy of the CSR arrays.
+        
+        Returns:
+            tuple: (offsets, target vertices, lane IDs, travel times)
+        """
+        if self._search_adjacency is None:
+            self._search_adjacency = (
+                self.out_offsets.tolist(),
+                self.lane_to[self.out_lanes].tolist(),
+                self.out_lanes.tolist(),
+                self.lane_travel_time[self.out_lanes].tolist()
+            )
+            self._search_coords = (self.vertex_x.tolist(), self.vertex_y.tolist())
+        return self._search_adjacency
+    
+    def get_reverse_search_adjacency(self):
+        """
+        Get the incoming CSR adjacency as plain lists for backward searches.
+        
+        Returns:
+            tuple: (offsets, source vertices, lane IDs, travel times)
+        """
+        if self._reverse_search_adjacency is None:
+            self._reverse_search_adjacency = (
+                self.in_offsets.tolist(),
+                self.lane_from[self.in_lanes].tolist(),
+                self.in_lanes.tolist(),
+                self.lane_travel_time[self.in_lanes].tolist()
+            )
+        return self._reverse_search_adjacency
+    
+    def block_lane(self, from_vertex, to_vertex):
+        """
+        Close a lane to traffic.
         
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+        
+        Returns:
+            bool: True if the lane exists, False otherwise
+        """
+        return self.set_lane_blocked(from_vertex, to_vertex, True)
+    
+    def unblock_lane(self, from_vertex, to_vertex):
+        """
+        Reopen a lane to traffic.
+        
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+        
+        Returns:
+            bool: True if the lane exists, False otherwise
+        """
+        return self.set_lane_blocked(from_vertex, to_vertex, False)
+    
+    def set_lane_blocked(self, from_vertex, to_vertex, blocked):
+        """
+        Set whether a lane is closed to traffic.
+        
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+            blocked (bool): True to block the lane, False to unblock it
+        
+        Returns:
+            bool: True if the lane exists, False otherwise
+        """
+        lane_id = self.get_lane_id(from_vertex, to_vertex)
+        if lane_id is None:
+            return False
+        self.set_lane_blocked_by_id(lane_id, blocked)
+        return True
+    
+    def set_lane_blocked_by_id(self, lane_id, blocked):
+        """
+        Set whether a lane is closed to traffic, by lane ID.
+        
+        A lane into a blocked vertex stays blocked until the vertex is
+        unblocked as well.
+        
+        Args:
+            lane_id (int): Lane ID
+            blocked (bool): True to block the lane, False to unblock it
+        """
+        if blocked:
+            self.closed_lanes.add(lane_id)
+        else:
+            self.closed_lanes.discard(lane_id)
+        self._refresh_blocked_lanes((lane_id,))
+    
+    def block_vertex(self, vertex_id):
+        """
+        Close a vertex to traffic by blocking every lane into it.
+        
+        Robots already on the vertex can still leave it.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        """
+        self.set_vertex_blocked(vertex_id, True)
+    
+    def unblock_vertex(self, vertex_id):
+        """
+        Reopen a vertex to traffic.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        """
+        self.set_vertex_blocked(vertex_id, False)
+    
+    def set_vertex_blocked(self, vertex_id, blocked):
+        """
+        Set whether a vertex is closed to traffic.
+        
+        Args:
+            vertex_id (int): Vertex ID
+            blocked (bool): True to block the vertex, False to unblock it
+        """
+        self.vertex_blocked[vertex_id] = bool(blocked)
+        self._refresh_blocked_lanes(self.get_incoming_lane_ids(vertex_id).tolist())
+    
+    def _refresh_blocked_lanes(self, lane_ids):
+        """
+        Recompute whether lanes are usable after a lane or vertex changed.
+        
+        Cached paths and distance fields are dropped and the lane listeners
+        told whenever a lane's usability actually changes.
+        
+        Args:
+            lane_ids (iterable): IDs of the lanes to recompute
+        """
+        changed = []
+        for lane_id in lane_ids:
+            blocked = lane_id in self.closed_lanes or bool(self.vertex_blocked[self.lane_to[lane_id]])
+            if self.lane_blocked[lane_id] == blocked:
+                continue
+            
+            self.lane_blocked[lane_id] = blocked
+            if blocked:
+                self.blocked_lanes.add(lane_id)
+            else:
+                self.blocked_lanes.discard(lane_id)
+            changed.append(lane_id)
+        
+        if changed:
+            self._lanes_changed(changed)
+    
+    def add_lane_listener(self, callback):
+        """
+        Register a callback for lanes being blocked, unblocked or changing speed.
+        
+        Args:
+            callback (callable): Called with the list of IDs of the lanes
+                whose travel cost changed, after caches were dropped
+        """
+        self.lane_listeners.append(callback)
+    
+    def _lanes_changed(self, lane_ids):
+        """Drop cached paths and fields, then notify the lane listeners."""
+        self.path_cache.invalidate()
+        self.distance_fields.invalidate()
+        for listener in self.lane_listeners:
+            listener(lane_ids)
+    
+    def set_lane_speed_limit_by_id(self, lane_id, speed_limit):
+        """
+        Change a lane's speed limit, updating travel times, cached paths and fields.
+        
+        Args:
+            lane_id (int): Lane ID
+            speed_limit (float): New speed limit, 0 for the default speed
+        """
+        self.lane_speed_limit[lane_id] = speed_limit
+        self._update_travel_times()
+        self._lanes_changed([lane_id])
+    
+    def get_lane_id(self, from_vertex, to_vertex):
+        """
+        Look up the ID of the lane between two vertices.
+        
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+        
+        Returns:
+            int or None: Lane ID if the lane exists, None otherwise
+        """
+        # Python ints, so NumPy int32 IDs cannot overflow on large graphs
+        return self.lane_index.get(int(from_vertex) * self.num_vertices + int(to_vertex))
+    
+    def get_lane(self, from_vertex, to_vertex):
+        """
+        Look up the lane between two vertices.
+        
+        Args:
+            from_vertex (int): From vertex ID
+            to_vertex (int): To vertex ID
+        
+        Returns:
+            LaneView or None: Lane data if the lane exists, None otherwise
+        """
+        lane_id = self.get_lane_id(from_vertex, to_vertex)
+        if lane_id is None:
+            return None
+        return LaneView(self, lane_id)
+    
+    def get_outgoing_lane_ids(self, vertex_id):
+        """
+        Get the IDs of the lanes leaving a vertex.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        
+        Returns:
+            np.ndarray: Lane IDs of every lane starting at the vertex
+        """
+        return self.out_lanes[self.out_offsets[vertex_id]:self.out_offsets[vertex_id + 1]]
+    
+    def get_incoming_lane_ids(self, vertex_id):
+        """
+        Get the IDs of the lanes entering a vertex.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        
+        Returns:
+            np.ndarray: Lane IDs of every lane ending at the vertex
+        """
+        return self.in_lanes[self.in_offsets[vertex_id]:self.in_offsets[vertex_id + 1]]
+    
+    def get_outgoing_lanes(self, vertex_id):
+        """
+        Get the lanes leaving a vertex.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        
+        Returns:
+            list: Lane data for every lane starting at the vertex
+        """
+        return [LaneView(self, int(i)) for i in self.get_outgoing_lane_ids(vertex_id)]
+    
+    def get_incoming_lanes(self, vertex_id):
+        """
+        Get the lanes entering a vertex.
+        
+        Args:
+            vertex_id (int): Vertex ID
+        
+        Returns:
+            list: Lane data for every lane ending at the vertex
+        """
+        return [LaneView(self, int(i)) for i in self.get_incoming_lane_ids(vertex_id)]
+    
     def reserve_vertex(self, vertex_id, robot_id):
         """
         Try to reserve a vertex for a robot.
@@ -185,9 +940,12 @@ class NavGraph:
         Returns:
             bool: True if reservation succeeded, False otherwise
         """
-        if self.vertices[vertex_id]['occupying_robot'] is None:
-            self.vertices[vertex_id]['occupying_robot'] = robot_id
+        occupant = self.vertex_occupant[vertex_id]
+        if occupant == NO_ROBOT:
+            self.vertex_occupant[vertex_id] = robot_id
             return True
+        if occupant != robot_id:
+            self.reservation_failures += 1
         return False
     
     def release_vertex(self, vertex_id, robot_id):
@@ -198,8 +956,8 @@ class NavGraph:
             vertex_id (int): Vertex ID to release
             robot_id (int): Robot ID that was occupying the vertex
         """
-        if self.vertices[vertex_id]['occupying_robot'] == robot_id:
-            self.vertices[vertex_id]['occupying_robot'] = None
+        if self.vertex_occupant[vertex_id] == robot_id:
+            self.vertex_occupant[vertex_id] = NO_ROBOT
     
     def reserve_lane(self, from_vertex, to_vertex, robot_id):
         """
@@ -213,12 +971,13 @@ class NavGraph:
         Returns:
             bool: True if reservation succeeded, False otherwise
         """
-        for lane in self.lanes:
-            if lane['from_vertex'] == from_vertex and lane['to_vertex'] == to_vertex:
-                if lane['occupying_robot'] is None and not lane['is_blocked']:
-                    lane['occupying_robot'] = robot_id
-                    return True
-                return False
+        lane_id = self.get_lane_id(from_vertex, to_vertex)
+        if lane_id is None:
+            return False
+        if self.lane_occupant[lane_id] == NO_ROBOT and not self.lane_blocked[lane_id]:
+            self.lane_occupant[lane_id] = robot_id
+            return True
+        self.reservation_failures += 1
         return False
     
     def release_lane(self, from_vertex, to_vertex, robot_id):
@@ -230,7 +989,6 @@ class NavGraph:
             to_vertex (int): To vertex ID
             robot_id (int): Robot ID that was occupying the lane
         """
-        for lane in self.lanes:
-            if lane['from_vertex'] == from_vertex and lane['to_vertex'] == to_vertex:
-                if lane['occupying_robot'] == robot_id:
-                    lane['occupying_robot'] = None
+        lane_id = self.get_lane_id(from_vertex, to_vertex)
+        if lane_id is not None and self.lane_occupant[lane_id] == robot_id:
+            self.lane_occupant[lane_id] = NO_ROBOT
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+import numpy as np
+
+# Marker for vertices that a search did not reach
+UNREACHED = -1
+
+
+class PathCache:
+    """
+    Cache of shortest paths over a NavGraph.
+    
+    Small graphs can precompute an all-pairs next-hop table up front. Other
+    graphs fill a per-source cache lazily: the first query from a source is
+    answered with a point-to-point A* search, a repeat query from the same
+    source runs one single-source search, and every later query from that
+    source is answered from its predecessor tree. Per-source entries are
+    evicted in least-recently-used order. Any change to which lanes are usable must be
+    followed by a call to invalidate().
+    """
+    
+    def __init__(self, nav_graph, max_sources=256, memory_budget=64 * 1024 * 1024,
+                 precompute=False):
+        """
+        Initialize the path cache.
+        
+        Args:
+            nav_graph (NavGraph): Graph to answer path queries for
+            max_sources (int): Maximum number of cached source trees
+            memory_budget (int): Upper bound in bytes for cached trees; on
+                large graphs this lowers the number of cached sources
+            precompute (bool): Whether to build the all-pairs next-hop table
+        """
+        self.nav_graph = nav_graph
+        self.precompute = precompute
+        
+        # Each cached tree is one int32 predecessor per vertex
+        tree_bytes = max(1, nav_graph.num_vertices * 4)
+        self.max_sources = max(1, min(max_sources, memory_budget // tree_bytes))
+        
+        self.trees = OrderedDict()  # source vertex -> predecessor array
+        self.seen_sources = OrderedDict()  # sources queried once, not yet cached
+        self.next_hop = None        # all-pairs table, next_hop[source, target]
+        
+        # Query statistics
+        self.hits = 0
+        self.misses = 0
+    
+    def invalidate(self):
+        """Drop every cached path after the usable lanes changed."""
+        self.trees.clear()
+        self.seen_sources.clear()
+        self.next_hop = None
+    
+    def get_path(self, start_vertex, end_vertex):
+        """
+        Get the shortest path between two vertices.
+        
+        Args:
+            start_vertex (int): Starting vertex ID
+            end_vertex (int): Destination vertex ID
+        
+        Returns:
+            list: List of vertex IDs forming the path, or None if no path exists
+        """
+        if self.precompute:
+            return self._get_path_from_table(start_vertex, end_vertex)
+        
+        predecessors = self.trees.get(start_vertex)
+        if predecessors is None:
+            self.misses += 1
+            
+            # One-off queries are cheaper with A* than with a full tree
+            if start_vertex not in self.seen_sources:
+                self.seen_sources[start_vertex] = True
+                if len(self.seen_sources) > self.max_sources:
+                    self.seen_sources.popitem(last=False)
+                return self.nav_graph.find_path(start_vertex, end_vertex)
+            
+            del self.seen_sources[start_vertex]
+            predecessors = self.nav_graph.shortest_path_tree(start_vertex)
+            self.trees[start_vertex] = predecessors
+            if len(self.trees) > self.max_sources:
+                self.trees.popitem(last=False)
+        else:
+            self.hits += 1
+            self.trees.move_to_end(start_vertex)
+        
+        return self._walk_predecessors(predecessors, start_vertex, end_vertex)
+    
+    def build_next_hop_table(self):
+        """
+        Precompute the all-pairs next-hop table.
+        
+        Runs one single-source search per vertex, so this is only meant for
+        small graphs; memory grows with the square of the vertex count.
+        """
+        num_vertices = self.nav_graph.num_vertices
+        table = np.full((num_vertices, num_vertices), UNREACHED, dtype=np.int32)
+        
+        for source in range(num_vertices):
+            predecessors = self.nav_graph.shortest_path_tree(source)
+            row = table[source]
+            
+            # Resolve each target's first hop from its predecessor's first hop,
+            # visiting parents before their children
+            first_hop = {source: source}
+            for target in self._tree_order(predecessors, source):
+                parent = int(predecessors[target])
+                first_hop[target] = target if parent == source else first_hop[parent]
+                row[target] = first_hop[target]
+            row[source] = source
+        
+        self.next_hop = table
+    
+    def _get_path_from_table(self, start_vertex, end_vertex):
+        """Answer a query from the all-pairs next-hop table."""
+        if self.next_hop is None:
+            self.misses += 1
+            self.build_next_hop_table()
+        else:
+            self.hits += 1
+        
+        if self.next_hop[start_vertex, end_vertex] == UNREACHED:
+            return None
+        
+        path = [start_vertex]
+        current = start_vertex
+        while current != end_vertex:
+            current = int(self.next_hop[current, end_vertex])
+            path.append(current)
+        return path
+    
+    @staticmethod
+    def _walk_predecessors(predecessors, start_vertex, end_vertex):
+        """Rebuild the path to end_vertex from a single-source predecessor tree."""
+        if predecessors[end_vertex] == UNREACHED:
+            return None
+        
+        path = [end_vertex]
+        current = end_vertex
+        while current != start_vertex:
+            current = int(predecessors[current])
+            path.append(current)
+        path.reverse()
+        return path
+    
+    @staticmethod
+    def _tree_order(predecessors, source):
+        """List the vertices reached by a tree, parents before children."""
+        children = {}
+        for vertex, parent in enumerate(predecessors.tolist()):
+            if parent != UNREACHED and vertex != source:
+                children.setdefault(parent, []).append(vertex)
+        
+        order = []
+        stack = [source]
+        while stack:
+            vertex = stack.pop()
+            for child in children.get(vertex, ()):
+                order.append(child)
+                stack.append(child)
+        return order
@@ -0,0 +1,164 @@
+class ReservationTable:
+    """
+    Space-time reservation table for cooperative path planning.
+    
+    Time is divided into discrete steps of step_duration seconds. A robot
+    reserves a vertex for every step it spends there and a lane for every
+    step it spends driving along it. After the last step of its plan a
+    robot stays parked on its final vertex until it plans again.
+    """
+    
+    def __init__(self, step_duration=1.0):
+        """
+        Initialize the reservation table.
+        
+        Args:
+            step_duration (float): Length of one time step in seconds
+        """
+        self.step_duration = step_duration
+        self.current_step = 0
+        self.elapsed_time = 0.0
+        
+        self.vertex_reservations = {}  # (vertex ID, step) -> robot ID
+        self.lane_reservations = {}    # (lane ID, step) -> robot ID
+        self.parked = {}               # vertex ID -> (robot ID, first step)
+        self.last_vertex_step = {}     # vertex ID -> last reserved step
+        self.robot_entries = {}        # robot ID -> (vertex keys, lane keys)
+        self.robot_parking = {}        # robot ID -> parked vertex ID
+    
+    def advance(self, delta_time):
+        """
+        Advance the table clock and forget reservations in the past.
+        
+        Args:
+            delta_time (float): Time elapsed since last update in seconds
+        """
+        self.elapsed_time += delta_time
+        new_step = int(self.elapsed_time / self.step_duration)
+        if new_step == self.current_step:
+            return
+        self.current_step = new_step
+        
+        # Drop the entries that have fallen behind the clock
+        for robot_id, (vertex_keys, lane_keys) in self.robot_entries.items():
+            for key in [k for k in vertex_keys if k[1] < new_step]:
+                vertex_keys.discard(key)
+                if self.vertex_reservations.get(key) == robot_id:
+                    del self.vertex_reservations[key]
+            for key in [k for k in lane_keys if k[1] < new_step]:
+                lane_keys.discard(key)
+                if self.lane_reservations.get(key) == robot_id:
+                    del self.lane_reservations[key]
+    
+    def is_vertex_free(self, vertex_id, step, robot_id):
+        """
+        Check whether a vertex is free for a robot at a time step.
+        
+        Args:
+            vertex_id (int): Vertex ID
+            step (int): Time step
+            robot_id (int): Robot asking for the vertex
+        
+        Returns:
+            bool: True if no other robot holds the vertex at that step
+        """
+        holder = self.vertex_reservations.get((vertex_id, step))
+        if holder is not None and holder != robot_id:
+            return False
+        
+        parked = self.parked.get(vertex_id)
+        if parked is not None and parked[0] != robot_id and step >= parked[1]:
+            return False
+        return True
+    
+    def is_lane_free(self, lane_id, step, robot_id):
+        """
+        Check whether a lane is free for a robot at a time step.
+        
+        Args:
+            lane_id (int): Lane ID
+            step (int): Time step
+            robot_id (int): Robot asking for the lane
+        
+        Returns:
+            bool: True if no other robot holds the lane at that step
+        """
+        holder = self.lane_reservations.get((lane_id, step))
+        return holder is None or holder == robot_id
+    
+    def can_park(self, vertex_id, step, robot_id):
+        """
+        Check whether a robot can stay on a vertex from a step onwards.
+        
+        Args:
+            vertex_id (int): Vertex ID
+            step (int): First step of the stay
+            robot_id (int): Robot asking to park
+        
+        Returns:
+            bool: True if no other robot needs the vertex from then on
+        """
+        parked = self.parked.get(vertex_id)
+        if parked is not None and parked[0] != robot_id:
+            return False
+        
+        # Another robot passing through later would run into us
+        if self.last_vertex_step.get(vertex_id, -1) >= step:
+            for s in range(step, self.last_vertex_step[vertex_id] + 1):
+                if not self.is_vertex_free(vertex_id, s, robot_id):
+                    return False
+        return True
+    
+    def reserve_path(self, robot_id, timed_path, lane_ids):
+        """
+        Reserve a timed path for a robot, replacing its earlier reservations.
+        
+        Args:
+            robot_id (int): Robot ID
+            timed_path (list): (vertex ID, step) waypoints in time order
+            lane_ids (list): Lane ID driven between consecutive waypoints,
+                None where the robot waits in place
+        """
+        self.release(robot_id)
+        vertex_keys = set()
+        lane_keys = set()
+        
+        for i, (vertex_id, step) in enumerate(timed_path):
+            key = (vertex_id, step)
+            self.vertex_reservations.setdefault(key, robot_id)
+            vertex_keys.add(key)
+            self.last_vertex_step[vertex_id] = max(self.last_vertex_step.get(vertex_id, -1), step)
+            
+            # Hold the lane for every step spent driving along it
+            if i + 1 < len(timed_path) and lane_ids[i] is not None:
+                for s in range(step, timed_path[i + 1][1]):
+                    key = (lane_ids[i], s)
+                    self.lane_reservations.setdefault(key, robot_id)
+                    lane_keys.add(key)
+        
+        self.robot_entries[robot_id] = (vertex_keys, lane_keys)
+        
+        # Stay parked at the end of the path
+        if timed_path:
+            final_vertex, final_step = timed_path[-1]
+            self.parked[final_vertex] = (robot_id, final_step)
+            self.robot_parking[robot_id] = final_vertex
+    
+    def release(self, robot_id):
+        """
+        Release every reservation held by a robot.
+        
+        Args:
+            robot_id (int): Robot ID
+        """
+        vertex_keys, lane_keys = self.robot_entries.pop(robot_id, ((), ()))
+        for key in vertex_keys:
+            if self.vertex_reservations.get(key) == robot_id:
+                del self.vertex_reservations[key]
+        for key in lane_keys:
+            if self.lane_reservations.get(key) == robot_id:
+                del self.lane_reservations[key]
+        
+        parked_vertex = self.robot_parking.pop(robot_id, None)
+        if parked_vertex is not None and self.parked.get(parked_vertex, (None,))[0] == robot_id:
+            del self.parked[parked_vertex]
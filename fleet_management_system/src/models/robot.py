@@ -1,5 +1,8 @@
+import math
 import time
-import numpy as np
+
+from .fleet_state import FleetState
+from .graph_storage import NO_ROBOT
 
 class Robot:
     """Robot class for the fleet management system."""
@@ -11,7 +14,7 @@ class Robot:
     CHARGING = "charging"
     COMPLETED = "completed"
     
-    def __init__(self, robot_id, start_vertex, nav_graph, color):
+    def __init__(self, robot_id, start_vertex, nav_graph, color, fleet_state=None):
         """
         Initialize a robot.
         
@@ -20,6 +23,8 @@ class Robot:
             start_vertex (int): Starting vertex ID
             nav_graph (NavGraph): Reference to the navigation graph
             color (tuple): RGB color tuple for visualization
+            fleet_state (FleetState): Shared array store holding the robot's
+                position; a robot on its own gets a private one
         """
         self.id = robot_id
         self.current_vertex = start_vertex
@@ -31,20 +36,86 @@ class Robot:
         self.current_path_index = 0
         self.target_vertex = None
         
-        self.position = nav_graph.get_scaled_position(start_vertex)
-        self.target_position = self.position
-        self.move_speed = 2.0  # pixels per tick
+        # Position, target and speed (pixels per second) live in the fleet arrays
+        if fleet_state is None:
+            fleet_state = FleetState(capacity=1)
+        self.fleet_state = fleet_state
+        self.slot = fleet_state.add_robot(self, nav_graph.get_scaled_position(start_vertex),
+                                          nav_graph.DEFAULT_SPEED_LIMIT * nav_graph.scale_factor)
         self.last_action_time = time.time()
         
+        # Repeated vertices in a path are waits of one reservation step each
+        self.wait_step_duration = 1.0
+        self.hold_time = 0.0
+        
+        # Step length of the reservations the path was planned against, or
+        # None for a path that was not planned against reservations
+        self.planned_step_duration = None
+        
+        # Lane or vertex a waiting robot sleeps on until its holder frees it
+        self.waiting_on = None
+        
+        # Higher priority robots win deadlock resolution under the 'priority' policy
+        self.priority = 0
+        
+        # Scheduled task the robot is working on; robots with a task never
+        # top up on chargers they pass on the way
+        self.task_id = None
+        
         # Reserve the initial position
         self.nav_graph.reserve_vertex(start_vertex, self.id)
+        self.fleet_state.active[self.slot] = self.needs_update()
+    
+    @property
+    def position(self):
+        """Current position (x, y) in screen coordinates."""
+        slot = self.slot
+        return (float(self.fleet_state.pos_x[slot]), float(self.fleet_state.pos_y[slot]))
+    
+    @position.setter
+    def position(self, value):
+        self.fleet_state.pos_x[self.slot] = value[0]
+        self.fleet_state.pos_y[self.slot] = value[1]
+        self.fleet_state.version += 1
+    
+    @property
+    def target_position(self):
+        """Position (x, y) the robot is driving to."""
+        slot = self.slot
+        return (float(self.fleet_state.target_x[slot]), float(self.fleet_state.target_y[slot]))
+    
+    @target_position.setter
+    def target_position(self, value):
+        self.fleet_state.target_x[self.slot] = value[0]
+        self.fleet_state.target_y[self.slot] = value[1]
+    
+    @property
+    def battery(self):
+        """Battery level from 0.0 (empty) to 1.0 (full)."""
+        return float(self.fleet_state.battery[self.slot])
+    
+    @battery.setter
+    def battery(self, value):
+        self.fleet_state.battery[self.slot] = value
+    
+    @property
+    def move_speed(self):
+        """Driving speed in pixels per second."""
+        return float(self.fleet_state.speed[self.slot])
+    
+    @move_speed.setter
+    def move_speed(self, value):
+        self.fleet_state.speed[self.slot] = value
     
-    def assign_task(self, destination_vertex):
+    def assign_task(self, destination_vertex, planner=None):
         """
         Assign a navigation task to the robot.
         
         Args:
             destination_vertex (int): Destination vertex ID
+            planner (TrafficManager): Optional cooperative planner providing
+                plan_path() and step_duration; without one the robot takes
+                the fastest path
         
         Returns:
             bool: True if task was successfully assigned, False otherwise
@@ -53,17 +124,163 @@ class Robot:
             return False
         
         # Calculate path to destination
-        path = self.nav_graph.get_shortest_path(self.current_vertex, destination_vertex)
-        if path is None:
+        if planner is not None:
+            path = planner.plan_path(self.id, self.current_vertex, destination_vertex)
+            wait_step_duration = planner.step_duration
+        else:
+            path = self.nav_graph.get_shortest_path(self.current_vertex, destination_vertex)
+            wait_step_duration = None
+        
+        return self.follow_path(path, wait_step_duration)
+    
+    def follow_path(self, path, wait_step_duration=None):
+        """
+        Start following an already planned path.
+        
+        Args:
+            path (list): List of vertex IDs starting at the current vertex;
+                repeated vertices are waits of one step each
+            wait_step_duration (float): Length of one reservation step in
+                seconds if the path was planned against reservations; waits
+                then take one step each and every lane takes the whole
+                steps reserved for it. None for an unplanned path
+        
+        Returns:
+            bool: True if the path was accepted, False otherwise
+        """
+        if self.state != self.IDLE and self.state != self.COMPLETED:
+            return False
+        if not path or path[0] != self.current_vertex:
             return False
         
+        if wait_step_duration is not None:
+            self.wait_step_duration = wait_step_duration
+        self.planned_step_duration = wait_step_duration
         self.path = path
         self.current_path_index = 0
-        self.target_vertex = destination_vertex
+        self.hold_time = 0.0
+        self.waiting_on = None
+        self.target_vertex = path[-1]
         self.state = self.IDLE  # Will start moving in the next update
+        self.fleet_state.active[self.slot] = True
         
         return True
     
+    def reroute(self, path):
+        """
+        Replace the path of a robot that is waiting to move.
+        
+        Args:
+            path (list): List of vertex IDs starting at the current vertex
+        
+        Returns:
+            bool: True if the path was accepted, False otherwise
+        """
+        if self.state != self.WAITING:
+            return False
+        if not path or path[0] != self.current_vertex:
+            return False
+        
+        self.planned_step_duration = None
+        self.path = path
+        self.current_path_index = 0
+        self.hold_time = 0.0
+        self.waiting_on = None
+        self.target_vertex = path[-1]
+        self.state = self.IDLE  # Will start moving in the next update
+        self.fleet_state.active[self.slot] = True
+        
+        return True
+    
+    def get_blocker(self):
+        """
+        Get what a waiting robot is waiting for.
+        
+        Returns:
+            tuple: (robot ID, resource) where resource is ('lane', lane ID) or
+                ('vertex', vertex ID) and robot ID is the robot holding it, or
+                None if no robot does (e.g. the lane is blocked); None if the
+                robot is not waiting
+        """
+        if self.state != self.WAITING:
+            return None
+        
+        next_vertex = self.path[self.current_path_index + 1]
+        lane_id = self.nav_graph.get_lane_id(self.current_vertex, next_vertex)
+        if lane_id is not None:
+            holder = int(self.nav_graph.lane_occupant[lane_id])
+            if holder != NO_ROBOT and holder != self.id:
+                return holder, ('lane', lane_id)
+        
+        holder = int(self.nav_graph.vertex_occupant[next_vertex])
+        if holder != NO_ROBOT and holder != self.id:
+            return holder, ('vertex', next_vertex)
+        return None, ('lane', lane_id)
+    
+    def _reserve_next(self, next_vertex):
+        """
+        Try to reserve the lane to the next vertex and the vertex itself.
+        
+        Args:
+            next_vertex (int): Next vertex ID on the path
+        
+        Returns:
+            bool: True if both were reserved, False otherwise
+        """
+        # Never drive towards a vertex another robot stands on or is heading to
+        occupant = self.nav_graph.vertex_occupant[next_vertex]
+        if occupant != NO_ROBOT and occupant != self.id:
+            self.nav_graph.reservation_failures += 1
+            return False
+        
+        if not self.nav_graph.reserve_lane(self.current_vertex, next_vertex, self.id):
+            return False
+        self.nav_graph.reserve_vertex(next_vertex, self.id)
+        return True
+    
+    def _start_moving(self, next_vertex):
+        """
+        Leave the current vertex and drive along the lane to the next one.
+        
+        The robot drives at the lane's speed limit, so the lane takes its
+        travel time to traverse, the same time the planners assume. On a
+        path planned against reservations it drives just slow enough to
+        take the whole steps reserved for the lane, so that it never
+        reaches the next vertex before its reservation there starts.
+        
+        Args:
+            next_vertex (int): Next vertex ID on the path, already reserved
+        """
+        # Release current vertex
+        self.nav_graph.release_vertex(self.current_vertex, self.id)
+        self.fleet_state.wake(('vertex', self.current_vertex))
+        
+        # Start moving, which ends any charging
+        lane_id = self.nav_graph.get_lane_id(self.current_vertex, next_vertex)
+        speed = float(self.nav_graph.lane_speed[lane_id])
+        travel_time = float(self.nav_graph.lane_travel_time[lane_id])
+        if self.planned_step_duration is not None and travel_time > 0:
+            steps = max(1, math.ceil(travel_time / self.planned_step_duration - 1e-9))
+            speed *= travel_time / (steps * self.planned_step_duration)
+        
+        self.state = self.MOVING
+        self.fleet_state.charging[self.slot] = False
+        self.move_speed = speed * self.nav_graph.scale_factor
+        self.fleet_state.drain_rate[self.slot] = (speed *
+                                                  self.fleet_state.battery_model.drain_per_unit)
+        self.target_position = self.nav_graph.get_scaled_position(next_vertex)
+        self.fleet_state.moving[self.slot] = True
+    
+    def _wait_for_release(self):
+        """Sleep until the robot blocking the way frees what we wait for."""
+        blocker = self.get_blocker()
+        if blocker is not None and blocker[0] is not None:
+            self.waiting_on = blocker[1]
+            self.fleet_state.add_waiter(self.waiting_on, self.slot)
+        else:
+            # Nobody to wake us up (e.g. a blocked lane), so keep polling
+            self.waiting_on = None
+    
     def update(self, delta_time):
         """
         Update the robot's state and position.
@@ -81,14 +298,13 @@ class Robot:
             'event': None
         }
         
-        # If robot is at a charger and idle, start charging
-        if self.state == self.IDLE:
-            current_vertex_data = self.nav_graph.vertices[self.current_vertex]
-            if current_vertex_data.get('is_charger', False):
-                self.state = self.CHARGING
-                status_update['state'] = self.state
-                status_update['event'] = 'started_charging'
-                return status_update
+        # If robot stopped at a charger and needs a top up, start charging
+        if self._can_charge():
+            self.state = self.CHARGING
+            self.fleet_state.charging[self.slot] = True
+            status_update['state'] = self.state
+            status_update['event'] = 'started_charging'
+            return status_update
         
         # If robot has a path to follow
         if self.path and self.current_path_index < len(self.path) - 1:
@@ -97,87 +313,149 @@ class Robot:
                 # Try to reserve the next vertex and lane
                 next_vertex = self.path[self.current_path_index + 1]
                 
-                can_reserve_lane = self.nav_graph.reserve_lane(
-                    self.current_vertex, next_vertex, self.id)
+                # A repeated vertex is a planned wait for one time step
+                if next_vertex == self.current_vertex:
+                    self.hold_time += delta_time
+                    if self.hold_time >= self.wait_step_duration:
+                        self.hold_time = 0.0
+                        self.current_path_index += 1
+                        if self.current_path_index == len(self.path) - 1:
+                            self.state = self.COMPLETED
+                            status_update['state'] = self.state
+                            status_update['event'] = 'reached_destination'
+                    return status_update
+                
+                can_reserve_lane = self._reserve_next(next_vertex)
                 
                 if can_reserve_lane:
-                    # Release current vertex
-                    self.nav_graph.release_vertex(self.current_vertex, self.id)
-                    
-                    # Start moving
-                    self.state = self.MOVING
-                    self.target_position = self.nav_graph.get_scaled_position(next_vertex)
-                    
+                    self._start_moving(next_vertex)
                     status_update['state'] = self.state
                     status_update['event'] = f'moving_to_{next_vertex}'
                 else:
                     # Wait for path to clear
                     self.state = self.WAITING
+                    self._wait_for_release()
                     status_update['state'] = self.state
                     status_update['event'] = f'waiting_for_lane_to_{next_vertex}'
             
             # If moving, update position
             elif self.state == self.MOVING:
-                current_pos = np.array(self.position)
-                target_pos = np.array(self.target_position)
-                direction = target_pos - current_pos
-                distance = np.linalg.norm(direction)
-                
-                # If reached target position
-                if distance < self.move_speed:
-                    self.position = self.target_position
-                    
-                    # Advance to next vertex in path
-                    self.current_path_index += 1
-                    next_vertex = self.path[self.current_path_index]
-                    
-                    # Release the lane we just traversed
-                    prev_vertex = self.path[self.current_path_index - 1]
-                    self.nav_graph.release_lane(prev_vertex, next_vertex, self.id)
-                    
-                    # Reserve the vertex we arrived at
-                    self.nav_graph.reserve_vertex(next_vertex, self.id)
-                    
-                    # Update current vertex
-                    self.current_vertex = next_vertex
-                    
-                    # Check if we've reached the final destination
-                    if self.current_path_index == len(self.path) - 1:
-                        self.state = self.COMPLETED
-                        status_update['state'] = self.state
-                        status_update['event'] = 'reached_destination'
-                    else:
-                        # Prepare for next movement
-                        self.state = self.IDLE
-                        status_update['state'] = self.state
-                        status_update['event'] = f'arrived_at_{next_vertex}'
-                else:
-                    # Move toward target
-                    normalized_dir = direction / distance
-                    movement = normalized_dir * self.move_speed
-                    self.position = tuple(current_pos + movement)
+                if self.fleet_state.step_one(self.slot, delta_time):
+                    self.arrive(status_update)
             
             # If waiting, check if path is clear now
             elif self.state == self.WAITING:
                 # Try again to reserve the next vertex and lane
                 next_vertex = self.path[self.current_path_index + 1]
+                self.waiting_on = None
                 
-                can_reserve_lane = self.nav_graph.reserve_lane(
-                    self.current_vertex, next_vertex, self.id)
+                can_reserve_lane = self._reserve_next(next_vertex)
                 
                 if can_reserve_lane:
-                    # Release current vertex
-                    self.nav_graph.release_vertex(self.current_vertex, self.id)
-                    
-                    # Start moving
-                    self.state = self.MOVING
-                    self.target_position = self.nav_graph.get_scaled_position(next_vertex)
-                    
+                    self._start_moving(next_vertex)
                     status_update['state'] = self.state
                     status_update['event'] = f'moving_to_{next_vertex}'
+                else:
+                    self._wait_for_release()
+        
+        return status_update
+    
+    def arrive(self, status_update=None):
+        """
+        Handle reaching the vertex at the end of the lane being driven.
+        
+        Called once the robot's position has reached its target, either by
+        update() or by the fleet-wide vectorized step.
+        
+        Args:
+            status_update (dict): Status update to fill in, or None for a new one
+        
+        Returns:
+            dict: Status update for logging
+        """
+        if status_update is None:
+            status_update = {
+                'robot_id': self.id,
+                'state': self.state,
+                'position': self.current_vertex,
+                'event': None
+            }
+        
+        self.position = self.target_position
+        self.fleet_state.moving[self.slot] = False
+        
+        # Advance to next vertex in path
+        self.current_path_index += 1
+        next_vertex = self.path[self.current_path_index]
+        
+        # Release the lane we just traversed
+        prev_vertex = self.path[self.current_path_index - 1]
+        self.nav_graph.release_lane(prev_vertex, next_vertex, self.id)
+        self.fleet_state.wake(('lane', self.nav_graph.get_lane_id(prev_vertex, next_vertex)))
+        
+        # Reserve the vertex we arrived at
+        self.nav_graph.reserve_vertex(next_vertex, self.id)
+        
+        # Update current vertex
+        self.current_vertex = next_vertex
+        
+        # Check if we've reached the final destination
+        if self.current_path_index == len(self.path) - 1:
+            self.state = self.COMPLETED
+            status_update['state'] = self.state
+            status_update['event'] = 'reached_destination'
+        else:
+            # Prepare for next movement
+            self.state = self.IDLE
+            status_update['state'] = self.state
+            status_update['event'] = f'arrived_at_{next_vertex}'
         
         return status_update
     
+    def _can_charge(self):
+        """Check whether the robot is free, stands idle on a charger and needs a top up."""
+        return (self.state in (self.IDLE, self.COMPLETED) and self.task_id is None and
+                (not self.path or self.current_path_index >= len(self.path) - 1) and
+                bool(self.nav_graph.vertex_is_charger[self.current_vertex]) and
+                self.battery < self.fleet_state.battery_model.top_up_level)
+    
+    def finish_charging(self):
+        """
+        Leave the charger state once the battery is full.
+        
+        Returns:
+            dict: Status update for logging
+        """
+        self.fleet_state.charging[self.slot] = False
+        self.state = self.IDLE
+        return {
+            'robot_id': self.id,
+            'state': self.state,
+            'position': self.current_vertex,
+            'event': 'finished_charging'
+        }
+    
+    def needs_update(self):
+        """
+        Check whether update() has any work to do for this robot.
+        
+        Moving robots are advanced by the fleet-wide step instead, robots
+        waiting for another robot to free a lane or vertex are woken up
+        when it does, and a robot without a path only needs an update to
+        start charging. Charging itself is done by the fleet-wide battery
+        update.
+        
+        Returns:
+            bool: True if the robot should be updated every step
+        """
+        if self.state == self.MOVING:
+            return False
+        if self.state == self.WAITING and self.waiting_on is not None:
+            return False
+        if self.path and self.current_path_index < len(self.path) - 1:
+            return True
+        return self._can_charge()
+    
     def get_status_display(self):
         """
         Get a text representation of the robot's state for display.
@@ -192,7 +470,7 @@ class Robot:
         elif self.state == self.WAITING:
             return f"Robot {self.id}: Waiting to move to vertex {self.path[self.current_path_index + 1]}"
         elif self.state == self.CHARGING:
-            return f"Robot {self.id}: Charging"
+            return f"Robot {self.id}: Charging ({self.battery:.0%})"
         elif self.state == self.COMPLETED:
             return f"Robot {self.id}: Task completed"
         
@@ -0,0 +1,60 @@
+import math
+
+class Task:
+    """
+    Transport job made of stops a robot drives to in order.
+    
+    A navigation task has a single stop, a pickup and dropoff job has two.
+    Higher priorities are dispatched first; among equal priorities the
+    earliest deadline goes first.
+    """
+    
+    # Define possible task states
+    PENDING = "pending"
+    ACTIVE = "active"
+    COMPLETED = "completed"
+    
+    def __init__(self, task_id, stops, priority=0, deadline=None, created_time=0.0):
+        """
+        Initialize a task.
+        
+        Args:
+            task_id (int): Unique task identifier
+            stops (list): Vertex IDs to visit in order
+            priority (int): Dispatch priority, higher goes first
+            deadline (float): Simulated time by which the task should be
+                completed, or None for no deadline
+            created_time (float): Simulated time the task was submitted
+        """
+        if not stops:
+            raise ValueError("A task needs at least one stop")
+        
+        self.id = task_id
+        self.stops = list(stops)
+        self.priority = priority
+        self.deadline = deadline
+        
+        self.state = self.PENDING
+        self.robot_id = None
+        self.next_stop = 0  # Index of the stop the robot is driving to
+        
+        # Simulated times of the task's life cycle
+        self.created_time = created_time
+        self.dispatched_time = None
+        self.completed_time = None
+    
+    def sort_key(self):
+        """Order of the task in the pending queue: priority, then deadline."""
+        return (-self.priority, math.inf if self.deadline is None else self.deadline)
+    
+    @property
+    def current_stop(self):
+        """Vertex ID of the stop the task is heading for, None when done."""
+        if self.next_stop < len(self.stops):
+            return self.stops[self.next_stop]
+        return None
+    
+    def is_late(self):
+        """True if the task was completed after its deadline."""
+        return (self.deadline is not None and self.completed_time is not None and
+                self.completed_time > self.deadline)
@@ -0,0 +1,145 @@
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_linear_sum_assignment
+except ImportError:
+    _scipy_linear_sum_assignment = None
+
+def linear_sum_assignment(cost, use_scipy=True):
+    """
+    Solve the rectangular linear sum assignment problem.
+    
+    Finds the matching of rows to columns with the lowest total cost, each
+    row and column used at most once and min(rows, columns) pairs matched.
+    Uses SciPy when it is installed, and otherwise a shortest augmenting
+    path (Jonker-Volgenant style) solver whose inner loops are vectorized
+    with NumPy.
+    
+    Args:
+        cost (np.ndarray): Cost matrix of shape (rows, columns), all finite
+        use_scipy (bool): Use SciPy's solver if it is available
+    
+    Returns:
+        tuple: (row indices, column indices) of the matched pairs, sorted
+            by row
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError(f"Cost matrix must be 2-D, got shape {cost.shape}")
+    if not np.isfinite(cost).all():
+        raise ValueError("Cost matrix must be finite")
+    if cost.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    if use_scipy and _scipy_linear_sum_assignment is not None:
+        rows, cols = _scipy_linear_sum_assignment(cost)
+        return rows.astype(np.int64), cols.astype(np.int64)
+    
+    # The solver matches every row, so give it the shorter side as rows
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = _solve_wide(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    return _solve_wide(cost)
+
+def match_finite(cost, use_scipy=True):
+    """
+    Match rows to columns along finite entries only.
+    
+    Infinite entries (e.g. unreachable robot and task pairs) are never
+    matched. Among the matchings with the most finite pairs, the one with
+    the lowest total cost is returned.
+    
+    Args:
+        cost (np.ndarray): Non-negative cost matrix of shape (rows,
+            columns), inf for pairs that must not be matched
+        use_scipy (bool): Use SciPy's solver if it is available
+    
+    Returns:
+        tuple: (row indices, column indices) of the matched pairs, sorted
+            by row
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    finite = np.isfinite(cost)
+    if not finite.any():
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    # Infinite pairs cost more than any full matching of finite ones
+    penalty = (cost[finite].max() + 1.0) * (min(cost.shape) + 1)
+    rows, cols = linear_sum_assignment(np.where(finite, cost, penalty), use_scipy=use_scipy)
+    keep = finite[rows, cols]
+    return rows[keep], cols[keep]
+
+def _solve_wide(cost):
+    """
+    Match every row of a cost matrix with at least as many columns as rows.
+    
+    Keeps dual prices u (rows) and v (columns) with cost - u - v >= 0 and
+    matches rows only along tight (zero reduced cost) entries. Rows are
+    first matched greedily to their cheapest column; each remaining row is
+    then added by a Dijkstra-like search for the cheapest augmenting path,
+    scanning one column per iteration with vectorized updates of all
+    column distances.
+    
+    Returns:
+        tuple: (row indices, column indices) of the matched pairs
+    """
+    num_rows, num_cols = cost.shape
+    u = cost.min(axis=1)
+    v = np.zeros(num_cols)
+    col4row = np.full(num_rows, -1, dtype=np.int64)
+    row4col = np.full(num_cols, -1, dtype=np.int64)
+    
+    # Greedy start: a row takes its cheapest column if that is still free
+    for row, col in enumerate(cost.argmin(axis=1).tolist()):
+        if row4col[col] == -1:
+            row4col[col] = row
+            col4row[row] = col
+    
+    for free_row in np.flatnonzero(col4row == -1).tolist():
+        shortest = np.full(num_cols, np.inf)  # Reduced path cost to every column
+        path = np.full(num_cols, -1, dtype=np.int64)  # Row preceding each column
+        unscanned = np.ones(num_cols, dtype=bool)
+        scanned_rows = [free_row]
+        scanned_cols = []
+        
+        row = free_row
+        min_value = 0.0
+        while True:
+            # Relax the columns through the row reached last
+            reduced = min_value + cost[row] - u[row] - v
+            better = unscanned & (reduced < shortest)
+            shortest[better] = reduced[better]
+            path[better] = row
+            
+            # Scan the closest unscanned column, preferring unmatched ones on ties
+            candidates = np.where(unscanned, shortest, np.inf)
+            min_value = candidates.min()
+            closest = np.flatnonzero(candidates == min_value)
+            unmatched = closest[row4col[closest] == -1]
+            col = int(unmatched[0]) if len(unmatched) else int(closest[0])
+            
+            unscanned[col] = False
+            scanned_cols.append(col)
+            if row4col[col] == -1:
+                break
+            row = int(row4col[col])
+            scanned_rows.append(row)
+        
+        # Update the dual prices so the augmenting path becomes tight
+        u[free_row] += min_value
+        if len(scanned_rows) > 1:
+            others = np.array(scanned_rows[1:], dtype=np.int64)
+            u[others] += min_value - shortest[col4row[others]]
+        scanned = np.array(scanned_cols, dtype=np.int64)
+        v[scanned] -= min_value - shortest[scanned]
+        
+        # Flip the matching along the augmenting path
+        while True:
+            row = int(path[col])
+            row4col[col] = row
+            col4row[row], col = col, col4row[row]
+            if row == free_row:
+                break
+    
+    return np.arange(num_rows, dtype=np.int64), col4row
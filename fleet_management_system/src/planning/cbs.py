@@ -0,0 +1,317 @@
+import heapq
+import itertools
+import time
+
+
+class ConflictTable:
+    """
+    Step-by-step occupancy of a batch of timed paths.
+    
+    Used both to find conflicts between the paths of a CBS node and to let
+    the low-level search prefer moves that conflict with fewer other paths.
+    """
+    
+    def __init__(self, nav_graph, paths=None):
+        """
+        Initialize the conflict table.
+        
+        Args:
+            nav_graph (NavGraph): Navigation graph the paths run on
+            paths (dict): Robot ID -> (timed_path, lane_ids) to add
+        """
+        self.nav_graph = nav_graph
+        self.vertex_users = {}  # (vertex ID, step) -> set of robot IDs
+        self.lane_users = {}    # (lane ID, step) -> set of robot IDs
+        self.parked = {}        # vertex ID -> list of (robot ID, first step)
+        
+        for robot_id, (timed_path, lane_ids) in (paths or {}).items():
+            self.add_path(robot_id, timed_path, lane_ids)
+    
+    def add_path(self, robot_id, timed_path, lane_ids):
+        """
+        Add a robot's timed path to the table.
+        
+        Args:
+            robot_id (int): Robot ID
+            timed_path (list): (vertex ID, step) waypoints
+            lane_ids (list): Lane driven between consecutive waypoints
+        """
+        for i, (vertex_id, step) in enumerate(timed_path):
+            self.vertex_users.setdefault((vertex_id, step), set()).add(robot_id)
+            if i + 1 < len(timed_path) and lane_ids[i] is not None:
+                for s in range(step, timed_path[i + 1][1]):
+                    self.lane_users.setdefault((lane_ids[i], s), set()).add(robot_id)
+        
+        final_vertex, final_step = timed_path[-1]
+        self.parked.setdefault(final_vertex, []).append((robot_id, final_step))
+    
+    def move_conflicts(self, robot_id, vertex, step, neighbor, arrival, lane_id):
+        """
+        Count the other robots a single move would conflict with.
+        
+        Args:
+            robot_id (int): Robot making the move
+            vertex (int): Vertex the move starts from
+            step (int): Step the move starts at
+            neighbor (int): Vertex the move ends at
+            arrival (int): Step the move ends at
+            lane_id (int): Lane driven, None for a wait
+        
+        Returns:
+            int: Number of conflicting robots
+        """
+        others = set(self.vertex_users.get((neighbor, arrival), ()))
+        for parked_robot, parked_step in self.parked.get(neighbor, ()):
+            if parked_step <= arrival:
+                others.add(parked_robot)
+        
+        if lane_id is not None:
+            reverse_id = self.nav_graph.get_lane_id(neighbor, vertex)
+            for s in range(step, arrival):
+                others.update(self.lane_users.get((lane_id, s), ()))
+                if reverse_id is not None:
+                    others.update(self.lane_users.get((reverse_id, s), ()))
+        
+        others.discard(robot_id)
+        return len(others)
+    
+    def find_conflicts(self):
+        """
+        List every conflict between the paths in the table.
+        
+        Returns:
+            list: (step, robot_a, constraint_a, robot_b, constraint_b) tuples
+                sorted by step, where each constraint would remove the
+                conflict from that robot's side
+        """
+        conflicts = []
+        
+        # Two robots on the same vertex at the same step
+        for (vertex_id, step), users in self.vertex_users.items():
+            users = sorted(users)
+            for a, b in zip(users, users[1:]):
+                constraint = ('vertex', vertex_id, step)
+                conflicts.append((step, a, constraint, b, constraint))
+            
+            # Driving through or parking on a vertex where another robot
+            # has parked earlier
+            for parked_robot, parked_step in self.parked.get(vertex_id, ()):
+                if parked_step < step:
+                    for robot_id in users:
+                        if robot_id != parked_robot:
+                            constraint = ('vertex', vertex_id, step)
+                            conflicts.append((step, robot_id, constraint, parked_robot, constraint))
+        
+        # Two robots on the same lane, or head-on on a lane and its reverse
+        for (lane_id, step), users in self.lane_users.items():
+            users = sorted(users)
+            for a, b in zip(users, users[1:]):
+                constraint = ('lane', lane_id, step)
+                conflicts.append((step, a, constraint, b, constraint))
+            
+            from_vertex = int(self.nav_graph.lane_from[lane_id])
+            to_vertex = int(self.nav_graph.lane_to[lane_id])
+            reverse_id = self.nav_graph.get_lane_id(to_vertex, from_vertex)
+            if reverse_id is not None and reverse_id > lane_id:
+                for a in users:
+                    for b in self.lane_users.get((reverse_id, step), ()):
+                        if a != b:
+                            conflicts.append((step, a, ('lane', lane_id, step),
+                                              b, ('lane', reverse_id, step)))
+        
+        conflicts.sort(key=lambda c: c[0])
+        return conflicts
+
+
+class _Node:
+    """Constraint tree node of the high-level CBS search."""
+    
+    __slots__ = ('constraints', 'paths', 'lower_bounds', 'cost', 'lower_bound', 'conflicts')
+    
+    def __init__(self, constraints, paths, lower_bounds, nav_graph, start_step):
+        self.constraints = constraints    # robot ID -> frozenset of constraints
+        self.paths = paths                # robot ID -> (timed_path, lane_ids)
+        self.lower_bounds = lower_bounds  # robot ID -> low-level cost bound
+        self.cost = sum(path[-1][1] - start_step for path, _ in paths.values())
+        self.lower_bound = sum(lower_bounds.values())
+        self.conflicts = ConflictTable(nav_graph, paths).find_conflicts()
+
+
+class CBSPlanner:
+    """
+    Conflict-Based Search planner for a batch of robots.
+    
+    The high level searches a tree of constraints, splitting on the earliest
+    conflict between two robots' paths; the low level is the cooperative
+    space-time A* with those constraints, so batch paths also respect
+    reservations made outside the batch. With suboptimality w > 1 the high
+    level expands, among the nodes whose cost is within w times the lowest
+    lower bound, the one with the fewest conflicts, and the low level runs a
+    focal search of its own (ECBS). This bounds the solution cost at w
+    times optimal while finding it much faster. When the time budget runs out the batch falls back to
+    prioritized planning.
+    """
+    
+    def __init__(self, cooperative_planner, max_steps=128):
+        """
+        Initialize the planner.
+        
+        Args:
+            cooperative_planner (CooperativePlanner): Low-level planner
+            max_steps (int): Longest plan, in steps, the low level considers
+        """
+        self.cooperative_planner = cooperative_planner
+        self.nav_graph = cooperative_planner.nav_graph
+        self.reservations = cooperative_planner.reservations
+        self.max_steps = max_steps
+        
+        # Statistics of the last solve, and the robots it left out because
+        # an earlier request of the batch claimed their goal
+        self.last_method = None
+        self.last_expansions = 0
+        self.last_cost = None
+        self.last_claimed = {}  # robot ID -> robot ID that claimed its goal
+    
+    def solve(self, requests, time_budget=1.0, suboptimality=1.0, start_step=None):
+        """
+        Plan conflict-free timed paths for a batch of robots.
+        
+        Args:
+            requests (list): (robot ID, start vertex ID, goal vertex ID) tuples
+            time_budget (float): Seconds allowed before falling back to
+                prioritized planning
+            suboptimality (float): 1.0 for optimal CBS, above 1.0 for the
+                bounded-suboptimal focal search
+            start_step (int): Step the robots start at, defaults to now
+        
+        Returns:
+            dict: Robot ID -> (timed_path, lane_ids); robots that could not be
+                planned, or whose goal an earlier request already has, are
+                left out; the latter are listed in last_claimed
+        """
+        if start_step is None:
+            start_step = self.reservations.current_step
+        deadline = time.perf_counter() + time_budget
+        
+        # Only one robot can park on a vertex, so of the robots sharing a
+        # goal only the first is planned; the others are left out and can
+        # be planned once the goal is free again
+        goal_robots = {}
+        unique_requests = []
+        self.last_claimed = {}
+        for request in requests:
+            robot_id, _, goal_vertex = request
+            if goal_vertex in goal_robots:
+                self.last_claimed[robot_id] = goal_robots[goal_vertex]
+            else:
+                goal_robots[goal_vertex] = robot_id
+                unique_requests.append(request)
+        requests = unique_requests
+        batch = [robot_id for robot_id, _, _ in requests]
+        self.last_expansions = 0
+        
+        # Root node: every robot on its own best path
+        root_paths = {}
+        root_bounds = {}
+        conflict_table = ConflictTable(self.nav_graph)
+        for robot_id, start_vertex, goal_vertex in requests:
+            result = self._plan_one(robot_id, start_vertex, goal_vertex, start_step,
+                                    frozenset(), conflict_table, batch, suboptimality)
+            if result is None:
+                return self._solve_prioritized(requests, start_step)
+            root_paths[robot_id] = result
+            root_bounds[robot_id] = self.cooperative_planner.last_lower_bound
+            conflict_table.add_path(robot_id, *result)
+        
+        goals = {robot_id: (start_vertex, goal_vertex)
+                 for robot_id, start_vertex, goal_vertex in requests}
+        counter = itertools.count()
+        root = _Node({robot_id: frozenset() for robot_id in batch},
+                     root_paths, root_bounds, self.nav_graph, start_step)
+        open_list = [(root.lower_bound, root.cost, len(root.conflicts), next(counter), root)]
+        
+        while open_list and time.perf_counter() < deadline:
+            node = self._pop_node(open_list, suboptimality)
+            self.last_expansions += 1
+            
+            if not node.conflicts:
+                self.last_method = 'cbs' if suboptimality <= 1.0 else 'ecbs'
+                self.last_cost = node.cost
+                return node.paths
+            
+            # Split on the earliest conflict, constraining one robot per child
+            _, robot_a, constraint_a, robot_b, constraint_b = node.conflicts[0]
+            for robot_id, constraint in ((robot_a, constraint_a), (robot_b, constraint_b)):
+                constraints = dict(node.constraints)
+                constraints[robot_id] = node.constraints[robot_id] | {constraint}
+                
+                others = {other: path for other, path in node.paths.items() if other != robot_id}
+                start_vertex, goal_vertex = goals[robot_id]
+                result = self._plan_one(robot_id, start_vertex, goal_vertex, start_step,
+                                        constraints[robot_id],
+                                        ConflictTable(self.nav_graph, others), batch,
+                                        suboptimality)
+                if result is None:
+                    continue
+                
+                paths = dict(node.paths)
+                paths[robot_id] = result
+                lower_bounds = dict(node.lower_bounds)
+                lower_bounds[robot_id] = self.cooperative_planner.last_lower_bound
+                child = _Node(constraints, paths, lower_bounds, self.nav_graph, start_step)
+                heapq.heappush(open_list, (child.lower_bound, child.cost, len(child.conflicts),
+                                           next(counter), child))
+        
+        return self._solve_prioritized(requests, start_step)
+    
+    @staticmethod
+    def _pop_node(open_list, suboptimality):
+        """Take the next node to expand from the open list."""
+        if suboptimality <= 1.0:
+            return heapq.heappop(open_list)[-1]
+        
+        # Focal search: fewest conflicts among nodes within the cost bound
+        bound = open_list[0][0] * suboptimality
+        best = min((entry for entry in open_list if entry[1] <= bound),
+                   key=lambda entry: (entry[2], entry[1], entry[3]),
+                   default=open_list[0])
+        open_list.remove(best)
+        heapq.heapify(open_list)
+        return best[-1]
+    
+    def _plan_one(self, robot_id, start_vertex, goal_vertex, start_step,
+                  constraints, conflict_table, batch, suboptimality):
+        """Run the low-level search for one robot of the batch."""
+        return self.cooperative_planner.plan(
+            robot_id, start_vertex, goal_vertex, start_step=start_step,
+            constraints=constraints, conflict_table=conflict_table,
+            window=self.max_steps, ignored_robots=batch, suboptimality=suboptimality,
+            extend_beyond_window=False)
+    
+    def _solve_prioritized(self, requests, start_step):
+        """
+        Plan the batch one robot at a time, longest trip first.
+        
+        Each path is reserved as soon as it is planned so that later robots
+        plan around it.
+        """
+        remaining = {}
+        for robot_id, start_vertex, goal_vertex in requests:
+            remaining[robot_id] = self.nav_graph.estimate_travel_time(start_vertex, goal_vertex)
+        ordered = sorted(requests, key=lambda request: -remaining[request[0]])
+        
+        batch = [robot_id for robot_id, _, _ in requests]
+        paths = {}
+        for robot_id, start_vertex, goal_vertex in ordered:
+            unplanned = [other for other in batch if other not in paths and other != robot_id]
+            result = self.cooperative_planner.plan(
+                robot_id, start_vertex, goal_vertex, start_step=start_step,
+                window=self.max_steps, ignored_robots=unplanned, extend_beyond_window=False)
+            if result is None:
+                continue
+            self.reservations.reserve_path(robot_id, *result)
+            paths[robot_id] = result
+        
+        self.last_method = 'prioritized'
+        self.last_cost = sum(path[-1][1] - start_step for path, _ in paths.values())
+        return paths
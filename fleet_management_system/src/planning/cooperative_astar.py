@@ -0,0 +1,347 @@
+import heapq
+import math
+
+from ..models.graph_storage import NO_ROBOT
+
+
+class CooperativePlanner:
+    """
+    Windowed cooperative A* (WHCA*) planner over a reservation table.
+    
+    Searches in space-time: a state is a vertex at a time step, and a robot
+    can either wait in place for one step or drive along a lane, which takes
+    as many steps as the lane's travel time needs. Within the first `window`
+    steps every move must be free of other robots' reservations, including
+    head-on swaps on the reverse lane. Beyond the window the rest of the
+    route is the plain fastest path, as in WHCA*. Robots standing on a
+    vertex without any reservations are treated as parked there.
+    """
+    
+    def __init__(self, nav_graph, reservations, window=32, max_expansions=20000):
+        """
+        Initialize the planner.
+        
+        Args:
+            nav_graph (NavGraph): Navigation graph to plan over
+            reservations (ReservationTable): Table of existing reservations
+            window (int): Number of steps planned against reservations
+            max_expansions (int): Search effort limit per plan; a plan
+                that runs out of it keeps the part found so far
+        """
+        self.nav_graph = nav_graph
+        self.reservations = reservations
+        self.window = window
+        self.max_expansions = max_expansions
+        
+        # Lower bound on the optimal cost, in steps, from the last search,
+        # and whether it ran out of effort and fell back to a partial plan
+        self.last_lower_bound = None
+        self.last_fallback = False
+    
+    def lane_steps(self, lane_id):
+        """
+        Get the number of time steps needed to drive along a lane.
+        
+        Args:
+            lane_id (int): Lane ID
+        
+        Returns:
+            int: Number of steps, at least one
+        """
+        travel_time = self.nav_graph.lane_travel_time[lane_id]
+        return max(1, math.ceil(travel_time / self.reservations.step_duration - 1e-9))
+    
+    def plan(self, robot_id, start_vertex, goal_vertex, start_step=None,
+             constraints=None, conflict_table=None, window=None, ignored_robots=(),
+             suboptimality=1.0, extend_beyond_window=True):
+        """
+        Plan a timed path that avoids existing reservations.
+        
+        Args:
+            robot_id (int): Robot the path is planned for
+            start_vertex (int): Starting vertex ID
+            goal_vertex (int): Destination vertex ID
+            start_step (int): Step the robot starts at, defaults to now
+            constraints (set): Extra forbidden ('vertex', vertex ID, step) and
+                ('lane', lane ID, step) entries for this robot
+            conflict_table (ConflictTable): Paths of other robots planned in
+                the same batch; among equally fast moves, the ones that
+                conflict with fewer of them are preferred
+            window (int): Overrides the planner's window for this plan
+            ignored_robots (iterable): Robots whose current position should
+                not be treated as an obstacle, e.g. the rest of a batch
+            suboptimality (float): Above 1.0, run a focal search that accepts
+                paths up to this factor longer than optimal when they
+                conflict with fewer robots in conflict_table
+            extend_beyond_window (bool): Finish with the plain fastest path
+                once the window or the search effort is used up; if False,
+                give up instead
+        
+        Returns:
+            tuple: (timed_path, lane_ids) where timed_path is a list of
+                (vertex ID, step) waypoints and lane_ids holds the lane driven
+                between consecutive waypoints (None for waits), or None if no
+                path was found
+        """
+        if start_step is None:
+            start_step = self.reservations.current_step
+        constraints = constraints or frozenset()
+        self.last_fallback = False
+        
+        nav_graph = self.nav_graph
+        reservations = self.reservations
+        step_duration = reservations.step_duration
+        offsets, targets, lane_ids, _ = nav_graph.get_search_adjacency()
+        blocked = nav_graph.blocked_lanes
+        
+        # Fastest remaining time is an admissible estimate of remaining
+        # steps; the cached field is read per vertex reached, never copied
+        field = nav_graph.get_distance_field(goal_vertex)
+        if math.isinf(field[start_vertex]):
+            return None
+        
+        def remaining(vertex):
+            return float(field[vertex]) / step_duration
+        
+        horizon = start_step + (self.window if window is None else window)
+        
+        # Robots without a plan stay where they are
+        occupants = nav_graph.vertex_occupant
+        planned_robots = reservations.robot_entries
+        ignored_robots = set(ignored_robots)
+        
+        def vertex_free(vertex, step):
+            occupant = int(occupants[vertex])
+            if (occupant != NO_ROBOT and occupant != robot_id and
+                    occupant not in planned_robots and occupant not in ignored_robots):
+                return False
+            if ('vertex', vertex, step) in constraints:
+                return False
+            return reservations.is_vertex_free(vertex, step, robot_id)
+        
+        # Never share a destination with a parked robot
+        parked = reservations.parked.get(goal_vertex)
+        if parked is not None and parked[0] != robot_id:
+            return None
+        occupant = int(occupants[goal_vertex])
+        if (occupant != NO_ROBOT and occupant != robot_id and
+                occupant not in planned_robots and occupant not in ignored_robots):
+            return None
+        
+        # The goal only counts once no constraint forbids staying there
+        last_goal_constraint = max((c[2] for c in constraints
+                                    if c[0] == 'vertex' and c[1] == goal_vertex), default=-1)
+        
+        def lane_free(lane_id, reverse_id, first_step, last_step):
+            for s in range(first_step, last_step):
+                if not reservations.is_lane_free(lane_id, s, robot_id):
+                    return False
+                if reverse_id is not None and not reservations.is_lane_free(reverse_id, s, robot_id):
+                    return False
+                if ('lane', lane_id, s) in constraints:
+                    return False
+            return True
+        
+        start = (start_vertex, start_step)
+        parent = {start: None}
+        parent_lane = {start: None}
+        conflicts = {start: 0}
+        closed = set()
+        if suboptimality > 1.0:
+            queue = _FocalQueue(suboptimality, closed)
+        else:
+            queue = _OpenQueue(closed)
+        queue.push(remaining(start_vertex), 0, 0, start)
+        expansions = 0
+        
+        # State closest to the goal so far, kept in case the effort runs out
+        best, best_remaining = start, remaining(start_vertex)
+        
+        while queue:
+            entry = queue.pop()
+            if entry is None:
+                break
+            state_conflicts, state = entry
+            if state_conflicts > conflicts[state]:
+                continue
+            vertex, step = state
+            closed.add(state)
+            
+            # Done once parked at the goal, or once past the planning window
+            if (vertex == goal_vertex and step > last_goal_constraint and
+                    reservations.can_park(vertex, step, robot_id)):
+                self.last_lower_bound = queue.lower_bound
+                return self._build_result(state, parent, parent_lane)
+            if step >= horizon:
+                if not extend_beyond_window:
+                    return None
+                self.last_lower_bound = queue.lower_bound
+                return self._finish_outside_window(state, parent, parent_lane, goal_vertex)
+            
+            state_remaining = remaining(vertex)
+            if state_remaining < best_remaining:
+                best, best_remaining = state, state_remaining
+            
+            expansions += 1
+            if expansions > self.max_expansions:
+                if not extend_beyond_window:
+                    return None
+                # Keep the reservation-free start of the route and finish it
+                # along the fastest path, as beyond the window
+                self.last_fallback = True
+                self.last_lower_bound = queue.lower_bound
+                return self._finish_outside_window(best, parent, parent_lane, goal_vertex)
+            
+            # Wait in place for one step
+            successors = []
+            if vertex_free(vertex, step + 1):
+                successors.append((vertex, step + 1, None))
+            
+            # Drive along each open lane
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                lane_id = lane_ids[k]
+                if lane_id in blocked:
+                    continue
+                neighbor = targets[k]
+                arrival = step + self.lane_steps(lane_id)
+                if math.isinf(field[neighbor]) or not vertex_free(neighbor, arrival):
+                    continue
+                reverse_id = nav_graph.get_lane_id(neighbor, vertex)
+                if not lane_free(lane_id, reverse_id, step, arrival):
+                    continue
+                successors.append((neighbor, arrival, lane_id))
+            
+            for neighbor, arrival, lane_id in successors:
+                next_state = (neighbor, arrival)
+                next_conflicts = state_conflicts
+                if conflict_table is not None:
+                    next_conflicts += conflict_table.move_conflicts(
+                        robot_id, vertex, step, neighbor, arrival, lane_id)
+                
+                # The arrival step fixes the cost, so only fewer conflicts
+                # can improve on a state that was already reached
+                if next_state in conflicts and conflicts[next_state] <= next_conflicts:
+                    continue
+                parent[next_state] = state
+                parent_lane[next_state] = lane_id
+                conflicts[next_state] = next_conflicts
+                elapsed = arrival - start_step
+                queue.push(elapsed + remaining(neighbor), next_conflicts, -elapsed, next_state)
+        
+        return None
+    
+    @staticmethod
+    def _build_result(state, parent, parent_lane):
+        """Walk the parent links back into waypoints and lanes."""
+        timed_path = []
+        lane_ids = []
+        while state is not None:
+            timed_path.append(state)
+            lane_ids.append(parent_lane[state])
+            state = parent[state]
+        timed_path.reverse()
+        lane_ids.reverse()
+        
+        # lane_ids[i] is the lane driven from waypoint i to waypoint i + 1
+        return timed_path, lane_ids[1:] + [None]
+    
+    def _finish_outside_window(self, state, parent, parent_lane, goal_vertex):
+        """Extend a windowed plan to the goal along the fastest path."""
+        timed_path, lane_ids = self._build_result(state, parent, parent_lane)
+        tail = self.nav_graph.find_path(state[0], goal_vertex)
+        if tail is None:
+            return None
+        
+        step = state[1]
+        for from_vertex, to_vertex in zip(tail, tail[1:]):
+            lane_id = self.nav_graph.get_lane_id(from_vertex, to_vertex)
+            step += self.lane_steps(lane_id)
+            lane_ids[-1] = lane_id
+            timed_path.append((to_vertex, step))
+            lane_ids.append(None)
+        return timed_path, lane_ids
+
+
+class _OpenQueue:
+    """A* open list: lowest estimate first, fewer conflicts on ties."""
+    
+    def __init__(self, closed):
+        self.closed = closed
+        self.heap = []
+        self.lower_bound = 0
+    
+    def __bool__(self):
+        return bool(self.heap)
+    
+    def push(self, estimate, conflicts, tie, state):
+        heapq.heappush(self.heap, (estimate, conflicts, tie, state))
+    
+    def pop(self):
+        while self.heap:
+            estimate, conflicts, _, state = heapq.heappop(self.heap)
+            if state not in self.closed:
+                self.lower_bound = estimate
+                return conflicts, state
+        return None
+
+
+class _FocalQueue:
+    """
+    Focal list for bounded-suboptimal search.
+    
+    Among the open states whose estimate is within `suboptimality` times the
+    lowest open estimate, the one with the fewest conflicts is expanded
+    first. The lowest open estimate stays a lower bound on the optimal cost.
+    """
+    
+    def __init__(self, suboptimality, closed):
+        self.suboptimality = suboptimality
+        self.closed = closed
+        self.open = []     # every open entry, lowest estimate first
+        self.outside = []  # entries not yet admitted to focal, lowest estimate first
+        self.focal = []    # admitted entries, fewest conflicts first
+        self.lower_bound = 0
+    
+    def __bool__(self):
+        return bool(self.open)
+    
+    def push(self, estimate, conflicts, tie, state):
+        heapq.heappush(self.open, (estimate, tie, state))
+        if self.open[0][0] * self.suboptimality >= estimate:
+            heapq.heappush(self.focal, (conflicts, estimate, tie, state))
+        else:
+            heapq.heappush(self.outside, (estimate, conflicts, tie, state))
+    
+    def pop(self):
+        # The bound can only grow, admitting more entries to focal
+        while self.open and self.open[0][2] in self.closed:
+            heapq.heappop(self.open)
+        if not self.open:
+            return None
+        self.lower_bound = self.open[0][0]
+        bound = self.lower_bound * self.suboptimality
+        while self.outside and self.outside[0][0] <= bound:
+            estimate, conflicts, tie, state = heapq.heappop(self.outside)
+            heapq.heappush(self.focal, (conflicts, estimate, tie, state))
+        
+        while self.focal:
+            conflicts, _, _, state = heapq.heappop(self.focal)
+            if state not in self.closed:
+                return conflicts, state
+        return None
+
+
+def timed_path_to_vertices(timed_path):
+    """
+    Flatten timed waypoints into the vertex list a Robot follows.
+    
+    A robot that waits in place for n steps shows up as n repeats of the
+    vertex, which Robot.update treats as a hold of one step each.
+    
+    Args:
+        timed_path (list): (vertex ID, step) waypoints
+    
+    Returns:
+        list: Vertex IDs
+    """
+    return [vertex for vertex, _ in timed_path]
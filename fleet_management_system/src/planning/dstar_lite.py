@@ -0,0 +1,190 @@
+import heapq
+import math
+
+
+class DStarLite:
+    """
+    Incremental fastest-path planner for one robot (D* Lite).
+    
+    Searches backwards from the goal and keeps, for every vertex it has
+    touched, its travel time to the goal (g) and a one-step lookahead of
+    that time (rhs). When lanes are blocked, unblocked or change speed,
+    only vertices whose travel time actually changes are searched again,
+    so repairing a path takes time in proportion to the change rather than
+    to the graph. The robot moving on is absorbed into a key offset (km)
+    instead of reordering the queue. Lanes are weighted by travel time and
+    the search is guided by the straight-line distance to the robot at the
+    fastest speed on the graph, as in NavGraph.find_path.
+    """
+    
+    def __init__(self, nav_graph, start_vertex, goal_vertex):
+        """
+        Initialize the planner.
+        
+        Args:
+            nav_graph (NavGraph): Navigation graph to plan over
+            start_vertex (int): Vertex the robot is at
+            goal_vertex (int): Destination vertex ID
+        """
+        self.nav_graph = nav_graph
+        self.start = start_vertex
+        self.goal = goal_vertex
+        
+        # Vertices expanded over the planner's lifetime, for profiling
+        self.expansions = 0
+        
+        self.reset()
+    
+    def reset(self):
+        """Forget all search state, so the next path is planned from scratch."""
+        self.g = {}
+        self.rhs = {self.goal: 0.0}
+        self.km = 0.0
+        self.queue = []   # heap of (key, vertex), may hold stale entries
+        self.queued = {}  # vertex -> its current key in the queue
+        
+        # The heuristic depends on the fastest speed, so a new fastest
+        # speed means starting over
+        self.max_speed = self.nav_graph.max_speed
+        self.nav_graph.get_search_adjacency()
+        self._push(self.goal)
+    
+    def _heuristic(self, vertex):
+        """Lower bound on the travel time between the robot and a vertex."""
+        xs, ys = self.nav_graph._search_coords
+        return math.hypot(xs[vertex] - xs[self.start], ys[vertex] - ys[self.start]) / self.max_speed
+    
+    def _key(self, vertex):
+        """Queue key of a vertex; smaller keys are expanded first."""
+        best = min(self.g.get(vertex, math.inf), self.rhs.get(vertex, math.inf))
+        return (best + self._heuristic(vertex) + self.km, best)
+    
+    def _push(self, vertex):
+        """Put a vertex into the queue, replacing any earlier entry."""
+        key = self._key(vertex)
+        self.queued[vertex] = key
+        heapq.heappush(self.queue, (key, vertex))
+    
+    def _update_vertex(self, vertex):
+        """Recompute a vertex's lookahead and queue it if it is inconsistent."""
+        if vertex != self.goal:
+            offsets, targets, lane_ids, weights = self.nav_graph.get_search_adjacency()
+            blocked = self.nav_graph.blocked_lanes
+            g = self.g
+            best = math.inf
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                if lane_ids[k] in blocked:
+                    continue
+                cost = weights[k] + g.get(targets[k], math.inf)
+                if cost < best:
+                    best = cost
+            self.rhs[vertex] = best
+        
+        if self.g.get(vertex, math.inf) != self.rhs.get(vertex, math.inf):
+            self._push(vertex)
+        else:
+            self.queued.pop(vertex, None)
+    
+    def compute_shortest_path(self):
+        """
+        Search until the robot's travel time to the goal is settled.
+        
+        Returns:
+            float: Travel time in seconds from the robot to the goal, inf if
+                the goal cannot be reached
+        """
+        offsets, sources, _, _ = self.nav_graph.get_reverse_search_adjacency()
+        queue = self.queue
+        queued = self.queued
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        
+        while queue:
+            key, vertex = queue[0]
+            if queued.get(vertex) != key:
+                heapq.heappop(queue)
+                continue
+            if (key >= self._key(start) and
+                    g.get(start, math.inf) == rhs.get(start, math.inf)):
+                break
+            heapq.heappop(queue)
+            
+            # Keys made before the robot moved may be too small
+            new_key = self._key(vertex)
+            if key < new_key:
+                queued[vertex] = new_key
+                heapq.heappush(queue, (new_key, vertex))
+                continue
+            
+            del queued[vertex]
+            self.expansions += 1
+            if g.get(vertex, math.inf) > rhs[vertex]:
+                # Travel time went down: settle it
+                g[vertex] = rhs[vertex]
+            else:
+                # Travel time went up: reopen the vertex
+                g[vertex] = math.inf
+                self._update_vertex(vertex)
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                self._update_vertex(sources[k])
+        
+        return g.get(start, math.inf)
+    
+    def move_to(self, vertex):
+        """
+        Move the robot's end of the search to a new vertex.
+        
+        Args:
+            vertex (int): Vertex the robot is at now
+        """
+        if vertex == self.start:
+            return
+        self.km += self._heuristic(vertex)
+        self.start = vertex
+    
+    def update_lanes(self, lane_ids):
+        """
+        Take changes to lanes into account.
+        
+        Args:
+            lane_ids (iterable): IDs of lanes that were blocked, unblocked or
+                changed speed
+        """
+        if self.nav_graph.max_speed != self.max_speed:
+            self.reset()
+            return
+        lane_from = self.nav_graph.lane_from
+        for vertex in {int(lane_from[lane_id]) for lane_id in lane_ids}:
+            self._update_vertex(vertex)
+    
+    def get_path(self):
+        """
+        Get the fastest path from the robot to the goal.
+        
+        Returns:
+            list: List of vertex IDs forming the path, or None if no path exists
+        """
+        if self.compute_shortest_path() == math.inf:
+            return None
+        
+        offsets, targets, lane_ids, weights = self.nav_graph.get_search_adjacency()
+        blocked = self.nav_graph.blocked_lanes
+        g = self.g
+        
+        # Follow the lanes that lead on to the goal fastest
+        path = [self.start]
+        vertex = self.start
+        while vertex != self.goal:
+            best, best_cost = None, math.inf
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                if lane_ids[k] in blocked:
+                    continue
+                cost = weights[k] + g.get(targets[k], math.inf)
+                if cost < best_cost:
+                    best, best_cost = targets[k], cost
+            if best is None or len(path) > self.nav_graph.num_vertices:
+                return None
+            path.append(best)
+            vertex = best
+        return path
@@ -0,0 +1,115 @@
+import time
+
+# Time scales stepped through by faster() and slower()
+TIME_SCALES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class SimulationClock:
+    """
+    Fixed-timestep clock driving the simulation from a real-time loop.
+    
+    Real time passed between frames, multiplied by the time scale, is
+    added to an accumulator that is spent in whole simulation steps of dt
+    seconds, so the simulation behaves the same whatever the frame rate.
+    With no time scale the clock is unthrottled and runs as many steps as
+    fit in the frame. Steps never take more than one frame of real time;
+    a backlog the CPU cannot keep up with is dropped, so the simulation
+    runs slower than asked instead of falling further and further behind.
+    """
+    
+    def __init__(self, dt=1.0 / 60.0, time_scale=1.0):
+        """
+        Initialize the clock.
+        
+        Args:
+            dt (float): Simulated seconds per step
+            time_scale (float): Simulated seconds per real second, or None
+                to run unthrottled
+        """
+        if dt <= 0:
+            raise ValueError(f"Time step must be positive, got {dt}")
+        self.dt = dt
+        self.time_scale = None
+        self.accumulator = 0.0
+        self.time = 0.0  # Simulated seconds so far
+        self.set_time_scale(time_scale)
+    
+    @property
+    def unthrottled(self):
+        """True if the clock runs as many steps as the CPU allows."""
+        return self.time_scale is None
+    
+    def set_time_scale(self, time_scale):
+        """
+        Change the simulation speed.
+        
+        Args:
+            time_scale (float): Simulated seconds per real second, or None
+                to run unthrottled
+        """
+        if time_scale is not None and time_scale <= 0:
+            raise ValueError(f"Time scale must be positive, got {time_scale}")
+        self.time_scale = time_scale
+        self.accumulator = 0.0
+    
+    def faster(self):
+        """Switch to the next larger time scale; the largest stays."""
+        if self.unthrottled:
+            return
+        for scale in TIME_SCALES:
+            if scale > self.time_scale:
+                self.set_time_scale(scale)
+                return
+    
+    def slower(self):
+        """Switch to the next smaller time scale; unthrottled drops to the largest."""
+        if self.unthrottled:
+            self.set_time_scale(TIME_SCALES[-1])
+            return
+        for scale in reversed(TIME_SCALES):
+            if scale < self.time_scale:
+                self.set_time_scale(scale)
+                return
+    
+    def get_time_scale_text(self):
+        """
+        Get the time scale for display.
+        
+        Returns:
+            str: e.g. "10x", or "max" when unthrottled
+        """
+        if self.unthrottled:
+            return "max"
+        return f"{self.time_scale:g}x"
+    
+    def advance(self, step, wall_delta, frame_budget):
+        """
+        Run the simulation steps due after some real time has passed.
+        
+        Args:
+            step (callable): Runs one simulation step of dt seconds
+            wall_delta (float): Real seconds since the last call
+            frame_budget (float): Most real seconds to spend stepping
+        
+        Returns:
+            int: Number of steps run
+        """
+        deadline = time.perf_counter() + frame_budget
+        steps = 0
+        
+        if self.unthrottled:
+            while time.perf_counter() < deadline:
+                step()
+                steps += 1
+        else:
+            self.accumulator += wall_delta * self.time_scale
+            while self.accumulator >= self.dt:
+                step()
+                steps += 1
+                self.accumulator -= self.dt
+                if time.perf_counter() >= deadline:
+                    # Too slow for this time scale: drop the backlog
+                    self.accumulator = 0.0
+                    break
+        
+        self.time += steps * self.dt
+        return steps
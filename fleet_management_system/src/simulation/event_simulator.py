@@ -0,0 +1,324 @@
+import heapq
+import itertools
+import math
+import time
+
+import numpy as np
+
+from ..models.robot import Robot
+from .simulator import Simulator
+
+class EventSimulator(Simulator):
+    """
+    Headless discrete-event simulation of the fleet.
+    
+    Instead of stepping every robot with a fixed time step, the clock jumps
+    from one timestamped event to the next: a robot starting along a lane
+    schedules its arrival once, a planned wait schedules its end, robots
+    waiting for a lane or vertex sleep until it is released (or unblocked),
+    and tasks, battery alerts and finished charges are events as well. Each
+    event only runs the robots it concerns, so the cost of a run grows with
+    the number of events rather than with robots times frames. Battery
+    levels are settled with a few array operations per event.
+    
+    Robot positions jump from vertex to vertex on arrival, so this
+    simulator is meant for headless runs, not for drawing.
+    """
+    
+    # Seconds before robots that could not be given a random task are retried
+    ASSIGN_RETRY_INTERVAL = 1.0
+    
+    # Kinds of events; events due at the same time are handled in the order scheduled
+    ARRIVE = 'arrive'
+    HOLD = 'hold'
+    TASK = 'task'
+    ASSIGN = 'assign'
+    BATTERY = 'battery'
+    RETRY = 'retry'
+    
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the simulator.
+        
+        Takes the same arguments as Simulator; dt is not used to step the
+        simulation here.
+        """
+        super().__init__(*args, **kwargs)
+        
+        self.events = []  # heap of (time, sequence, kind, data)
+        self._sequence = itertools.count()
+        self.events_processed = 0
+        
+        # Planned waits being timed: slot -> (path, path index) of the wait
+        self.holds = {}
+        
+        # Robots to give a random task, and whether a retry is scheduled
+        self.free_robots = None
+        self._assign_due = False
+        
+        # Scheduled task, battery and retry events, so they are never doubled
+        self.task_rate = None
+        self._task_event_due = False
+        self._battery_event = None
+        self._retry_event = None
+        
+        self.waiting_robot_time = 0.0
+        
+        self.fleet_manager.add_state_listener(self._on_state_event)
+        self.nav_graph.add_lane_listener(self._on_lanes_changed)
+    
+    def schedule(self, event_time, kind, data=None):
+        """
+        Add an event to the queue.
+        
+        Args:
+            event_time (float): Simulated time of the event
+            kind (str): Event kind, e.g. EventSimulator.ARRIVE
+            data: Event payload, e.g. the robot's slot
+        """
+        heapq.heappush(self.events, (event_time, next(self._sequence), kind, data))
+    
+    def _on_state_event(self, robot_id, old_state, new_state):
+        """Schedule arrivals of robots that started moving and collect free robots."""
+        robot = self.fleet_manager.robots[robot_id]
+        if new_state == Robot.MOVING:
+            fleet_state = robot.fleet_state
+            slot = robot.slot
+            distance = math.hypot(fleet_state.target_x[slot] - fleet_state.pos_x[slot],
+                                  fleet_state.target_y[slot] - fleet_state.pos_y[slot])
+            self.schedule(self.time + distance / fleet_state.speed[slot], self.ARRIVE, slot)
+        elif self.free_robots is not None and (new_state == Robot.COMPLETED or
+                                               old_state == Robot.CHARGING):
+            self.free_robots.add(robot_id)
+    
+    def _on_lanes_changed(self, lane_ids):
+        """Wake robots waiting for lanes that were unblocked."""
+        lane_blocked = self.nav_graph.lane_blocked
+        for lane_id in lane_ids:
+            if not lane_blocked[lane_id]:
+                self.fleet_manager.fleet_state.wake(('lane', lane_id))
+    
+    def run(self, duration, auto_assign=True, task_rate=None):
+        """
+        Run the simulation for a span of simulated time.
+        
+        Args:
+            duration (float): Simulated seconds to run for
+            auto_assign (bool): Keep every robot busy with random tasks
+            task_rate (float): Submit random pickup and dropoff tasks to the
+                task scheduler at this rate per simulated hour instead of
+                assigning random tasks directly; task arrivals are a
+                Poisson process
+        
+        Returns:
+            dict: Statistics of the whole simulation so far
+        """
+        end_time = self.time + duration
+        started = time.perf_counter()
+        
+        self.task_rate = task_rate
+        if task_rate is not None:
+            self.free_robots = None
+            if task_rate > 0 and not self._task_event_due:
+                self._schedule_task()
+        elif auto_assign and self.free_robots is None:
+            self.free_robots = set(self.fleet_manager.robots)
+        elif not auto_assign:
+            self.free_robots = None
+        
+        # Robots given something to do since the last run start right away
+        self._process_events(self.time)
+        while self.events and self.events[0][0] <= end_time:
+            self._process_events(self.events[0][0])
+        self._process_events(end_time)
+        
+        self.wall_time += time.perf_counter() - started
+        return self.get_stats()
+    
+    def _schedule_task(self):
+        """Schedule the next task arrival."""
+        self._task_event_due = True
+        self.schedule(self.time + self.random.expovariate(self.task_rate / 3600.0), self.TASK)
+    
+    def _process_events(self, event_time):
+        """Advance the clock to a time and handle every event due by then."""
+        fleet_manager = self.fleet_manager
+        fleet_state = fleet_manager.fleet_state
+        delta_time = event_time - self.time
+        self.time = event_time
+        self.steps += 1
+        
+        # Drain and charge batteries up to now; full robots leave their chargers
+        if delta_time > 0:
+            moving = fleet_state.moving[:fleet_state.size]
+            fleet_state.battery[:fleet_state.size][moving] -= (
+                fleet_state.drain_rate[:fleet_state.size][moving] * delta_time)
+            self.waiting_robot_time += len(self.traffic_manager.waiting_since) * delta_time
+        ran_low, charged, emptied = fleet_state.update_batteries(delta_time)
+        for robot in charged:
+            fleet_manager.apply_status(robot, robot.CHARGING, robot.finish_charging())
+        
+        events = self.events
+        while events and events[0][0] <= event_time:
+            _, _, kind, data = heapq.heappop(events)
+            self.events_processed += 1
+            self._handle_event(kind, data)
+        self._run_active_robots()
+        
+        # The schedulers and traffic manager only look at robots that changed
+        fleet_manager.charger_scheduler.update(delta_time, ran_low, emptied)
+        fleet_manager.task_scheduler.update(delta_time)
+        if self.free_robots:
+            self._assign_free_robots()
+        self._run_active_robots()
+        
+        traffic_status = self.traffic_manager.update(delta_time)
+        self.deadlocks_resolved += traffic_status['deadlocks_resolved']
+        self._run_active_robots()
+        
+        self._schedule_battery_event()
+        self._schedule_retry_event()
+    
+    def _handle_event(self, kind, data):
+        """Handle one event popped from the queue."""
+        fleet_manager = self.fleet_manager
+        if kind == self.ARRIVE:
+            robot = fleet_manager.fleet_state.robots[data]
+            if robot.state == Robot.MOVING:
+                fleet_manager.apply_status(robot, Robot.MOVING, robot.arrive())
+        elif kind == self.HOLD:
+            slot, hold = data
+            robot = fleet_manager.fleet_state.robots[slot]
+            if self.holds.get(slot) == hold and self._planned_wait(robot) == hold:
+                del self.holds[slot]
+                fleet_manager.apply_status(robot, robot.state,
+                                           robot.update(robot.wait_step_duration))
+        elif kind == self.TASK:
+            self._task_event_due = False
+            if self.task_rate is not None:
+                self.submit_random_task()
+                self._schedule_task()
+        elif kind == self.ASSIGN:
+            self._assign_due = False
+        elif kind == self.BATTERY:
+            # Alerts and finished charges were picked up when the clock moved
+            if self._battery_event == data:
+                self._battery_event = None
+        elif kind == self.RETRY:
+            # The schedulers retry whatever is due when the clock moved
+            if self._retry_event == data:
+                self._retry_event = None
+    
+    def _planned_wait(self, robot):
+        """Get (path, path index) of the planned wait a robot is at, or None."""
+        if robot.state not in (Robot.IDLE, Robot.CHARGING) or not robot.path:
+            return None
+        index = robot.current_path_index
+        if index < len(robot.path) - 1 and robot.path[index + 1] == robot.current_vertex:
+            return (id(robot.path), index)
+        return None
+    
+    def _run_active_robots(self):
+        """Update the robots flagged active until none is left."""
+        fleet_manager = self.fleet_manager
+        fleet_state = fleet_manager.fleet_state
+        active_robots = fleet_state.get_active_robots()
+        while active_robots:
+            for robot in active_robots:
+                if not fleet_state.active[robot.slot]:
+                    continue
+                
+                # A planned wait ends with an event instead of polling
+                hold = self._planned_wait(robot)
+                if hold is not None:
+                    fleet_state.active[robot.slot] = False
+                    if self.holds.get(robot.slot) != hold:
+                        self.holds[robot.slot] = hold
+                        self.schedule(self.time + robot.wait_step_duration, self.HOLD,
+                                      (robot.slot, hold))
+                    continue
+                
+                fleet_manager.apply_status(robot, robot.state, robot.update(0.0))
+                
+                # Nobody will free a blocked lane, so sleep until it is unblocked
+                if robot.state == Robot.WAITING and robot.waiting_on is None:
+                    robot.waiting_on = robot.get_blocker()[1]
+                    fleet_state.add_waiter(robot.waiting_on, robot.slot)
+            active_robots = fleet_state.get_active_robots()
+    
+    def _assign_free_robots(self):
+        """Give random tasks to free robots and retry the others later."""
+        free_robots, self.free_robots = self.free_robots, set()
+        self.assign_random_tasks(sorted(free_robots))
+        
+        # Robots still without a task, e.g. for lack of a free destination
+        for robot_id in free_robots:
+            robot = self.fleet_manager.robots[robot_id]
+            if (robot.state in (Robot.IDLE, Robot.COMPLETED) and
+                    (not robot.path or robot.current_path_index >= len(robot.path) - 1) and
+                    not self.fleet_manager.charger_scheduler.claim(robot_id)):
+                self.free_robots.add(robot_id)
+        if self.free_robots and not self._assign_due:
+            self._assign_due = True
+            self.schedule(self.time + self.ASSIGN_RETRY_INTERVAL, self.ASSIGN)
+    
+    def _schedule_battery_event(self):
+        """Schedule the next time a battery runs low, runs empty or is full."""
+        fleet_state = self.fleet_manager.fleet_state
+        n = fleet_state.size
+        if n == 0:
+            return
+        model = fleet_state.battery_model
+        battery = fleet_state.battery[:n]
+        charging = fleet_state.charging[:n]
+        alert = fleet_state.battery_alert[:n]
+        
+        # Net charge used per second by every robot
+        rate = np.where(fleet_state.moving[:n], fleet_state.drain_rate[:n], model.idle_drain)
+        rate = np.where(charging, -model.charge_rate, rate)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            times = np.concatenate((
+                np.where((alert == 0) & (rate > 0), (battery - model.low_level) / rate, math.inf),
+                np.where((alert < 2) & (rate > 0), battery / rate, math.inf),
+                np.where(charging & (rate < 0), (battery - model.full_level) / rate, math.inf),
+            ))
+        next_time = float(times.min())
+        if not math.isfinite(next_time):
+            return
+        
+        # Land just past the threshold so that the alert is raised
+        event_time = self.time + max(next_time, 0.0) + 1e-6
+        if self._battery_event is not None and self._battery_event <= event_time:
+            return
+        self._battery_event = event_time
+        self.schedule(event_time, self.BATTERY, event_time)
+    
+    def _schedule_retry_event(self):
+        """Schedule the next time a scheduler retries planning a robot."""
+        retry_times = [backoff.next_retry_time() for backoff in
+                       (self.fleet_manager.task_scheduler.stalled,
+                        self.fleet_manager.charger_scheduler.unsent)]
+        retry_times = [retry_time for retry_time in retry_times if retry_time is not None]
+        if not retry_times:
+            return
+        next_time = min(retry_times)
+        # Land just past the retry time so that the retry is due
+        event_time = max(next_time, self.time) + 1e-6
+        if self._retry_event is not None and self._retry_event <= event_time:
+            return
+        self._retry_event = event_time
+        self.schedule(event_time, self.RETRY, event_time)
+    
+    def get_stats(self):
+        """
+        Get throughput statistics of the simulation.
+        
+        Returns:
+            dict: As Simulator.get_stats(), where steps are the times the
+                clock stopped at, plus the number of events handled
+        """
+        stats = super().get_stats()
+        stats['events'] = self.events_processed
+        stats['mean_waiting_robots'] = self.waiting_robot_time / self.time if self.time > 0 else 0.0
+        return stats
@@ -0,0 +1,293 @@
+import random
+import time
+
+from ..models.nav_graph import NavGraph
+from ..models.robot import Robot
+from ..controllers.fleet_manager import FleetManager
+from ..controllers.traffic_manager import TrafficManager
+
+class Simulator:
+    """
+    Headless simulation of the fleet.
+    
+    Owns the navigation graph, fleet manager and traffic manager and steps
+    them with a fixed time step as fast as the CPU allows, without a window
+    or frame rate cap. Used for scripted scenarios and capacity studies.
+    """
+    
+    def __init__(self, nav_graph_path, log_file_path=None, dt=1.0 / 60.0,
+                 cooperative=False, deadlock_policy='wait_time', seed=None,
+                 log_format='text', log_level='DEBUG', battery_model=None):
+        """
+        Initialize the simulator.
+        
+        Args:
+            nav_graph_path (str or NavGraph): Path to navigation graph JSON
+                file, or a loaded graph the simulator takes over
+            log_file_path (str): Path to the log file, or None to disable logging
+            dt (float): Simulated seconds per step
+            cooperative (bool): Plan robot paths against the reservation table
+            deadlock_policy (str): Deadlock policy of the traffic manager
+            seed (int): Seed of the random scenario, for repeatable runs
+            log_format (str): 'text' or 'json' log lines
+            log_level (str): Lowest level logged
+            battery_model (BatteryModel): Battery parameters of the robots,
+                by default BatteryModel()
+        """
+        if isinstance(nav_graph_path, NavGraph):
+            self.nav_graph = nav_graph_path
+        else:
+            self.nav_graph = NavGraph(nav_graph_path)
+        self.fleet_manager = FleetManager(self.nav_graph, log_file_path,
+                                          log_format=log_format, log_level=log_level,
+                                          battery_model=battery_model)
+        self.traffic_manager = TrafficManager(self.nav_graph, self.fleet_manager,
+                                              deadlock_policy=deadlock_policy)
+        if cooperative:
+            self.fleet_manager.path_planner = self.traffic_manager
+        
+        self.dt = dt
+        self.random = random.Random(seed)
+        
+        # Simulation clock and statistics
+        self.time = 0.0
+        self.steps = 0
+        self.wall_time = 0.0
+        self.tasks_assigned = 0
+        self.tasks_failed = 0
+        self.random_tasks_completed = 0
+        self.deadlocks_resolved = 0
+        self.waiting_robot_steps = 0
+        self.task_backlog = 0.0  # Fraction of a generated task carried over
+        
+        # Destinations of the random tasks robots are driving to
+        self.random_tasks = {}  # robot ID -> destination vertex ID
+        
+        self.fleet_manager.add_state_listener(self._on_robot_state_change)
+    
+    @property
+    def tasks_completed(self):
+        """
+        Number of tasks completed so far.
+        
+        Random tasks count once the robot reaches their destination and
+        scheduled tasks once the robot reaches their last stop, so pickup
+        stops and trips to chargers are never counted.
+        """
+        return self.random_tasks_completed + self.fleet_manager.task_scheduler.completed
+    
+    def _on_robot_state_change(self, robot_id, old_state, new_state):
+        """Count random tasks whose robot reached the destination."""
+        if new_state == Robot.COMPLETED:
+            # A robot sent elsewhere, e.g. to a charger, dropped its task
+            destination = self.random_tasks.pop(robot_id, None)
+            if destination == self.fleet_manager.robots[robot_id].current_vertex:
+                self.random_tasks_completed += 1
+    
+    def spawn_robots(self, count):
+        """
+        Spawn robots on randomly chosen free vertices that are not chargers.
+        
+        Args:
+            count (int): Number of robots to spawn
+        
+        Returns:
+            list: IDs of the spawned robots
+        """
+        nav_graph = self.nav_graph
+        free = [v for v in range(nav_graph.num_vertices)
+                if nav_graph.vertices[v]['occupying_robot'] is None and
+                not nav_graph.vertices[v]['is_charger']]
+        
+        robot_ids = []
+        for vertex_id in self.random.sample(free, min(count, len(free))):
+            robot_id = self.fleet_manager.spawn_robot(vertex_id)
+            if robot_id is not None:
+                robot_ids.append(robot_id)
+        return robot_ids
+    
+    def assign_random_tasks(self, robot_ids=None):
+        """
+        Send every idle or finished robot to a random destination.
+        
+        Destinations are never occupied and never another robot's target.
+        Robots that need to charge are left to the charger scheduler.
+        
+        Args:
+            robot_ids (iterable): Only consider these robots, by default all
+        
+        Returns:
+            int: Number of tasks assigned
+        """
+        robots = self.fleet_manager.robots
+        taken = {robot.target_vertex for robot in robots.values()
+                 if robot.state not in (Robot.IDLE, Robot.COMPLETED)}
+        candidates = robots.items() if robot_ids is None else (
+            (robot_id, robots[robot_id]) for robot_id in robot_ids)
+        
+        assigned = 0
+        for robot_id, robot in candidates:
+            if robot.state not in (Robot.IDLE, Robot.COMPLETED):
+                continue
+            if robot.path and robot.current_path_index < len(robot.path) - 1:
+                continue
+            if self.fleet_manager.charger_scheduler.claim(robot_id):
+                continue
+            
+            destination = self._pick_destination(robot.current_vertex, taken)
+            if destination is None:
+                continue
+            
+            self.fleet_manager.selected_robot = robot_id
+            if self.fleet_manager.assign_navigation_task(destination):
+                self.random_tasks[robot_id] = destination
+                taken.add(destination)
+                assigned += 1
+            else:
+                self.tasks_failed += 1
+        
+        self.tasks_assigned += assigned
+        return assigned
+    
+    def generate_tasks(self, task_rate):
+        """
+        Submit random pickup and dropoff tasks to the task scheduler.
+        
+        Called once per step, this submits tasks at a steady rate.
+        
+        Args:
+            task_rate (float): Tasks submitted per simulated hour
+        
+        Returns:
+            int: Number of tasks submitted
+        """
+        self.task_backlog += task_rate * self.dt / 3600.0
+        submitted = 0
+        while self.task_backlog >= 1.0:
+            self.task_backlog -= 1.0
+            submitted += self.submit_random_task()
+        return submitted
+    
+    def submit_random_task(self):
+        """
+        Submit one pickup and dropoff task between random free vertices.
+        
+        Returns:
+            bool: True if a task was submitted
+        """
+        pickup = self._pick_destination(None, ())
+        dropoff = self._pick_destination(pickup, ())
+        if pickup is None or dropoff is None:
+            return False
+        self.fleet_manager.add_task(dropoff, pickup_vertex=pickup)
+        return True
+    
+    def _pick_destination(self, current_vertex, taken, attempts=10):
+        """Pick a random free vertex other than the current one."""
+        nav_graph = self.nav_graph
+        for _ in range(attempts):
+            vertex_id = self.random.randrange(nav_graph.num_vertices)
+            if (vertex_id != current_vertex and vertex_id not in taken and
+                    nav_graph.vertices[vertex_id]['occupying_robot'] is None):
+                return vertex_id
+        return None
+    
+    def step(self):
+        """
+        Advance the simulation by one time step.
+        
+        Returns:
+            dict: Status information from the traffic manager
+        """
+        self.fleet_manager.update(self.dt)
+        traffic_status = self.traffic_manager.update(self.dt)
+        
+        self.deadlocks_resolved += traffic_status['deadlocks_resolved']
+        self.waiting_robot_steps += len(self.traffic_manager.waiting_since)
+        self.time += self.dt
+        self.steps += 1
+        return traffic_status
+    
+    def run(self, duration, auto_assign=True, task_rate=None):
+        """
+        Run the simulation for a span of simulated time.
+        
+        Args:
+            duration (float): Simulated seconds to run for
+            auto_assign (bool): Keep every robot busy with random tasks
+            task_rate (float): Submit random pickup and dropoff tasks to the
+                task scheduler at this rate per simulated hour instead of
+                assigning random tasks directly
+        
+        Returns:
+            dict: Statistics of the whole simulation so far
+        """
+        num_steps = int(round(duration / self.dt))
+        started = time.perf_counter()
+        
+        for _ in range(num_steps):
+            if task_rate is not None:
+                self.generate_tasks(task_rate)
+            elif auto_assign:
+                self.assign_random_tasks()
+            self.step()
+        
+        self.wall_time += time.perf_counter() - started
+        return self.get_stats()
+    
+    def add_profiler_counters(self, profiler):
+        """
+        Track the running totals of the simulation in a profiler.
+        
+        Args:
+            profiler (Profiler): Profiler to add the counters to
+        """
+        nav_graph = self.nav_graph
+        profiler.add_counter('path queries',
+                             lambda: nav_graph.path_cache.hits + nav_graph.path_cache.misses)
+        profiler.add_counter('path cache hits', lambda: nav_graph.path_cache.hits)
+        profiler.add_counter('distance field misses', lambda: nav_graph.distance_fields.misses)
+        profiler.add_counter('reservation failures', lambda: nav_graph.reservation_failures)
+        profiler.add_counter('deadlocks resolved', lambda: self.deadlocks_resolved)
+        profiler.add_counter('routes repaired', lambda: self.traffic_manager.routes_repaired)
+        profiler.add_counter('tasks completed', lambda: self.tasks_completed)
+        profiler.add_counter('scheduled tasks completed',
+                             lambda: self.fleet_manager.task_scheduler.completed)
+        profiler.add_counter('charging sessions',
+                             lambda: self.fleet_manager.charger_scheduler.sessions)
+        
+        logger = self.fleet_manager.logger
+        if logger is not None:
+            profiler.add_counter('log events dropped', lambda: logger.dropped)
+    
+    def close(self):
+        """Flush the event log and close it."""
+        self.fleet_manager.shutdown()
+    
+    def get_stats(self):
+        """
+        Get throughput statistics of the simulation.
+        
+        Returns:
+            dict: Simulated and wall-clock time, step rate, task counts,
+                tasks completed per simulated minute, resolved deadlocks,
+                the average number of waiting robots, and the task and
+                charger schedulers' metrics
+        """
+        return {
+            'robots': len(self.fleet_manager.robots),
+            'sim_time': self.time,
+            'steps': self.steps,
+            'wall_time': self.wall_time,
+            'steps_per_second': self.steps / self.wall_time if self.wall_time > 0 else 0.0,
+            'tasks_assigned': self.tasks_assigned,
+            'tasks_failed': self.tasks_failed,
+            'tasks_completed': self.tasks_completed,
+            'throughput_per_minute': (60.0 * self.tasks_completed / self.time
+                                      if self.time > 0 else 0.0),
+            'deadlocks_resolved': self.deadlocks_resolved,
+            'mean_waiting_robots': (self.waiting_robot_steps / self.steps
+                                    if self.steps > 0 else 0.0),
+            'scheduler': self.fleet_manager.task_scheduler.get_metrics(),
+            'chargers': self.fleet_manager.charger_scheduler.get_metrics(),
+        }
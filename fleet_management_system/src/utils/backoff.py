@@ -0,0 +1,106 @@
+import heapq
+
+class RetryBackoff:
+    """
+    Exponential backoff of retries, kept per key.
+    
+    A key that failed is retried after initial_delay seconds, and every
+    further failure doubles its delay up to max_delay. Retry times live in
+    a heap, so finding the keys that are due costs nothing while none are.
+    """
+    
+    def __init__(self, initial_delay=1.0, max_delay=30.0):
+        """
+        Initialize an empty backoff.
+        
+        Args:
+            initial_delay (float): Seconds before the first retry
+            max_delay (float): Longest delay between two retries in seconds
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.delays = {}    # key -> delay before its next retry
+        self.retry_at = {}  # key -> time of its next retry
+        self.heap = []      # (retry time, sequence, key), stale entries included
+        self._sequence = 0
+    
+    def __contains__(self, key):
+        return key in self.retry_at
+    
+    def __len__(self):
+        return len(self.retry_at)
+    
+    def __iter__(self):
+        return iter(list(self.retry_at))
+    
+    def failed(self, key, now):
+        """
+        Record a failed attempt and schedule the next retry.
+        
+        Args:
+            key: What failed, e.g. a robot ID
+            now (float): Time of the attempt in seconds
+        """
+        delay = self.delays.get(key)
+        delay = self.initial_delay if delay is None else min(2 * delay, self.max_delay)
+        self.delays[key] = delay
+        self.retry_at[key] = now + delay
+        self._sequence += 1
+        heapq.heappush(self.heap, (now + delay, self._sequence, key))
+    
+    def requeue(self, key, now):
+        """
+        Schedule a retry after the initial delay, forgetting earlier failures.
+        
+        For attempts that did not fail on their own, e.g. a robot whose
+        destination another robot of the same batch claimed.
+        
+        Args:
+            key: Key to retry
+            now (float): Time of the attempt in seconds
+        """
+        self.delays.pop(key, None)
+        self.failed(key, now)
+    
+    def discard(self, key):
+        """
+        Forget a key, e.g. after it succeeded or no longer needs retrying.
+        
+        Args:
+            key: Key to forget
+        """
+        self.delays.pop(key, None)
+        self.retry_at.pop(key, None)
+    
+    def pop_due(self, now):
+        """
+        Take the keys whose retry is due.
+        
+        A key taken stays known, so failing it again backs off further.
+        
+        Args:
+            now (float): Current time in seconds
+        
+        Returns:
+            list: Keys due for a retry, earliest first
+        """
+        due = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            retry_at, _, key = heapq.heappop(heap)
+            if self.retry_at.get(key) == retry_at:
+                del self.retry_at[key]
+                due.append(key)
+        return due
+    
+    def next_retry_time(self):
+        """
+        Get the time of the earliest scheduled retry.
+        
+        Returns:
+            float or None: Time in seconds, None if no retry is scheduled
+        """
+        heap = self.heap
+        while heap and self.retry_at.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
@@ -0,0 +1,144 @@
+import atexit
+import json
+import queue
+import threading
+import time
+
+# Log levels, lowest first
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+# Queued in place of an event to stop the writer thread
+_STOP = object()
+
+class EventLogger:
+    """
+    Buffered event log written by a background thread.
+    
+    Events are put on a bounded queue and the writer thread appends them to
+    the log file in batches, so logging never touches the file on the
+    caller's thread. When the queue is full new events are dropped and
+    counted instead of growing memory without bound. Events are written as
+    text lines, "[time] [source] message", or as JSON lines with any extra
+    fields attached to the event.
+    """
+    
+    def __init__(self, log_file_path, log_format='text', level='DEBUG', max_queue=10000,
+                 batch_size=512, flush_interval=0.5):
+        """
+        Initialize the logger and start its writer thread.
+        
+        Args:
+            log_file_path (str): Path to the log file, truncated on start
+            log_format (str): 'text' or 'json' (one JSON object per line)
+            level (str): Lowest level written: 'DEBUG', 'INFO', 'WARNING'
+                or 'ERROR'
+            max_queue (int): Maximum number of events waiting to be written
+            batch_size (int): Maximum number of events written at once
+            flush_interval (float): Longest time in seconds an event waits
+                before the file is flushed
+        """
+        if log_format not in ('text', 'json'):
+            raise ValueError(f"Unknown log format '{log_format}'")
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}'")
+        
+        self.log_file_path = log_file_path
+        self.log_format = log_format
+        self.level = LEVELS[level]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.closed = False
+        
+        self._file = open(log_file_path, 'w')
+        if log_format == 'text':
+            self._file.write(f"=== Fleet Management System Log - "
+                             f"{time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+        
+        self._thread = threading.Thread(target=self._run, name='event-logger', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def is_enabled(self, level):
+        """
+        Check whether events of a level are written.
+        
+        Lets callers skip formatting messages that would be filtered out.
+        
+        Args:
+            level (str): Log level
+        
+        Returns:
+            bool: True if the level passes the filter
+        """
+        return not self.closed and LEVELS[level] >= self.level
+    
+    def log(self, source, message, level='INFO', **fields):
+        """
+        Queue an event for writing.
+        
+        Args:
+            source (str): Source of the event (e.g., robot ID, system)
+            message (str): Event message
+            level (str): Log level of the event
+            **fields: Extra values stored with the event in JSON format
+        """
+        if not self.is_enabled(level):
+            return
+        try:
+            self.queue.put_nowait((time.time(), level, source, message, fields))
+        except queue.Full:
+            self.dropped += 1
+    
+    def close(self):
+        """Write every queued event, then stop the writer and close the file."""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.queue.put(_STOP)
+        self._thread.join()
+        
+        if self.dropped:
+            self._file.write(self._format((time.time(), 'WARNING', 'logger',
+                                           f"Dropped {self.dropped} events on a full queue",
+                                           {})))
+        self._file.close()
+    
+    def _run(self):
+        """Writer thread: write queued events in batches until stopped."""
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if batch[-1] is _STOP:
+                batch.pop()
+                running = False
+            
+            try:
+                self._file.write(''.join(self._format(event) for event in batch))
+                self._file.flush()
+            except Exception as e:
+                print(f"Error writing to log file: {e}")
+    
+    def _format(self, event):
+        """Format one event as a line of the log file."""
+        timestamp, level, source, message, fields = event
+        time_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        if self.log_format == 'text':
+            return f"[{time_text}] [{source}] {message}\n"
+        
+        record = {'time': time_text, 'level': level, 'source': source, 'message': message}
+        record.update(fields)
+        return json.dumps(record) + "\n"
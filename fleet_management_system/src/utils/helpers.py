@@ -1,6 +1,5 @@
 import math
 import random
-import networkx as nx
 import time
 
 def distance(pos1, pos2):
@@ -46,23 +45,47 @@ def lerp_pos(pos1, pos2, t):
 
 def find_path_astar(graph, start, end):
     """
-    Find a path using A* algorithm.
+    Find the fastest path using A* algorithm.
     
     Args:
-        graph (nx.DiGraph): NetworkX graph
+        graph (NavGraph or nx.DiGraph): Navigation graph, or a NetworkX graph
+            with 'x'/'y' node attributes and 'travel_time' edge attributes
         start (int): Starting vertex ID
         end (int): Destination vertex ID
     
     Returns:
         list: List of vertex IDs forming the path, or None if no path exists
     """
+    # Use the NavGraph's native A* when we have one
+    if hasattr(graph, 'find_path'):
+        return graph.find_path(start, end)
+    
+    # NetworkX is slow to import, so only pay for it when it is used
+    import networkx as nx
+    
+    # Straight-line distance at the fastest lane speed never overestimates
+    max_speed = 0.0
+    for u, v, data in graph.edges(data=True):
+        if data['travel_time'] > 0:
+            lane_speed = distance(_node_pos(graph, u), _node_pos(graph, v)) / data['travel_time']
+            max_speed = max(max_speed, lane_speed)
+    max_speed = max_speed or 1.0
+    
+    def heuristic(u, v):
+        return distance(_node_pos(graph, u), _node_pos(graph, v)) / max_speed
+    
     try:
         # Use NetworkX's A* implementation
-        path = nx.astar_path(graph, start, end)
+        path = nx.astar_path(graph, start, end, heuristic=heuristic, weight='travel_time')
         return path
     except nx.NetworkXNoPath:
         return None
 
+def _node_pos(graph, node):
+    """Get the (x, y) coordinates stored on a NetworkX node."""
+    data = graph.nodes[node]
+    return (data['x'], data['y'])
+
 def find_path_avoiding_obstacles(graph, start, end, obstacles):
     """
     Find a path avoiding specified obstacles.
@@ -76,6 +99,8 @@ def find_path_avoiding_obstacles(graph, start, end, obstacles):
     Returns:
         list: List of vertex IDs forming the path, or None if no path exists
     """
+    import networkx as nx
+    
     # Create a copy of the graph
     temp_graph = graph.copy()
     
@@ -0,0 +1,191 @@
+import cProfile
+import time
+from collections import deque
+
+class Profiler:
+    """
+    Per-phase frame timers, subsystem counters and cProfile captures.
+    
+    Phases are methods of the subsystems (e.g. FleetManager.update). While
+    the profiler is enabled each one is shadowed by a timing wrapper on its
+    instance; disabling removes the wrappers again, so a disabled profiler
+    adds no work at all to the instrumented calls. Counters are read from
+    totals the subsystems keep anyway (path cache hits, resolved
+    deadlocks, ...) once per frame, and only while enabled.
+    """
+    
+    def __init__(self, history=120):
+        """
+        Initialize a disabled profiler.
+        
+        Args:
+            history (int): Number of frames averaged over
+        """
+        self.enabled = False
+        self.history = history
+        
+        # (object, method name, phase name) of every instrumented method
+        self.phases = []
+        self.phase_times = {}  # phase -> deque of per-frame seconds
+        self.frame_phase_times = {}  # phase -> seconds spent in the current frame
+        self.frame_times = deque(maxlen=history)
+        self.last_frame = None
+        
+        # Counter name -> function returning the counter's running total
+        self.counters = {}
+        self.counter_samples = {}  # counter name -> deque of (time, total)
+        
+        # cProfile capture running for a number of frames
+        self.capture = None
+        self.capture_path = None
+        self.capture_frames = 0
+    
+    def add_phase(self, obj, method_name, phase=None):
+        """
+        Time calls of an object's method as a phase of the frame.
+        
+        Args:
+            obj (object): Object owning the method
+            method_name (str): Name of the method
+            phase (str): Name shown for the phase, by default the method's
+                qualified name
+        """
+        if phase is None:
+            phase = f"{type(obj).__name__}.{method_name}"
+        self.phases.append((obj, method_name, phase))
+        self.phase_times[phase] = deque(maxlen=self.history)
+        self.frame_phase_times[phase] = 0.0
+        if self.enabled:
+            self._wrap(obj, method_name, phase)
+    
+    def add_counter(self, name, getter):
+        """
+        Track a running total kept by a subsystem.
+        
+        Args:
+            name (str): Name shown for the counter
+            getter (callable): Returns the current total
+        """
+        self.counters[name] = getter
+        self.counter_samples[name] = deque(maxlen=self.history)
+    
+    def _wrap(self, obj, method_name, phase):
+        """Shadow a method with a wrapper adding its run time to the phase."""
+        method = getattr(obj, method_name)
+        frame_phase_times = self.frame_phase_times
+        
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                frame_phase_times[phase] += time.perf_counter() - started
+        
+        setattr(obj, method_name, timed)
+    
+    def enable(self):
+        """Start timing phases and sampling counters."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.last_frame = None
+        for phase in self.frame_phase_times:
+            self.frame_phase_times[phase] = 0.0
+        for obj, method_name, phase in self.phases:
+            self._wrap(obj, method_name, phase)
+    
+    def disable(self):
+        """Stop timing and remove every wrapper."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for obj, method_name, _ in self.phases:
+            # Drop the instance attribute to uncover the class's method
+            vars(obj).pop(method_name, None)
+        for times in self.phase_times.values():
+            times.clear()
+        for samples in self.counter_samples.values():
+            samples.clear()
+        self.frame_times.clear()
+    
+    def toggle(self):
+        """
+        Switch the profiler on or off.
+        
+        Returns:
+            bool: True if the profiler is now enabled
+        """
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+    
+    def start_capture(self, path, frames):
+        """
+        Record a cProfile of the next frames and write it as a pstats file.
+        
+        Args:
+            path (str): Output path, readable with the pstats module
+            frames (int): Number of frames to record
+        """
+        self.capture = cProfile.Profile()
+        self.capture_path = path
+        self.capture_frames = frames
+        self.capture.enable()
+    
+    def stop_capture(self):
+        """Stop a running cProfile capture early and write what it recorded."""
+        if self.capture is None:
+            return
+        self.capture.disable()
+        self.capture.dump_stats(self.capture_path)
+        print(f"Wrote profile of the last frames to {self.capture_path}")
+        self.capture = None
+    
+    def end_frame(self):
+        """Close the current frame: store its phase times and sample counters."""
+        if self.capture is not None:
+            self.capture_frames -= 1
+            if self.capture_frames <= 0:
+                self.stop_capture()
+        
+        if not self.enabled:
+            return
+        
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+        
+        for phase, seconds in self.frame_phase_times.items():
+            self.phase_times[phase].append(seconds)
+            self.frame_phase_times[phase] = 0.0
+        for name, getter in self.counters.items():
+            self.counter_samples[name].append((now, getter()))
+    
+    def get_report(self):
+        """
+        Get the recent phase times and counter totals.
+        
+        Returns:
+            dict: 'frame_ms' (mean frame time), 'phases' (phase -> mean
+                milliseconds per frame) and 'counters' (name -> (total,
+                increase per second))
+        """
+        frame_times = self.frame_times
+        report = {
+            'frame_ms': 1e3 * sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            'phases': {},
+            'counters': {},
+        }
+        for phase, times in self.phase_times.items():
+            report['phases'][phase] = 1e3 * sum(times) / len(times) if times else 0.0
+        for name, samples in self.counter_samples.items():
+            if not samples:
+                continue
+            (first_time, first_total), (last_time, last_total) = samples[0], samples[-1]
+            rate = ((last_total - first_total) / (last_time - first_time)
+                    if last_time > first_time else 0.0)
+            report['counters'][name] = (last_total, rate)
+        return report
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+# Cell coordinates are packed into one int64 key per point
+_KEY_OFFSET = 1 << 20
+_KEY_STRIDE = 1 << 21
+
+class GridIndex:
+    """
+    Uniform grid index over 2D points for radius and nearest-point queries.
+    
+    Points are bucketed into square cells and kept sorted by cell, so a
+    query only looks at the points in the cells around it. Building the
+    index is a single sort, cheap enough to redo whenever the points move.
+    """
+    
+    def __init__(self, cell_size):
+        """
+        Initialize an empty index.
+        
+        Args:
+            cell_size (float): Side length of a grid cell
+        """
+        self.cell_size = float(cell_size)
+        self.xs = np.zeros(0)
+        self.ys = np.zeros(0)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+    
+    def _cell(self, value):
+        """Get the cell coordinate of a scalar coordinate."""
+        return math.floor(value / self.cell_size)
+    
+    def build(self, xs, ys):
+        """
+        Index a set of points, replacing the previous ones.
+        
+        Args:
+            xs (np.ndarray): X coordinates; a point's ID is its index
+            ys (np.ndarray): Y coordinates
+        """
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        cx = np.floor(self.xs / self.cell_size).astype(np.int64)
+        cy = np.floor(self.ys / self.cell_size).astype(np.int64)
+        keys = (cx + _KEY_OFFSET) * _KEY_STRIDE + (cy + _KEY_OFFSET)
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+    
+    def query_radius(self, x, y, radius):
+        """
+        Find the points within a distance of a position.
+        
+        Args:
+            x (float): X coordinate
+            y (float): Y coordinate
+            radius (float): Search radius
+        
+        Returns:
+            tuple: (point IDs, distances) as arrays, sorted by point ID
+        """
+        x_cells = range(self._cell(x - radius), self._cell(x + radius) + 1)
+        y_lo = self._cell(y - radius) + _KEY_OFFSET
+        y_hi = self._cell(y + radius) + _KEY_OFFSET
+        
+        # Points of one cell column are contiguous in the sorted order
+        chunks = []
+        for cx in x_cells:
+            base = (cx + _KEY_OFFSET) * _KEY_STRIDE
+            lo = np.searchsorted(self.sorted_keys, base + y_lo, side='left')
+            hi = np.searchsorted(self.sorted_keys, base + y_hi, side='right')
+            if lo < hi:
+                chunks.append(self.order[lo:hi])
+        if not chunks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        candidates = np.sort(np.concatenate(chunks))
+        distances = np.hypot(self.xs[candidates] - x, self.ys[candidates] - y)
+        inside = distances <= radius
+        return candidates[inside], distances[inside]
+    
+    def query_nearest(self, x, y, radius):
+        """
+        Find the point closest to a position within a distance.
+        
+        Args:
+            x (float): X coordinate
+            y (float): Y coordinate
+            radius (float): Search radius
+        
+        Returns:
+            int or None: ID of the closest point (the lowest ID on ties), or
+                None if no point is that close
+        """
+        ids, distances = self.query_radius(x, y, radius)
+        if len(ids) == 0:
+            return None
+        return int(ids[np.argmin(distances)])
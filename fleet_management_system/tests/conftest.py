@@ -0,0 +1,57 @@
+import io
+import os
+import sys
+import json
+import random
+import contextlib
+
+import pytest
+
+# Add the project directory to the path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.nav_graph import NavGraph
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def random_graph_data(seed, side=6, drop=0.15):
+    """
+    Build a jittered grid with random one- and two-way lanes.
+
+    Jittered positions make lane travel times distinct, so fastest paths
+    are unique and can be compared vertex by vertex.
+
+    Args:
+        seed (int): Random seed
+        side (int): Vertices per row and column
+        drop (float): Share of lane directions left out
+
+    Returns:
+        dict: Navigation graph in the nav_graph JSON format
+    """
+    rng = random.Random(seed)
+    vertices = [[col * 2.0 + rng.uniform(-0.4, 0.4), row * 2.0 + rng.uniform(-0.4, 0.4), {}]
+                for row in range(side) for col in range(side)]
+    lanes = []
+    for row in range(side):
+        for col in range(side):
+            vertex = row * side + col
+            for neighbor in ((vertex + 1) if col + 1 < side else None,
+                             (vertex + side) if row + 1 < side else None):
+                if neighbor is None:
+                    continue
+                for from_vertex, to_vertex in ((vertex, neighbor), (neighbor, vertex)):
+                    if rng.random() >= drop:
+                        speed_limit = rng.choice((0, 0, 1.5, 2.0))
+                        lanes.append([from_vertex, to_vertex, {'speed_limit': speed_limit}])
+    return {'levels': {'random': {'lanes': lanes, 'vertices': vertices}}}
+
+@pytest.fixture
+def load_graph(tmp_path):
+    """Load a NavGraph from JSON data written to a temporary file."""
+    def load(data, name='graph.json', use_cache=False, **kwargs):
+        path = tmp_path / name
+        path.write_text(json.dumps(data))
+        with contextlib.redirect_stdout(io.StringIO()):
+            return NavGraph(str(path), use_cache=use_cache, **kwargs)
+    return load
@@ -0,0 +1,78 @@
+import math
+import itertools
+
+import numpy as np
+import pytest
+
+from src.planning.assignment import linear_sum_assignment, match_finite
+
+def brute_force(cost):
+    """
+    Best matching of a small cost matrix by trying every one.
+
+    Returns:
+        tuple: (most finite pairs, lowest total cost among those)
+    """
+    num_rows, num_cols = cost.shape
+    best = (0, 0.0)
+    if num_rows <= num_cols:
+        matchings = (list(zip(range(num_rows), cols))
+                     for cols in itertools.permutations(range(num_cols), num_rows))
+    else:
+        matchings = (list(zip(rows, range(num_cols)))
+                     for rows in itertools.permutations(range(num_rows), num_cols))
+    for pairs in matchings:
+        finite = [cost[row, col] for row, col in pairs if math.isfinite(cost[row, col])]
+        key = (-len(finite), sum(finite))
+        if key < (-best[0], best[1]):
+            best = (len(finite), sum(finite))
+    return best
+
+def check_matching(cost, rows, cols, num_pairs):
+    """Assert a matching uses every row and column at most once."""
+    assert len(rows) == len(cols) == num_pairs
+    assert len(set(rows.tolist())) == len(rows)
+    assert len(set(cols.tolist())) == len(cols)
+    assert list(rows) == sorted(rows)
+    assert rows.dtype == cols.dtype == np.int64
+
+@pytest.mark.parametrize('seed', range(200))
+def test_fallback_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    shape = tuple(rng.integers(1, 6, size=2))
+    if seed % 3 == 0:
+        # Few distinct values, so many ties
+        cost = rng.integers(0, 4, size=shape).astype(float)
+    else:
+        cost = rng.uniform(0, 100, size=shape)
+
+    rows, cols = linear_sum_assignment(cost, use_scipy=False)
+
+    check_matching(cost, rows, cols, min(shape))
+    assert cost[rows, cols].sum() == pytest.approx(brute_force(cost)[1])
+
+@pytest.mark.parametrize('seed', range(200))
+def test_finite_matching_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    shape = tuple(rng.integers(1, 6, size=2))
+    cost = rng.uniform(0, 100, size=shape)
+    cost[rng.random(shape) < rng.uniform(0, 0.8)] = np.inf
+
+    rows, cols = match_finite(cost, use_scipy=False)
+
+    num_pairs, total = brute_force(cost)
+    check_matching(cost, rows, cols, num_pairs)
+    assert np.isfinite(cost[rows, cols]).all()
+    assert cost[rows, cols].sum() == pytest.approx(total)
+
+def test_empty_and_infinite_matrices():
+    rows, cols = linear_sum_assignment(np.zeros((0, 3)), use_scipy=False)
+    assert len(rows) == len(cols) == 0
+
+    rows, cols = match_finite(np.full((2, 3), np.inf), use_scipy=False)
+    assert len(rows) == len(cols) == 0
+
+    with pytest.raises(ValueError):
+        linear_sum_assignment(np.array([[1.0, np.inf]]), use_scipy=False)
+    with pytest.raises(ValueError):
+        linear_sum_assignment(np.zeros(3), use_scipy=False)
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from src.models.reservation_table import ReservationTable
+from src.planning.cbs import CBSPlanner
+from src.planning.cooperative_astar import CooperativePlanner
+
+from conftest import random_graph_data
+
+def make_planner(nav_graph):
+    """Build a CBS planner over an empty reservation table."""
+    return CBSPlanner(CooperativePlanner(nav_graph, ReservationTable(step_duration=1.0)))
+
+def random_requests(nav_graph, rng, count):
+    """Draw requests with distinct starts and distinct goals."""
+    starts = rng.sample(range(nav_graph.num_vertices), count)
+    goals = rng.sample(range(nav_graph.num_vertices), count)
+    return [(robot_id, start, goal) for robot_id, (start, goal) in enumerate(zip(starts, goals))]
+
+def check_solution(planner, requests, solution):
+    """
+    Assert that timed paths are valid moves and free of conflicts.
+
+    Checked independently of ConflictTable: no two robots on one vertex at
+    a step, on one lane at a step, or head-on on a lane and its reverse, and
+    no robot passing a vertex where another has already parked for good.
+    """
+    nav_graph = planner.nav_graph
+    cooperative_planner = planner.cooperative_planner
+    vertex_users = {}
+    lane_users = {}
+    parked = {}
+
+    for robot_id, start_vertex, goal_vertex in requests:
+        timed_path, lane_ids = solution[robot_id]
+        assert timed_path[0][0] == start_vertex
+        assert timed_path[-1][0] == goal_vertex
+        assert len(lane_ids) == len(timed_path)
+
+        for i, (vertex, step) in enumerate(timed_path):
+            assert (vertex, step) not in vertex_users, f"vertex conflict at {(vertex, step)}"
+            vertex_users[(vertex, step)] = robot_id
+            if i + 1 == len(timed_path):
+                break
+
+            next_vertex, next_step = timed_path[i + 1]
+            lane_id = lane_ids[i]
+            if lane_id is None:
+                # A wait of one step in place
+                assert (next_vertex, next_step) == (vertex, step + 1)
+                continue
+            assert lane_id == nav_graph.get_lane_id(vertex, next_vertex)
+            assert not nav_graph.lane_blocked[lane_id]
+            assert next_step - step == cooperative_planner.lane_steps(lane_id)
+            for s in range(step, next_step):
+                assert (lane_id, s) not in lane_users, f"lane conflict at {(lane_id, s)}"
+                lane_users[(lane_id, s)] = robot_id
+
+        assert goal_vertex not in parked
+        parked[goal_vertex] = (robot_id, timed_path[-1][1])
+
+    # Head-on swaps on a lane and its reverse
+    for (lane_id, step), robot_id in lane_users.items():
+        reverse_id = nav_graph.get_lane_id(int(nav_graph.lane_to[lane_id]),
+                                           int(nav_graph.lane_from[lane_id]))
+        other = lane_users.get((reverse_id, step))
+        assert other is None or other == robot_id, f"swap conflict on lane {lane_id} at {step}"
+
+    # Nobody drives through a robot that already parked
+    for (vertex, step), robot_id in vertex_users.items():
+        if vertex in parked:
+            parked_robot, parked_step = parked[vertex]
+            assert robot_id == parked_robot or step < parked_step, \
+                f"robot {robot_id} runs into robot {parked_robot} parked on {vertex}"
+
+@pytest.mark.parametrize('suboptimality', [1.0, 1.5])
+@pytest.mark.parametrize('seed', range(6))
+def test_solutions_are_conflict_free(load_graph, seed, suboptimality):
+    nav_graph = load_graph(random_graph_data(seed, drop=0.0))
+    planner = make_planner(nav_graph)
+    requests = random_requests(nav_graph, random.Random(seed), 6)
+
+    solution = planner.solve(requests, time_budget=30.0, suboptimality=suboptimality)
+
+    assert planner.last_method == ('cbs' if suboptimality == 1.0 else 'ecbs')
+    assert set(solution) == {robot_id for robot_id, _, _ in requests}
+    check_solution(planner, requests, solution)
+
+def test_crossing_robots_are_kept_apart(load_graph):
+    # Two robots swapping ends of a corridor with one siding to pass in
+    vertices = [[0, 0, {}], [1, 0, {}], [2, 0, {}], [3, 0, {}], [1.5, 1, {}]]
+    lanes = []
+    for from_vertex, to_vertex in ((0, 1), (1, 2), (2, 3), (1, 4), (4, 2)):
+        lanes.append([from_vertex, to_vertex, {'speed_limit': 0}])
+        lanes.append([to_vertex, from_vertex, {'speed_limit': 0}])
+    nav_graph = load_graph({'levels': {'corridor': {'lanes': lanes, 'vertices': vertices}}})
+    planner = make_planner(nav_graph)
+    requests = [(0, 0, 3), (1, 3, 0)]
+
+    for suboptimality in (1.0, 2.0):
+        solution = planner.solve(requests, time_budget=30.0, suboptimality=suboptimality)
+        assert set(solution) == {0, 1}
+        check_solution(planner, requests, solution)
+
+def test_shared_goal_is_claimed_by_first_request(load_graph):
+    nav_graph = load_graph(random_graph_data(0, drop=0.0))
+    planner = make_planner(nav_graph)
+    requests = [(0, 0, 20), (1, 5, 20), (2, 30, 7)]
+
+    solution = planner.solve(requests, time_budget=30.0)
+
+    assert set(solution) == {0, 2}
+    assert planner.last_claimed == {1: 0}
+    check_solution(planner, [requests[0], requests[2]], solution)
@@ -0,0 +1,70 @@
+import pytest
+
+from src.controllers.fleet_manager import FleetManager
+from src.models.robot import Robot
+from src.simulation.simulator import Simulator
+from src.simulation.event_simulator import EventSimulator
+
+from conftest import random_graph_data
+
+def charger_graph_data(seed, chargers):
+    """A random grid without missing lanes whose given vertices are chargers."""
+    data = random_graph_data(seed, drop=0.0)
+    for vertex in chargers:
+        data['levels']['random']['vertices'][vertex][2]['is_charger'] = True
+    return data
+
+@pytest.mark.parametrize('simulator_class', [Simulator, EventSimulator])
+def test_robots_with_a_task_do_not_top_up_at_its_stops(load_graph, simulator_class):
+    simulator = simulator_class(load_graph(charger_graph_data(0, [14])), seed=0)
+    fleet_manager = simulator.fleet_manager
+    robot = fleet_manager.robots[fleet_manager.spawn_robot(0)]
+    robot.battery = 0.5
+    fleet_manager.add_task(35, pickup_vertex=14)
+    simulator.run(120.0, auto_assign=False)
+
+    assert robot.current_vertex == 35
+    assert fleet_manager.task_scheduler.completed == 1
+    assert fleet_manager.charger_scheduler.sessions == 0
+    assert robot.task_id is None
+
+@pytest.mark.parametrize('simulator_class', [Simulator, EventSimulator])
+def test_free_robots_top_up_on_a_charger(load_graph, simulator_class):
+    simulator = simulator_class(load_graph(charger_graph_data(0, [35])), seed=0)
+    fleet_manager = simulator.fleet_manager
+    robot = fleet_manager.robots[fleet_manager.spawn_robot(0)]
+    robot.battery = 0.5
+    fleet_manager.add_task(35, pickup_vertex=14)
+    simulator.run(120.0, auto_assign=False)
+
+    # The task ends on the charger, so the robot tops up there afterwards
+    assert fleet_manager.task_scheduler.completed == 1
+    assert fleet_manager.charger_scheduler.sessions == 1
+    assert robot.state == Robot.IDLE and robot.current_vertex == 35
+    assert robot.battery > 0.9
+
+def test_busy_queued_robot_keeps_the_freed_charger(load_graph):
+    nav_graph = load_graph(charger_graph_data(0, [0]))
+    fleet_manager = FleetManager(nav_graph, None)
+    charger_scheduler = fleet_manager.charger_scheduler
+    a = fleet_manager.robots[fleet_manager.spawn_robot(1)]
+    b = fleet_manager.robots[fleet_manager.spawn_robot(20)]
+    a.battery = b.battery = 0.1
+    assert charger_scheduler.claim(a.id) and charger_scheduler.claim(b.id)
+    assert list(charger_scheduler.queue) == [b.id]
+
+    # Robot b is given a trip by hand while it waits for the charger
+    assert b.follow_path(nav_graph.find_path(20, 23))
+    while a.state != Robot.CHARGING:
+        fleet_manager.update(0.05)
+    a.battery = 0.99
+    fleet_manager.update(0.05)
+    assert b.state == Robot.MOVING
+    assert charger_scheduler.robot_charger == {b.id: 0}
+    assert not charger_scheduler.queue
+
+    # Once robot a leaves the charger, b goes there straight from its trip
+    assert a.follow_path(nav_graph.find_path(0, 5))
+    for _ in range(1000):
+        fleet_manager.update(0.05)
+    assert b.state == Robot.CHARGING and b.current_vertex == 0
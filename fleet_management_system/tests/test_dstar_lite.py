@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from src.planning.dstar_lite import DStarLite
+
+from conftest import random_graph_data
+
+def watch_lanes(nav_graph, planner):
+    """Forward lane changes to a planner, as TrafficManager does."""
+    nav_graph.add_lane_listener(planner.update_lanes)
+
+def assert_same_route(nav_graph, path, start_vertex, goal_vertex):
+    """Assert a route is the one a fresh A* search finds."""
+    expected = nav_graph.find_path(start_vertex, goal_vertex)
+    assert path == expected
+    if path is not None:
+        assert nav_graph.get_path_travel_time(path) == pytest.approx(
+            nav_graph.get_path_travel_time(expected))
+
+@pytest.mark.parametrize('seed', range(20))
+def test_repair_after_block_lane_matches_fresh_search(load_graph, seed):
+    nav_graph = load_graph(random_graph_data(seed))
+    rng = random.Random(seed)
+    start_vertex, goal_vertex = rng.sample(range(nav_graph.num_vertices), 2)
+    planner = DStarLite(nav_graph, start_vertex, goal_vertex)
+    watch_lanes(nav_graph, planner)
+    assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
+
+    # Keep closing lanes of the current route until the goal is cut off
+    for _ in range(8):
+        path = planner.get_path()
+        if path is None:
+            break
+        k = rng.randrange(len(path) - 1)
+        assert nav_graph.block_lane(path[k], path[k + 1])
+        assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
+
+@pytest.mark.parametrize('seed', range(20))
+def test_repair_while_moving_matches_fresh_search(load_graph, seed):
+    nav_graph = load_graph(random_graph_data(seed))
+    rng = random.Random(seed)
+    start_vertex, goal_vertex = rng.sample(range(nav_graph.num_vertices), 2)
+    planner = DStarLite(nav_graph, start_vertex, goal_vertex)
+    watch_lanes(nav_graph, planner)
+
+    # Drive along the route, closing a lane ahead and reopening an earlier one
+    blocked = []
+    vertex = start_vertex
+    while vertex != goal_vertex:
+        path = planner.get_path()
+        if path is None:
+            break
+        vertex = path[1]
+        planner.move_to(vertex)
+        if len(path) > 3:
+            k = rng.randrange(1, len(path) - 1)
+            nav_graph.block_lane(path[k], path[k + 1])
+            blocked.append((path[k], path[k + 1]))
+        if len(blocked) > 2:
+            nav_graph.unblock_lane(*blocked.pop(0))
+        assert_same_route(nav_graph, planner.get_path(), vertex, goal_vertex)
+
+def test_speed_changes_and_vertex_blocks(load_graph):
+    nav_graph = load_graph(random_graph_data(3, drop=0.0))
+    start_vertex, goal_vertex = 0, nav_graph.num_vertices - 1
+    planner = DStarLite(nav_graph, start_vertex, goal_vertex)
+    watch_lanes(nav_graph, planner)
+
+    path = planner.get_path()
+    nav_graph.set_lane_speed_limit_by_id(nav_graph.get_lane_id(path[0], path[1]), 0.1)
+    assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
+
+    # Blocking a vertex closes every lane into it
+    path = planner.get_path()
+    nav_graph.block_vertex(path[len(path) // 2])
+    assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
+
+    nav_graph.unblock_vertex(path[len(path) // 2])
+    assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
+
+    # A faster lane anywhere changes the heuristic, so the planner starts over
+    nav_graph.set_lane_speed_limit_by_id(0, 10.0)
+    assert_same_route(nav_graph, planner.get_path(), start_vertex, goal_vertex)
@@ -0,0 +1,22 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a headless run imports; none of them may load NetworkX or pygame
+CORE_MODULES = ('src.models.robot', 'src.models.nav_graph', 'src.controllers.fleet_manager',
+                'src.controllers.traffic_manager', 'src.simulation.simulator',
+                'src.simulation.event_simulator', 'src.utils.helpers')
+
+@pytest.mark.parametrize('heavy_module', ['networkx', 'pygame'])
+def test_core_modules_do_not_import_heavy_modules(heavy_module):
+    code = ('import sys, json\n'
+            f'import {", ".join(CORE_MODULES)}\n'
+            'print(json.dumps(sorted(name.split(".")[0] for name in sys.modules)))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True)
+    assert heavy_module not in json.loads(result.stdout)
@@ -0,0 +1,130 @@
+import io
+import os
+import json
+import shutil
+import contextlib
+
+import numpy as np
+import pytest
+
+from src.models.nav_graph import NavGraph, CACHE_ARRAYS
+
+from conftest import DATA_DIR, random_graph_data
+
+def load(path, use_cache=True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return NavGraph(str(path), use_cache=use_cache)
+
+def assert_same_graph(graph, expected):
+    """Assert two graphs hold the same vertices, lanes and derived state."""
+    assert graph.vertex_names == expected.vertex_names
+    for name in CACHE_ARRAYS:
+        if name == 'vertex_names':
+            continue
+        actual, wanted = getattr(graph, name), getattr(expected, name)
+        assert actual.dtype == wanted.dtype, name
+        np.testing.assert_array_equal(actual, wanted, err_msg=name)
+    assert graph.lane_index == expected.lane_index
+    np.testing.assert_array_equal(graph.lane_travel_time, expected.lane_travel_time)
+    assert graph.num_vertices == expected.num_vertices
+    assert graph.num_lanes == expected.num_lanes
+
+@pytest.mark.parametrize('name', ['nav_graph_1.json', 'nav_graph_2.json', 'nav_graph_3.json'])
+def test_round_trip_gives_same_graph(tmp_path, name):
+    path = tmp_path / name
+    shutil.copy(os.path.join(DATA_DIR, name), path)
+    cache_path = NavGraph.get_cache_path(str(path))
+
+    parsed = load(path, use_cache=False)
+    assert not os.path.exists(cache_path)
+
+    compiled = load(path)
+    assert os.path.isfile(os.path.join(cache_path, 'meta.json'))
+    assert_same_graph(compiled, parsed)
+
+    cached = load(path)
+    assert isinstance(cached.vertex_x, np.memmap)
+    assert_same_graph(cached, parsed)
+    for start_vertex in range(cached.num_vertices):
+        for end_vertex in range(cached.num_vertices):
+            assert (cached.find_path(start_vertex, end_vertex) ==
+                    parsed.find_path(start_vertex, end_vertex))
+
+def test_runtime_changes_never_reach_the_cache(tmp_path):
+    path = tmp_path / 'graph.json'
+    path.write_text(json.dumps(random_graph_data(0)))
+    load(path)
+
+    graph = load(path)
+    lane_id = graph.get_lane_id(int(graph.lane_from[0]), int(graph.lane_to[0]))
+    graph.set_lane_speed_limit_by_id(lane_id, 7.5)
+    graph.block_lane(int(graph.lane_from[1]), int(graph.lane_to[1]))
+
+    reloaded = load(path)
+    assert reloaded.lane_speed_limit[lane_id] != 7.5
+    assert not reloaded.lane_blocked.any()
+    assert_same_graph(reloaded, load(path, use_cache=False))
+
+def test_cache_is_rebuilt_when_json_changes(tmp_path):
+    path = tmp_path / 'graph.json'
+    data = random_graph_data(1)
+    path.write_text(json.dumps(data))
+    load(path)
+    load(path)
+
+    # Same size, different content: a new speed limit and one lane fewer
+    data['levels']['random']['lanes'][0][2]['speed_limit'] = 9.0
+    removed = data['levels']['random']['lanes'].pop()
+    path.write_text(json.dumps(data))
+
+    graph = load(path)
+    assert not isinstance(graph.vertex_x, np.memmap)
+    assert graph.get_lane_id(removed[0], removed[1]) is None
+    assert graph.lane_speed_limit[0] == 9.0
+    assert_same_graph(graph, load(path, use_cache=False))
+
+    # The rebuilt cache is used from then on
+    cached = load(path)
+    assert isinstance(cached.vertex_x, np.memmap)
+    assert_same_graph(cached, graph)
+
+def test_stale_or_broken_cache_is_ignored(tmp_path):
+    path = tmp_path / 'graph.json'
+    path.write_text(json.dumps(random_graph_data(2)))
+    load(path)
+    cache_path = NavGraph.get_cache_path(str(path))
+    expected = load(path, use_cache=False)
+
+    # Cache written by another layout version
+    meta_path = os.path.join(cache_path, 'meta.json')
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta['version'] += 1
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    graph = load(path)
+    assert not isinstance(graph.vertex_x, np.memmap)
+    assert_same_graph(graph, expected)
+
+    # Cache missing one of its arrays
+    os.remove(os.path.join(cache_path, 'lane_to.npy'))
+    graph = load(path)
+    assert not isinstance(graph.vertex_x, np.memmap)
+    assert_same_graph(graph, expected)
+    assert isinstance(load(path).vertex_x, np.memmap)
+
+def test_lane_lookup_with_int32_ids_on_large_graph(tmp_path):
+    # Past 46341 vertices the lane key no longer fits in an int32
+    num_vertices = 50000
+    vertices = [[float(i), 0.0, {}] for i in range(num_vertices)]
+    lanes = [[num_vertices - 2, num_vertices - 1, {}], [num_vertices - 1, num_vertices - 2, {}],
+             [0, num_vertices - 1, {}]]
+    path = tmp_path / 'graph.json'
+    path.write_text(json.dumps({'levels': {'line': {'lanes': lanes, 'vertices': vertices}}}))
+    load(path)
+
+    graph = load(path)
+    assert graph.lane_from.dtype == np.int32
+    for lane_id in range(graph.num_lanes):
+        assert graph.get_lane_id(graph.lane_from[lane_id], graph.lane_to[lane_id]) == lane_id
+    assert graph.get_lane_id(np.int32(num_vertices - 1), np.int32(0)) is None
@@ -0,0 +1,27 @@
+from src.simulation.simulator import Simulator
+from src.simulation.event_simulator import EventSimulator
+
+from conftest import random_graph_data
+
+def test_pickup_stops_are_not_counted_as_tasks(load_graph):
+    for simulator_class in (Simulator, EventSimulator):
+        simulator = simulator_class(load_graph(random_graph_data(0, drop=0.0)), seed=0)
+        robot_id = simulator.fleet_manager.spawn_robot(0)
+        simulator.fleet_manager.add_task(35, pickup_vertex=14)
+        simulator.run(120.0, auto_assign=False)
+
+        robot = simulator.fleet_manager.robots[robot_id]
+        assert robot.current_vertex == 35
+        assert simulator.tasks_completed == 1
+        assert simulator.get_stats()['scheduler']['completed'] == 1
+
+def test_random_tasks_are_counted_at_their_destination(load_graph):
+    simulator = Simulator(load_graph(random_graph_data(1, drop=0.0)), seed=1)
+    robot_id = simulator.spawn_robots(1)[0]
+    assert simulator.assign_random_tasks() == 1
+    destination = simulator.random_tasks[robot_id]
+    simulator.run(120.0, auto_assign=False)
+
+    assert simulator.fleet_manager.robots[robot_id].current_vertex == destination
+    assert simulator.tasks_completed == 1
+    assert not simulator.random_tasks
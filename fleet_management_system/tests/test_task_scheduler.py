@@ -0,0 +1,43 @@
+from src.controllers.fleet_manager import FleetManager
+from src.controllers.traffic_manager import TrafficManager
+
+def star_data():
+    """Leaves 0, 2 and 3 around a center vertex 1, all lanes two-way."""
+    vertices = [[0.0, 0.0, {}], [2.0, 0.0, {}], [4.0, 0.0, {}], [2.0, 2.0, {}]]
+    lanes = []
+    for leaf in (0, 2, 3):
+        lanes.append([leaf, 1, {'speed_limit': 0}])
+        lanes.append([1, leaf, {'speed_limit': 0}])
+    return {'levels': {'star': {'lanes': lanes, 'vertices': vertices}}}
+
+def stall(scheduler, robot, stop, failures):
+    """Hand a robot a task whose next stop could not be planned yet."""
+    task = scheduler.tasks[scheduler.submit([stop])]
+    scheduler.pending = [entry for entry in scheduler.pending if entry[2] is not task]
+    scheduler._activate(robot, task)
+    for _ in range(failures):
+        scheduler.stalled.failed(robot.id, scheduler.time)
+
+def test_stalled_robots_in_the_way_are_retried_together(load_graph):
+    nav_graph = load_graph(star_data())
+    fleet_manager = FleetManager(nav_graph, None)
+    fleet_manager.path_planner = TrafficManager(nav_graph, fleet_manager)
+    scheduler = fleet_manager.task_scheduler
+    a = fleet_manager.robots[fleet_manager.spawn_robot(0)]
+    b = fleet_manager.robots[fleet_manager.spawn_robot(2)]
+    fleet_manager.update(0.1)
+
+    # Robot a is due first, but b stands on its stop and needs a's vertex
+    stall(scheduler, a, 2, failures=1)
+    stall(scheduler, b, 0, failures=4)
+    batches = []
+    assign_batch = fleet_manager.assign_batch
+    fleet_manager.assign_batch = lambda stops: batches.append(list(stops)) or assign_batch(stops)
+    fleet_manager.update(1.0)
+
+    assert batches == [[(a.id, 2), (b.id, 0)]]
+    assert a.path[-1] == 2 and b.path[-1] == 0
+    assert not scheduler.stalled
+    for _ in range(400):
+        fleet_manager.update(0.05)
+    assert scheduler.completed == 2
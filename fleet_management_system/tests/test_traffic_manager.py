@@ -0,0 +1,112 @@
+from src.controllers.fleet_manager import FleetManager
+from src.controllers.traffic_manager import TrafficManager
+
+def corridor_data(length):
+    """A two-way corridor 0 - 1 - ... - length-1 with a siding off every vertex."""
+    vertices = [[i * 2.0, 0.0, {}] for i in range(length)]
+    vertices += [[i * 2.0, 2.0, {}] for i in range(length)]
+    lanes = []
+    for i in range(length):
+        pairs = [(i, length + i)]
+        if i + 1 < length:
+            pairs.append((i, i + 1))
+        for from_vertex, to_vertex in pairs:
+            lanes.append([from_vertex, to_vertex, {'speed_limit': 0}])
+            lanes.append([to_vertex, from_vertex, {'speed_limit': 0}])
+    return {'levels': {'corridor': {'lanes': lanes, 'vertices': vertices}}}
+
+def make_fleet(load_graph, length, **kwargs):
+    nav_graph = load_graph(corridor_data(length))
+    fleet_manager = FleetManager(nav_graph, None)
+    traffic_manager = TrafficManager(nav_graph, fleet_manager, **kwargs)
+    return fleet_manager, traffic_manager
+
+def test_head_on_robots_are_found_and_one_gives_way(load_graph):
+    fleet_manager, traffic_manager = make_fleet(load_graph, 3, deadlock_policy='priority')
+    a = fleet_manager.spawn_robot(0)
+    b = fleet_manager.spawn_robot(1)
+    fleet_manager.robots[a].priority = 1
+    assert fleet_manager.robots[a].follow_path([0, 1, 2])
+    assert fleet_manager.robots[b].follow_path([1, 0])
+    fleet_manager.update(0.1)
+
+    assert set(traffic_manager.waiting_since) == {a, b}
+    assert sorted(traffic_manager.find_deadlocks()) in ([[a, b]], [[b, a]])
+    assert traffic_manager.resolve_deadlocks() == 1
+
+    # Robot b backs off into the siding at vertex 1 and lets robot a pass
+    for _ in range(400):
+        fleet_manager.update(0.05)
+        traffic_manager.update(0.05)
+    assert fleet_manager.robots[a].current_vertex == 2
+    assert fleet_manager.robots[b].current_vertex == 0
+
+def test_only_robots_that_changed_state_are_walked(load_graph):
+    fleet_manager, traffic_manager = make_fleet(load_graph, 6)
+    robots = [fleet_manager.spawn_robot(vertex) for vertex in range(5)]
+
+    # A chain: every robot waits for the one ahead, the last one is parked
+    for robot_id in robots[:-1]:
+        robot = fleet_manager.robots[robot_id]
+        assert robot.follow_path([robot.current_vertex, robot.current_vertex + 1])
+    fleet_manager.update(0.1)
+    assert traffic_manager.resolve_deadlocks() == 0
+    assert set(traffic_manager.wait_for) == set(robots[:-1])
+    assert not traffic_manager._changed_robots
+    assert traffic_manager.resolve_deadlocks() == 0
+
+    # The parked robot turns back into the chain and closes a cycle
+    last = fleet_manager.robots[robots[-1]]
+    assert last.follow_path([4, 3])
+    fleet_manager.update(0.1)
+    assert traffic_manager._changed_robots == {robots[-1]}
+    cycles = traffic_manager.find_deadlocks(traffic_manager._changed_robots)
+    assert [sorted(cycle) for cycle in cycles] == [sorted(robots[-2:])]
+    assert traffic_manager.resolve_deadlocks() == 1
+
+def test_parked_robot_makes_way_in_the_only_siding(load_graph):
+    # Corridor 0 - 1 - 2 - 3 with a dead-end siding 1 - 4 - 5
+    vertices = [[0.0, 0.0, {}], [2.0, 0.0, {}], [4.0, 0.0, {}], [6.0, 0.0, {}],
+                [2.0, 2.0, {}], [2.0, 4.0, {}]]
+    lanes = []
+    for from_vertex, to_vertex in ((0, 1), (1, 2), (2, 3), (1, 4), (4, 5)):
+        lanes.append([from_vertex, to_vertex, {'speed_limit': 0}])
+        lanes.append([to_vertex, from_vertex, {'speed_limit': 0}])
+    nav_graph = load_graph({'levels': {'siding': {'lanes': lanes, 'vertices': vertices}}})
+    fleet_manager = FleetManager(nav_graph, None)
+    traffic_manager = TrafficManager(nav_graph, fleet_manager, deadlock_policy='priority')
+    a = fleet_manager.robots[fleet_manager.spawn_robot(1)]
+    b = fleet_manager.robots[fleet_manager.spawn_robot(2)]
+    parked = fleet_manager.robots[fleet_manager.spawn_robot(4)]
+    b.priority = 1
+    assert a.follow_path([1, 2, 3])
+    assert b.follow_path([2, 1, 0])
+    fleet_manager.update(0.1)
+
+    # Backing a off to 0 would only move the deadlock along, so the parked
+    # robot moves deeper into the siding and a backs off into it
+    assert traffic_manager.resolve_deadlocks() == 1
+    assert parked.path == [4, 5]
+    assert a.path[:2] == [1, 4]
+    for _ in range(600):
+        fleet_manager.update(0.05)
+        traffic_manager.update(0.05)
+    assert a.current_vertex == 3
+    assert b.current_vertex == 0
+    assert parked.current_vertex == 5
+
+def test_idle_robot_moves_out_of_a_planned_path(load_graph):
+    fleet_manager, traffic_manager = make_fleet(load_graph, 3)
+    a = fleet_manager.robots[fleet_manager.spawn_robot(0)]
+    idle = fleet_manager.robots[fleet_manager.spawn_robot(1)]
+
+    # The idle robot holds the only way to vertex 2, so it steps into its siding
+    path = traffic_manager.plan_path(a.id, 0, 2)
+    assert path is not None and path[0] == 0 and path[-1] == 2
+    assert idle.path[-1] == 4
+    assert a.follow_path(path, traffic_manager.step_duration)
+    for _ in range(400):
+        fleet_manager.update(0.05)
+        traffic_manager.update(0.05)
+    assert a.current_vertex == 2
+    assert idle.current_vertex == 4